@@ -0,0 +1,75 @@
+"""Micro-benchmark of notebook reading and writing.
+
+Compares ``nbformat.reads``/``nbformat.writes`` with `nbcollection.nb_io`, with
+and without schema validation, on large generated notebooks: one with many
+cells and text outputs, and one with image outputs. Run with::
+
+    python benchmarks/bench_nb_io.py
+"""
+
+import base64
+import io
+import os
+import timeit
+
+import nbformat
+
+from nbcollection import nb_io
+
+
+def make_notebook(n_cells, image_size=0):
+    """Make a notebook with text (and optionally image) outputs."""
+    nb = nbformat.v4.new_notebook()
+    image = base64.b64encode(os.urandom(image_size)).decode("ascii")
+    for i in range(n_cells):
+        nb.cells.append(nbformat.v4.new_markdown_cell(f"## Section {i}\n\nText."))
+        cell = nbformat.v4.new_code_cell(f"x = {i}\nplot(x)", execution_count=i)
+        cell.outputs = [nbformat.v4.new_output("stream", text=f"{i}\n" * 20)]
+        if image_size:
+            cell.outputs.append(
+                nbformat.v4.new_output(
+                    "display_data",
+                    data={"image/png": image, "text/plain": "<Figure>"},
+                )
+            )
+        nb.cells.append(cell)
+    return nb
+
+
+def bench(label, func, number=5):
+    """Print the mean run time of a function."""
+    t = timeit.timeit(func, number=number) / number
+    print(f"{label:<45} {t * 1000:8.1f} ms")
+
+
+def run(nb):
+    """Benchmark reading and writing a notebook."""
+    f = io.StringIO()
+    nbformat.write(nb, f)
+    content = f.getvalue()
+    print(f"\nNotebook: {len(nb.cells)} cells, {len(content) / 1e6:.1f} MB")
+
+    bench("read: nbformat.reads", lambda: nbformat.reads(content, as_version=4))
+    bench("read: nb_io.reads_notebook", lambda: nb_io.reads_notebook(content))
+    bench(
+        "read: nb_io.reads_notebook(validate=False)",
+        lambda: nb_io.reads_notebook(content, validate=False),
+    )
+
+    bench("write: nbformat.writes", lambda: nbformat.writes(nb))
+    bench("write: nb_io.writes_notebook", lambda: nb_io.writes_notebook(nb))
+    bench(
+        "write: nb_io.writes_notebook(validate=False)",
+        lambda: nb_io.writes_notebook(nb, validate=False),
+    )
+
+
+def main():
+    """Run the benchmarks."""
+    print(f"orjson {'installed' if nb_io.orjson is not None else 'not installed'}")
+    run(make_notebook(2000))
+    run(make_notebook(300, image_size=20_000))
+
+
+if __name__ == "__main__":
+    main()
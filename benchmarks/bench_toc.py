@@ -0,0 +1,88 @@
+"""Benchmark of the TOC extraction of the Learn Astropy HTML theme.
+
+Compares `TocPreprocessor` with the previous implementation, which parsed the
+inline markdown of every cell and computed each anchor with nbconvert's
+``add_anchor`` and a BeautifulSoup round trip, on notebooks with hundreds of
+headings. Run with::
+
+    python benchmarks/bench_toc.py
+"""
+
+import timeit
+
+import nbformat
+from bs4 import BeautifulSoup
+from markdown_it import MarkdownIt
+from markdown_it.tree import SyntaxTreeNode
+from nbconvert.filters import add_anchor
+
+from nbcollection.themes.learnastropy.tocpreprocessor import (
+    Section,
+    SectionChildren,
+    TocPreprocessor,
+)
+
+
+def make_notebook(n_headings):
+    """Make a notebook with sections, subsections, text, and code."""
+    nb = nbformat.v4.new_notebook()
+    nb.cells.append(nbformat.v4.new_markdown_cell("# Title\n\nIntroduction."))
+    for i in range(n_headings):
+        level = 2 if i % 4 == 0 else 3
+        nb.cells.append(
+            nbformat.v4.new_markdown_cell(
+                f"{'#' * level} Section {i}: `Table` & *units*\n\n"
+                + "Some *text* with a [link](https://www.astropy.org). " * 10
+            )
+        )
+        nb.cells.append(nbformat.v4.new_code_cell(f"x = {i}"))
+    return nb
+
+
+def previous_toc(nb):
+    """Extract the TOC like the previous implementation of TocPreprocessor."""
+    markdown = "\n\n".join(c.source for c in nb.cells if c.cell_type == "markdown")
+    token_tree = SyntaxTreeNode(MarkdownIt().parse(markdown))
+    sections = SectionChildren([])
+    for node in token_tree.children:
+        if node.type != "heading":
+            continue
+        title = node.children[0].content
+        title = title.replace("`", "").replace("*", "").replace("_", "")
+        level = int(node.tag.lstrip("h"))
+        header_html = add_anchor(f"<h{level}>{title}</h{level}>", anchor_link_text="#")
+        anchor = BeautifulSoup(header_html, "html.parser").find("a")
+        href = "#" if anchor is None else anchor["href"]
+        sections.insert_section(
+            Section(title=title, children=SectionChildren([]), href=href, level=level)
+        )
+    return sections[0].children.export()
+
+
+def main():
+    """Run the benchmarks."""
+    preprocessor = TocPreprocessor()
+    for n_headings in (100, 500, 2000):
+        nb = make_notebook(n_headings)
+        toc = preprocessor.preprocess(nb, {})[1]["learn_astropy_toc"]
+        if toc != previous_toc(nb):
+            msg = "The TOC differs from the previous implementation"
+            raise RuntimeError(msg)
+
+        number = 5
+        t_previous = (
+            timeit.timeit(lambda nb=nb: previous_toc(nb), number=number) / number
+        )
+        t_current = (
+            timeit.timeit(lambda nb=nb: preprocessor.preprocess(nb, {}), number=number)
+            / number
+        )
+        print(
+            f"{n_headings:5d} headings: previous {t_previous * 1000:7.1f} ms, "
+            f"current {t_current * 1000:7.1f} ms "
+            f"({t_previous / t_current:.1f}x faster)"
+        )
+
+
+if __name__ == "__main__":
+    main()
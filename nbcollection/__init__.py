@@ -1 +1,10 @@
 """Execute and convert collections of Jupyter notebooks to static websites."""
+
+from importlib.metadata import PackageNotFoundError, version
+
+__all__ = ["__version__"]
+
+try:
+    __version__ = version("nbcollection")
+except PackageNotFoundError:  # package is not installed
+    __version__ = "0.0.0"
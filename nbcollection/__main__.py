@@ -3,9 +3,16 @@
 import argparse
 import sys
 
-from .commands import convert, execute
+from .commands import convert, execute, merge, plan, serve, status
 
-commands = {"execute": execute, "convert": convert}
+commands = {
+    "execute": execute,
+    "convert": convert,
+    "status": status,
+    "plan": plan,
+    "merge": merge,
+    "serve": serve,
+}
 
 DESCRIPTION = """Type `nbcollection <command> -h` for help.
 
@@ -13,6 +20,10 @@ The allowed commands are:
 
     nbcollection execute
     nbcollection convert
+    nbcollection status
+    nbcollection plan
+    nbcollection merge
+    nbcollection serve
 """
 
 parser = argparse.ArgumentParser(
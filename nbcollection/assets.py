@@ -0,0 +1,145 @@
+"""Content-addressed store for the outputs extracted from notebooks."""
+
+from __future__ import annotations
+
+import hashlib
+import os
+import posixpath
+import uuid
+from typing import TYPE_CHECKING, Any
+
+from nbconvert.preprocessors import Preprocessor
+
+from nbcollection.logger import logger
+
+if TYPE_CHECKING:
+    from nbformat import NotebookNode
+
+__all__ = ["AssetStore", "AssetStorePreprocessor"]
+
+
+class AssetStore:
+    """A directory of files shared by all pages, named by the hash of their content.
+
+    Outputs extracted from notebooks by nbconvert's
+    ``ExtractOutputPreprocessor`` (e.g., figures) are normally written to an
+    ``nboutput`` directory next to each page, so an image that appears in
+    several notebooks is written (and uploaded) once per notebook. With an
+    asset store, each distinct output is written once, as
+    ``<sha256><extension>``, and the pages link to it. A file that is
+    already in the store is never written again, since its name changes with
+    its content.
+
+    Parameters
+    ----------
+    path : str
+        The directory of the store, e.g., ``_assets`` in the build path. It
+        is created if needed.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+
+    @staticmethod
+    def name(data: bytes, extension: str) -> str:
+        """Get the name of a file in the store.
+
+        Parameters
+        ----------
+        data : bytes
+            The content of the file.
+        extension : str
+            The extension of the file, including the dot, e.g., ``".png"``.
+        """
+        return hashlib.sha256(data).hexdigest() + extension
+
+    def url(self, page_dir: str) -> str:
+        """Get the URL of the store relative to a page.
+
+        Parameters
+        ----------
+        page_dir : str
+            The directory of the HTML page.
+        """
+        return os.path.relpath(self.path, page_dir).replace(os.sep, "/")
+
+    def write(self, assets: dict[str, bytes]) -> int:
+        """Add files to the store.
+
+        Each file is written to a temporary file first and then hard linked
+        (or, where hard links aren't supported, renamed) to its name in the
+        store, so that other processes writing the same asset at the same
+        time never see a partial file.
+
+        Parameters
+        ----------
+        assets : dict
+            The content of the files, keyed by their name in the store (see
+            `name`).
+
+        Returns
+        -------
+        count : int
+            The number of files that were written, i.e., that weren't already
+            in the store.
+        """
+        count = 0
+        for name, data in assets.items():
+            path = os.path.join(self.path, name)
+            if os.path.exists(path):
+                continue
+            os.makedirs(self.path, exist_ok=True)
+            # Unlike with tempfile.mkstemp, the file is created with the
+            # permissions of the umask, like the pages, so that a web server
+            # running as another user can read it
+            tmp_path = os.path.join(self.path, f".tmp-{uuid.uuid4().hex}")
+            try:
+                with open(tmp_path, "xb") as f:
+                    f.write(data)
+                try:
+                    os.link(tmp_path, path)
+                except FileExistsError:
+                    # Written by another process in the meantime
+                    continue
+                except OSError:
+                    os.replace(tmp_path, path)
+            finally:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+            count += 1
+        logger.debug(f"Wrote {count} of {len(assets)} assets to {self.path}")
+        return count
+
+
+class AssetStorePreprocessor(Preprocessor):
+    """Moves the extracted outputs of a notebook to the asset store.
+
+    This preprocessor runs after ``ExtractOutputPreprocessor``. If the
+    resources have an ``asset_store_url`` (the URL of the `AssetStore`
+    relative to the page), each extracted output is removed from
+    ``resources["outputs"]``, added to ``resources["assets"]`` under its name
+    in the store, and the output is pointed to its URL in the store.
+    Otherwise, the notebook is left unchanged.
+    """
+
+    def preprocess(
+        self, nb: NotebookNode, resources: dict[str, Any]
+    ) -> tuple[NotebookNode, dict[str, Any]]:
+        """Move the extracted outputs of the notebook to the asset store."""
+        store_url = resources.get("asset_store_url")
+        if store_url is None:
+            return nb, resources
+
+        outputs = resources.get("outputs", {})
+        assets = resources.setdefault("assets", {})
+        for cell in nb.cells:
+            for output in cell.get("outputs", []):
+                filenames = output.get("metadata", {}).get("filenames", {})
+                for mime_type, filename in filenames.items():
+                    data = outputs.pop(filename, None)
+                    if data is None:
+                        continue
+                    name = AssetStore.name(data, os.path.splitext(filename)[1])
+                    assets[name] = data
+                    filenames[mime_type] = posixpath.join(store_url, name)
+        return nb, resources
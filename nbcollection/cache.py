@@ -0,0 +1,299 @@
+"""Persistent cache of executed notebooks."""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import tempfile
+from typing import Any
+
+import nbformat
+from nbconvert.preprocessors import ExecutePreprocessor
+from nbformat import NotebookNode
+
+from nbcollection import __version__
+from nbcollection.dependencies import declared_dependencies
+from nbcollection.logger import logger
+from nbcollection.manifest import hash_file
+from nbcollection.nb_io import read_notebook, writes_notebook
+
+__all__ = ["ExecutionCache", "restore_outputs"]
+
+
+class ExecutionCache:
+    """A persistent cache of executed notebooks, keyed on their content.
+
+    The cache key is a hash of everything that can change the outputs of a
+    notebook: the source of its code cells (and their tags), the kernelspec,
+    the keyword arguments passed to the ``ExecutePreprocessor`` (other than
+    those set to their default value), the nbcollection version, and the
+    content of the data files that the notebook reads. Edits to markdown cells
+    don't change the key, so they don't require the notebook to be executed
+    again.
+
+    The data files of a notebook are those declared in its metadata (see
+    `~nbcollection.dependencies.declared_dependencies`) and those that it read
+    the last time it was executed with the same code, as recorded with
+    `set_dependencies`.
+
+    Parameters
+    ----------
+    path : str
+        The directory where executed notebooks are stored.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = os.path.abspath(path)
+
+    def __repr__(self) -> str:
+        return f"ExecutionCache({self.path!r})"
+
+    def key(
+        self,
+        nb: NotebookNode,
+        execute_kwargs: dict[str, Any],
+        *,
+        path: str | None = None,
+        directory: str = "",
+    ) -> str:
+        """Compute the cache key of a source notebook.
+
+        Parameters
+        ----------
+        nb : `nbformat.NotebookNode`
+            The source (unexecuted) notebook.
+        execute_kwargs : dict
+            Keyword arguments passed through to
+            ``nbconvert.ExecutePreprocessor``.
+        path : str (optional)
+            The directory of the notebook. If set, the content of the data
+            files of the notebook is part of the key.
+        directory : str (optional)
+            The directory of the notebook relative to the root of the
+            collection, under which its recorded data files are looked up, see
+            `set_dependencies`.
+
+        Returns
+        -------
+        key : str
+            The hex digest identifying the notebook's execution.
+        """
+        code_key = self._code_key(nb, execute_kwargs)
+        if path is None:
+            return code_key
+
+        recorded = self._read_dependencies(code_key, directory)
+        files = sorted(set(recorded["files"]) | set(declared_dependencies(nb, path)))
+        if not files:
+            return code_key
+
+        hashes = self._hash_files(path, files, recorded=recorded["hashes"])
+        data = json.dumps({"code": code_key, "files": hashes}, sort_keys=True)
+        return hashlib.sha256(data.encode("utf-8")).hexdigest()
+
+    def set_dependencies(  # noqa: PLR0913
+        self,
+        nb: NotebookNode,
+        execute_kwargs: dict[str, Any],
+        *,
+        path: str,
+        files: list[str],
+        directory: str = "",
+    ) -> None:
+        """Record the data files that a notebook read when it was executed.
+
+        The files are recorded for the code of the notebook in its directory,
+        so that notebooks with the same code in other directories, which
+        read other data files, don't share them.
+
+        Parameters
+        ----------
+        nb : `nbformat.NotebookNode`
+            The notebook.
+        execute_kwargs : dict
+            Keyword arguments passed through to
+            ``nbconvert.ExecutePreprocessor``.
+        path : str
+            The directory of the notebook.
+        files : list of str
+            The data files, as POSIX paths relative to ``path``.
+        directory : str (optional)
+            The directory of the notebook relative to the root of the
+            collection, e.g., ``PurePosixPath(repo_path).parent``. Unlike
+            ``path``, it doesn't change if the collection is moved, e.g., to
+            restore the cache in another checkout.
+        """
+        code_key = self._code_key(nb, execute_kwargs)
+        files = sorted(set(files))
+        if files:
+            logger.debug(f"Notebook depends on data files: {files}")
+        # Record the hashes with the size and modification time of the files,
+        # so they don't have to be computed again to look up the notebook
+        # (unless the files change)
+        stats: dict[str, Any] = {}
+        self._hash_files(path, files, stats=stats)
+        content = {"files": files, "hashes": stats}
+        self._write_atomic(
+            self._dependencies_path(code_key, directory),
+            json.dumps(content, sort_keys=True),
+        )
+
+    def _code_key(self, nb: NotebookNode, execute_kwargs: dict[str, Any]) -> str:
+        """Compute the part of the cache key that depends on the notebook itself."""
+        content = {
+            "cells": [
+                [cell.source, cell.metadata.get("tags", [])]
+                for cell in nb.cells
+                if cell.cell_type == "code"
+            ],
+            "kernelspec": nb.metadata.get("kernelspec", {}),
+            "execute_kwargs": _non_default_kwargs(execute_kwargs),
+            "version": __version__,
+        }
+        data = json.dumps(content, sort_keys=True, default=str)
+        return hashlib.sha256(data.encode("utf-8")).hexdigest()
+
+    def _dependencies_path(self, code_key: str, directory: str) -> str:
+        name = hashlib.sha256(f"{code_key}:{directory}".encode()).hexdigest()
+        return os.path.join(self.path, f"{name}.deps.json")
+
+    def _read_dependencies(self, code_key: str, directory: str) -> dict[str, Any]:
+        try:
+            with open(
+                self._dependencies_path(code_key, directory), encoding="utf-8"
+            ) as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {"files": [], "hashes": {}}
+
+    def _hash_files(
+        self,
+        path: str,
+        files: list[str],
+        *,
+        recorded: dict[str, Any] | None = None,
+        stats: dict[str, Any] | None = None,
+    ) -> dict[str, str | None]:
+        """Hash the content of data files, or None for missing files.
+
+        Files whose size and modification time are unchanged since their
+        dependencies were recorded are not read again.
+
+        Parameters
+        ----------
+        path : str
+            The directory of the notebook.
+        files : list of str
+            The data files, relative to ``path``.
+        recorded : dict (optional)
+            The size, modification time, and hash of each file when the
+            dependencies of the notebook were recorded.
+        stats : dict (optional)
+            If set, filled with the size, modification time, and hash of
+            each file.
+        """
+        if recorded is None:
+            recorded = {}
+        hashes: dict[str, str | None] = {}
+        for file in files:
+            try:
+                st = os.stat(os.path.join(path, file))
+            except OSError:
+                hashes[file] = None
+                continue
+            size, mtime, digest = recorded.get(file, (None, None, None))
+            if (size, mtime) != (st.st_size, st.st_mtime_ns):
+                digest = hash_file(os.path.join(path, file))
+            hashes[file] = digest
+            if stats is not None:
+                stats[file] = [st.st_size, st.st_mtime_ns, digest]
+        return hashes
+
+    def entry_path(self, key: str) -> str:
+        """Get the path of the cached notebook for a key."""
+        return os.path.join(self.path, f"{key}.ipynb")
+
+    def __contains__(self, key: str) -> bool:
+        return os.path.exists(self.entry_path(key))
+
+    def get(self, key: str) -> NotebookNode | None:
+        """Get the cached executed notebook for a key, or None if missing."""
+        try:
+            # Cache entries are written by nbcollection, so they are trusted
+            return read_notebook(
+                self.entry_path(key), as_version=nbformat.NO_CONVERT, validate=False
+            )
+        except FileNotFoundError:
+            return None
+
+    def put(self, key: str, nb: NotebookNode) -> None:
+        """Store an executed notebook in the cache.
+
+        The notebook is written to a temporary file first, so that
+        concurrent readers never see a partially written entry.
+        """
+        self._write_atomic(self.entry_path(key), writes_notebook(nb, validate=False))
+
+    def _write_atomic(self, path: str, content: str) -> None:
+        """Write a file in the cache through a temporary file."""
+        os.makedirs(self.path, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=self.path, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                f.write(content)
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.remove(tmp_path)
+            raise
+
+
+def _non_default_kwargs(execute_kwargs: dict[str, Any]) -> dict[str, Any]:
+    """Drop the execution options that are set to their default value.
+
+    Commands pass either no options or all of them with their defaults, which
+    execute notebooks the same way, so they must have the same cache key.
+    """
+    traits = ExecutePreprocessor.class_traits()
+    return {
+        name: value
+        for name, value in execute_kwargs.items()
+        if name not in traits or value != traits[name].default_value
+    }
+
+
+def restore_outputs(nb: NotebookNode, cached_nb: NotebookNode) -> NotebookNode:
+    """Copy the outputs of a cached executed notebook into a source notebook.
+
+    The notebooks must have the same cache key, so their code cells match
+    one-to-one. Markdown cells and notebook metadata are kept from the
+    source notebook, except for the execution timing that nbclient records in
+    each code cell and its execution profile (see
+    `~nbcollection.profiling.CellProfiler`), so that the notebook is the same
+    as when it was executed.
+
+    Parameters
+    ----------
+    nb : `nbformat.NotebookNode`
+        The source notebook, modified in place.
+    cached_nb : `nbformat.NotebookNode`
+        The cached executed notebook.
+
+    Returns
+    -------
+    nb : `nbformat.NotebookNode`
+        The source notebook with the outputs restored.
+    """
+    code_cells = [c for c in nb.cells if c.cell_type == "code"]
+    cached_cells = [c for c in cached_nb.cells if c.cell_type == "code"]
+    for cell, cached_cell in zip(code_cells, cached_cells):
+        cell.outputs = cached_cell.outputs
+        cell.execution_count = cached_cell.execution_count
+        for key in ("execution", "nbcollection"):
+            if key in cached_cell.metadata:
+                cell.metadata[key] = cached_cell.metadata[key]
+
+    if "language_info" in cached_nb.metadata:
+        nb.metadata.language_info = cached_nb.metadata.language_info
+
+    return nb
@@ -2,5 +2,9 @@
 
 from .convert import convert
 from .execute import execute
+from .merge import merge
+from .plan import plan
+from .serve import serve
+from .status import status
 
-__all__ = ["convert", "execute"]
+__all__ = ["convert", "execute", "merge", "plan", "serve", "status"]
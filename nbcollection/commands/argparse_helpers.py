@@ -5,10 +5,12 @@ import sys
 from argparse import ArgumentParser
 
 import traitlets
+from nbconvert.preprocessors import ExecutePreprocessor
 
 from nbcollection.config import NbcollectionConfig
 from nbcollection.converter import NbcollectionConverter
 from nbcollection.logger import logger
+from nbcollection.memory import parse_memory
 
 _trait_type_map = {traitlets.Unicode: str, traitlets.Int: int, traitlets.Bool: bool}
 
@@ -106,6 +108,39 @@ def get_parser(description):
         "the target path, used to include files",
     )
 
+    parser.add_argument(
+        "--discovery-index",
+        action="store_true",
+        dest="discovery_index",
+        default=False,
+        help="Keep an index of the notebooks in each directory, in the build "
+        "path, so that directories that didn't change since the last build "
+        "aren't listed again.",
+    )
+
+    parser.add_argument(
+        "--no-cache",
+        action="store_false",
+        dest="cache",
+        help="Don't use the execution cache. Without the cache, an existing "
+        "executed notebook is reused unless --overwrite is set.",
+    )
+
+    parser.add_argument(
+        "--cache-path",
+        dest="cache_path",
+        help="The directory of the execution cache. If not specified, the "
+        "cache is stored in .nbcollection_cache inside the build path.",
+    )
+
+    parser.add_argument(
+        "--no-validate",
+        action="store_false",
+        dest="validate",
+        help="Don't validate notebooks against the notebook format schema when "
+        "reading and writing them. This saves time on large, trusted notebooks.",
+    )
+
     vq_group = parser.add_mutually_exclusive_group()
     vq_group.add_argument(
         "-v", "--verbose", action="count", default=0, dest="verbosity"
@@ -115,6 +150,108 @@ def get_parser(description):
     return parser
 
 
+def add_jobs_argument(parser):
+    """Add the option to set the number of notebooks executed in parallel."""
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        dest="jobs",
+        default=1,
+        type=int,
+        help="The number of notebooks to execute in parallel (default is 1).",
+    )
+
+
+def add_execution_arguments(parser):
+    """Add the options of how notebooks are executed to a parser."""
+    add_jobs_argument(parser)
+
+    parser.add_argument(
+        "--engine",
+        dest="engine",
+        choices=["process", "async"],
+        default="process",
+        help="How notebooks are executed in parallel: in a pool of worker "
+        "processes ('process', default), or from one asyncio event loop driving "
+        "many kernels ('async').",
+    )
+
+    parser.add_argument(
+        "--max-memory",
+        dest="max_memory",
+        default=None,
+        type=parse_memory,
+        help="The total memory budget of the notebooks executed in parallel, "
+        "e.g., 16G. Notebooks are only started if the peak memory of their "
+        "kernel in previous builds fits in the budget next to the running "
+        "notebooks.",
+    )
+
+    parser.add_argument(
+        "--kernel-pool",
+        dest="kernel_pool",
+        choices=["restart", "reset"],
+        default=None,
+        help="Execute notebooks with warm kernels from a pool, started once per "
+        "kernelspec. With 'restart', each notebook gets a fresh kernel that was "
+        "started in the background while the previous notebook ran. With "
+        "'reset', kernels are reused after clearing their namespace, so "
+        "imported modules stay loaded.",
+    )
+
+    parser.add_argument(
+        "--cell-time-budget",
+        dest="cell_time_budget",
+        default=None,
+        type=float,
+        help="Log a warning for each cell that takes longer than this time to "
+        "execute, in seconds.",
+    )
+
+    parser.add_argument(
+        "--slow-cells",
+        dest="slow_cells",
+        default=10,
+        type=int,
+        help="The number of cells listed in the report of the slowest cells of the "
+        "collection, in the timing report (default is 10).",
+    )
+
+
+def add_execute_trait_arguments(parser):
+    """Add the options passed through to the ``ExecutePreprocessor`` to a parser."""
+    for trait_name in execute_trait_names:
+        trait = getattr(ExecutePreprocessor, trait_name)
+        parser.add_argument(
+            "--" + trait_name.replace("_", "-"),
+            default=trait.default_value,
+            type=_trait_type_map[type(trait)],
+            help=trait.help,
+        )
+
+
+def add_shard_arguments(parser):
+    """Add the options to select one shard of the collection to a parser."""
+    parser.add_argument(
+        "--shard",
+        dest="shard",
+        default=None,
+        help="Only build one shard of the collection, given as K/N for the K-th "
+        "of N shards, e.g., to split the collection across N machines. Combine "
+        "the builds with `nbcollection merge`.",
+    )
+
+    parser.add_argument(
+        "--balance-shards",
+        dest="balance_shards",
+        default=False,
+        action="store_true",
+        help="Assign notebooks to shards so that the shards take about the same "
+        "time, based on previous execution times in the build manifest. All "
+        "shards must have the same build manifest.",
+    )
+
+
 def get_converter(args):
     """Create an NbcollectionConverter instance from the CLI configuration."""
     kw = {}
@@ -4,8 +4,12 @@ import sys
 
 from nbconvert.exporters import HTMLExporter
 
+from nbcollection.logger import logger
+
 from .argparse_helpers import (
     _trait_type_map,
+    add_execution_arguments,
+    add_shard_arguments,
     convert_trait_names,
     get_converter,
     get_parser,
@@ -19,6 +23,8 @@ def convert(args=None):
     args = args or sys.argv
 
     parser = get_parser(DESCRIPTION)
+    add_execution_arguments(parser)
+    add_shard_arguments(parser)
 
     # Specific to this command:
     parser.add_argument(
@@ -46,6 +52,88 @@ def convert(args=None):
         "nbconvert.preprocessors.ExtractOutputPreprocessor",
     )
 
+    parser.add_argument(
+        "--convert-jobs",
+        dest="convert_jobs",
+        default=1,
+        type=int,
+        help="The number of notebooks to convert to HTML in parallel "
+        "(default is 1).",
+    )
+
+    parser.add_argument(
+        "--pipeline",
+        dest="pipeline",
+        default=False,
+        action="store_true",
+        help="Convert each notebook to HTML as soon as it has been executed, "
+        "while the other notebooks are still running.",
+    )
+
+    parser.add_argument(
+        "--asset-store",
+        dest="asset_store",
+        default=False,
+        action="store_true",
+        help="Write the outputs extracted from the notebooks (e.g., figures) once "
+        "per distinct content to the _assets directory of the build path, with "
+        "the pages linking to it, instead of an nboutput directory per page.",
+    )
+
+    parser.add_argument(
+        "--optimize-images",
+        dest="optimize_images",
+        default=False,
+        action="store_true",
+        help="Losslessly re-compress the PNG images of the notebooks before "
+        "converting them to HTML. Requires the Pillow package.",
+    )
+
+    parser.add_argument(
+        "--image-max-size",
+        dest="image_max_size",
+        default=None,
+        type=int,
+        help="With --optimize-images, downsample images larger than this width "
+        "or height, in pixels.",
+    )
+
+    parser.add_argument(
+        "--webp",
+        dest="webp_images",
+        default=False,
+        action="store_true",
+        help="With --optimize-images, add WebP versions of the images, used by "
+        "the browsers that support them.",
+    )
+
+    parser.add_argument(
+        "--search-index",
+        dest="search_index",
+        default=False,
+        action="store_true",
+        help="Write a search index of the pages to the _search directory of the "
+        "build path, split into small files for client-side search.",
+    )
+
+    parser.add_argument(
+        "--watch",
+        dest="watch",
+        default=False,
+        action="store_true",
+        help="After the build, keep running and rebuild each notebook (and the "
+        "index page, with --make-index) whenever it changes.",
+    )
+
+    parser.add_argument(
+        "--poll",
+        dest="polling",
+        default=False,
+        action="store_true",
+        help="With --watch, poll the notebooks for changes, e.g., on network file "
+        "systems. This is the default if the watchdog package isn't installed.",
+    )
+
     parser.add_argument(
         "--github-url",
         dest="github_repo_url",
@@ -84,7 +172,24 @@ def convert(args=None):
 
     args = parser.parse_args(args[2:])
     nbcollection = get_converter(args)
-    nbcollection.convert()
+    try:
+        nbcollection.convert(
+            jobs=args.jobs,
+            engine=args.engine,
+            convert_jobs=args.convert_jobs,
+            pipeline=args.pipeline,
+        )
+    except RuntimeError as e:
+        if not args.watch:
+            raise
+        # Keep watching, so that the failing notebooks can be fixed
+        logger.error(str(e))
 
     if args.make_index:
         nbcollection.make_html_index(args.index_template)
+
+    if args.watch:
+        nbcollection.watch(
+            index_template=args.index_template if args.make_index else None,
+            polling=args.polling,
+        )
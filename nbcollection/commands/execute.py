@@ -2,11 +2,10 @@
 
 import sys
 
-from nbconvert.preprocessors import ExecutePreprocessor
-
 from .argparse_helpers import (
-    _trait_type_map,
-    execute_trait_names,
+    add_execute_trait_arguments,
+    add_execution_arguments,
+    add_shard_arguments,
     get_converter,
     get_parser,
 )
@@ -19,17 +18,10 @@ def execute(args=None):
     args = args or sys.argv
 
     parser = get_parser(DESCRIPTION)
-
-    # Specific to this command:
-    for trait_name in execute_trait_names:
-        trait = getattr(ExecutePreprocessor, trait_name)
-        parser.add_argument(
-            "--" + trait_name.replace("_", "-"),
-            default=trait.default_value,
-            type=_trait_type_map[type(trait)],
-            help=trait.help,
-        )
+    add_execution_arguments(parser)
+    add_shard_arguments(parser)
+    add_execute_trait_arguments(parser)
 
     args = parser.parse_args(args[2:])
     nbcollection = get_converter(args)
-    nbcollection.execute()
+    nbcollection.execute(jobs=args.jobs, engine=args.engine)
@@ -0,0 +1,50 @@
+"""The nbcollection merge command."""
+
+import sys
+
+from .argparse_helpers import get_converter, get_parser
+
+DESCRIPTION = (
+    "Combine the builds of the shards of a collection of notebooks, built with "
+    "--shard, into one build directory"
+)
+
+
+def merge(args=None):
+    """Run the merge command."""
+    args = args or sys.argv
+
+    parser = get_parser(DESCRIPTION)
+
+    # Specific to this command:
+    parser.add_argument(
+        "--from",
+        dest="shard_builds",
+        nargs="+",
+        required=True,
+        help="The build directories (the _build directories) of the shards.",
+    )
+
+    parser.add_argument(
+        "--index-template",
+        dest="index_template",
+        default=None,
+        type=str,
+        help="A jinja2 template file used to create the index page.",
+    )
+
+    parser.add_argument(
+        "--make-index",
+        dest="make_index",
+        default=False,
+        action="store_true",
+        help="Controls whether to make an index page that "
+        "lists all of the converted notebooks.",
+    )
+
+    args = parser.parse_args(args[2:])
+    nbcollection = get_converter(args)
+    nbcollection.merge(args.shard_builds)
+
+    if args.make_index:
+        nbcollection.make_html_index(args.index_template)
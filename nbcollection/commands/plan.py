@@ -0,0 +1,59 @@
+"""The nbcollection plan command."""
+
+import sys
+
+from .argparse_helpers import (
+    add_execute_trait_arguments,
+    add_jobs_argument,
+    add_shard_arguments,
+    get_converter,
+    get_parser,
+)
+from .status import format_duration, format_estimate, format_table
+
+DESCRIPTION = (
+    "Show what converting a collection of notebooks would do, without executing them"
+)
+
+
+def plan(args=None):
+    """Run the plan command."""
+    args = args or sys.argv
+
+    parser = get_parser(DESCRIPTION)
+    add_jobs_argument(parser)
+    add_shard_arguments(parser)
+    # The execution options are part of the execution cache key
+    add_execute_trait_arguments(parser)
+    args = parser.parse_args(args[2:])
+    nbcollection = get_converter(args)
+    statuses = nbcollection.status()
+
+    rows = [
+        [s.name, s.execute, s.convert, format_duration(s.estimated_time)]
+        for s in statuses
+    ]
+    sys.stdout.write(format_table(["Notebook", "Execute", "Convert", "Estimate"], rows))
+
+    counts = {
+        "to execute": sum(s.execute == "execute" for s in statuses),
+        "to restore from the cache": sum(s.execute == "restore" for s in statuses),
+        "to convert": sum(s.convert == "convert" for s in statuses),
+    }
+    sys.stdout.write(
+        "\n"
+        + ", ".join(f"{count} {action}" for action, count in counts.items())
+        + f". {format_estimate([s for s in statuses if s.state != 'error'])}.\n"
+    )
+    for s in statuses:
+        if s.state == "error":
+            error = s.error.strip().splitlines()[-1]
+            sys.stdout.write(f"Notebook '{s.name}' can't be read: {error}\n")
+
+    # The time to execute the notebooks in parallel, longest first
+    _, predicted_makespan = nbcollection.schedule(jobs=args.jobs)
+    if predicted_makespan is not None:
+        sys.stdout.write(
+            f"Predicted execution time with {args.jobs} jobs: "
+            f"{predicted_makespan:.1f} seconds.\n"
+        )
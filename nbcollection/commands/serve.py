@@ -0,0 +1,66 @@
+"""The nbcollection serve command."""
+
+import sys
+
+from nbcollection.server import PreviewServer
+
+from .argparse_helpers import add_execution_arguments, get_converter, get_parser
+
+DESCRIPTION = (
+    "Preview a collection of Jupyter notebooks from a local web server, "
+    "rendering each page when it is first requested"
+)
+
+
+def serve(args=None):
+    """Run the serve command."""
+    args = args or sys.argv
+
+    parser = get_parser(DESCRIPTION)
+    add_execution_arguments(parser)
+
+    # Specific to this command:
+    parser.add_argument(
+        "--host",
+        dest="host",
+        default="127.0.0.1",
+        type=str,
+        help="The address to listen on (default is 127.0.0.1, only accepting "
+        "local connections).",
+    )
+
+    parser.add_argument(
+        "--port",
+        dest="port",
+        default=8000,
+        type=int,
+        help="The port to listen on (default is 8000).",
+    )
+
+    parser.add_argument(
+        "--page-cache-size",
+        dest="page_cache_size",
+        default=64,
+        type=int,
+        help="The maximum number of rendered pages kept in memory (default is 64).",
+    )
+
+    parser.add_argument(
+        "--no-prerender",
+        dest="prerender",
+        default=True,
+        action="store_false",
+        help="Only render the pages that are requested, instead of rendering "
+        "all missing or stale pages in the background.",
+    )
+
+    args = parser.parse_args(args[2:])
+    nbcollection = get_converter(args)
+    server = PreviewServer(
+        nbcollection,
+        host=args.host,
+        port=args.port,
+        cache_size=args.page_cache_size,
+        prerender=args.prerender,
+    )
+    server.serve_forever()
@@ -0,0 +1,94 @@
+"""The nbcollection status command."""
+
+import datetime
+import re
+import sys
+
+from .argparse_helpers import (
+    add_execute_trait_arguments,
+    add_shard_arguments,
+    get_converter,
+    get_parser,
+)
+
+DESCRIPTION = (
+    "Report which notebooks in a collection are new, stale, failed, or up to "
+    "date, without executing them"
+)
+
+_ANSI_ESCAPE_RE = re.compile(r"\x1b\[[0-9;]*m")
+
+
+def format_table(header, rows):
+    """Format rows of strings as a plain-text table with aligned columns."""
+    widths = [max(len(row[i]) for row in [header, *rows]) for i in range(len(header))]
+    lines = [
+        "  ".join(cell.ljust(width) for cell, width in zip(row, widths)).rstrip()
+        for row in [header, *rows]
+    ]
+    return "\n".join(lines) + "\n"
+
+
+def format_duration(seconds):
+    """Format a duration in seconds, or '?' if it is unknown."""
+    if seconds is None:
+        return "?"
+    return f"{seconds:.1f} s"
+
+
+def format_estimate(statuses):
+    """Format the estimated total rebuild time of notebooks."""
+    times = [s.estimated_time for s in statuses]
+    total = sum(t for t in times if t is not None)
+    unknown = sum(t is None for t in times)
+    estimate = f"Estimated rebuild time: {total:.1f} seconds"
+    if unknown:
+        estimate += f" (not including {unknown} notebooks without build history)"
+    return estimate
+
+
+def status(args=None):
+    """Run the status command."""
+    args = args or sys.argv
+
+    parser = get_parser(DESCRIPTION)
+    add_shard_arguments(parser)
+    # The execution options are part of the execution cache key
+    add_execute_trait_arguments(parser)
+    args = parser.parse_args(args[2:])
+    nbcollection = get_converter(args)
+    statuses = nbcollection.status()
+
+    rows = []
+    for s in statuses:
+        built_at = s.record.built_at if s.record is not None else None
+        if built_at is None:
+            last_built = "never"
+        else:
+            last_built = (
+                datetime.datetime.fromtimestamp(built_at, tz=datetime.timezone.utc)
+                .astimezone()
+                .strftime("%Y-%m-%d %H:%M")
+            )
+        details = ""
+        if s.state == "error":
+            details = s.error.strip().splitlines()[-1]
+        elif s.state == "failed":
+            # The last line of the error, e.g., the exception of the failing cell
+            error = s.record.execute_error or s.record.convert_error or ""
+            error = _ANSI_ESCAPE_RE.sub("", error).strip()
+            details = error.splitlines()[-1] if error else ""
+        rows.append([s.name, s.state, last_built, details])
+    sys.stdout.write(format_table(["Notebook", "Status", "Last built", ""], rows))
+
+    counts = {
+        state: sum(s.state == state for s in statuses)
+        for state in ("up to date", "stale", "failed", "new", "error")
+    }
+    # The rebuild time of notebooks that can't be read is unknown
+    rebuild = [s for s in statuses if s.state not in ("up to date", "error")]
+    sys.stdout.write(
+        "\n"
+        + ", ".join(f"{count} {state}" for state, count in counts.items())
+        + f". {format_estimate(rebuild)}.\n"
+    )
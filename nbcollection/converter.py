@@ -1,17 +1,42 @@
 """The nbcollection converter."""
 
 # Standard library
+import asyncio
 import os
 import re
-from pathlib import Path
+import statistics
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from pathlib import Path, PurePosixPath
 
 # Third-party
 import jinja2
+from jupyter_core.utils import run_sync
 
 # Package
-from nbcollection.logger import logger
-from nbcollection.nb_helpers import get_title
+from nbcollection.assets import AssetStore
+from nbcollection.cache import ExecutionCache
+from nbcollection.discovery import discover_notebooks
+from nbcollection.images import ImageOptimizer
+from nbcollection.kernels import KernelPool, get_worker_kernel_pool
+from nbcollection.logger import buffered_logs, logger
+from nbcollection.manifest import (
+    BuildManifest,
+    NotebookRecord,
+    NotebookStatus,
+    hash_file,
+)
+from nbcollection.memory import format_memory
+from nbcollection.metadata import read_metadata, write_metadata
+from nbcollection.nb_helpers import get_index_metadata
+from nbcollection.nb_io import read_notebook
 from nbcollection.notebook import NbcollectionNotebook
+from nbcollection.profiling import slowest_cells
+from nbcollection.scheduler import AdmissionQueue, longest_first, predict_makespan
+from nbcollection.search import notebook_sections, write_search_index
+from nbcollection.sharding import assign_shards, merge_builds, parse_shard
+from nbcollection.timing import write_timing_report
+from nbcollection.watch import NotebookWatcher
 
 from .config import NbcollectionConfig
 
@@ -41,7 +66,12 @@ def get_output_path(nb_path, build_path, *, relative_root_path=None, flatten=Fal
         The path of the output file in the build directory.
     """
     if relative_root_path is not None:
-        common_prefix = os.path.commonpath([nb_path, relative_root_path])
+        # The paths may be relative to the working directory, e.g., the
+        # collection given on the command line, or absolute, e.g., notebooks
+        # reported by the watcher
+        common_prefix = os.path.commonpath(
+            [os.path.abspath(nb_path), os.path.abspath(relative_root_path)]
+        )
         if common_prefix == "/":
             # If there is no common prefix, write all notebooks directly to
             # the build directory. This is useful for testing and, e.g.,
@@ -49,7 +79,7 @@ def get_output_path(nb_path, build_path, *, relative_root_path=None, flatten=Fal
             relative_path = ""
             # TODO: should we warn?
         else:
-            relative_path = os.path.relpath(nb_path, common_prefix)
+            relative_path = os.path.relpath(os.path.abspath(nb_path), common_prefix)
     else:
         relative_path = ""
 
@@ -57,10 +87,75 @@ def get_output_path(nb_path, build_path, *, relative_root_path=None, flatten=Fal
         full_build_path = build_path
     else:
         full_build_path = os.path.abspath(os.path.join(build_path, relative_path))
-    os.makedirs(full_build_path, exist_ok=True)
+    # The directory is created when the first file is written to it
     return full_build_path
 
 
+def _execute_notebook(nb, log_level, kernel_pool=None):
+    """Execute a notebook in a worker process.
+
+    Parameters
+    ----------
+    nb : `nbcollection.notebook.NbcollectionNotebook`
+        The notebook to execute.
+    log_level : int
+        The log level of the main process.
+    kernel_pool : str (optional)
+        The reset policy of the worker's kernel pool, or None to not use a
+        kernel pool.
+
+    Returns
+    -------
+    records : list of `logging.LogRecord`
+        The log records emitted while executing the notebook.
+    exception : Exception or None
+        The exception raised while executing the notebook, if any.
+    summary : dict
+        The summary of the executed notebook.
+    """
+    exception = None
+    with buffered_logs(log_level) as records:
+        try:
+            if kernel_pool is not None:
+                nb.execute(kernel_pool=get_worker_kernel_pool(kernel_pool))
+            else:
+                nb.execute()
+        except Exception as e:
+            exception = e
+    return records, exception, nb.summary
+
+
+def _convert_notebook(nb, log_level):
+    """Convert an executed notebook to HTML in a worker process.
+
+    Each worker process keeps its own HTML exporter, which is reused for all
+    of the notebooks it converts.
+
+    Parameters
+    ----------
+    nb : `nbcollection.notebook.NbcollectionNotebook`
+        The notebook to convert.
+    log_level : int
+        The log level of the main process.
+
+    Returns
+    -------
+    records : list of `logging.LogRecord`
+        The log records emitted while converting the notebook.
+    exception : Exception or None
+        The exception raised while converting the notebook, if any.
+    summary : dict
+        The summary of the converted notebook.
+    """
+    exception = None
+    with buffered_logs(log_level) as records:
+        try:
+            nb.convert(execute=False)
+        except Exception as e:
+            exception = e
+    return records, exception, nb.summary
+
+
 class NbcollectionConverter:
     """A class that executes and converting a collection of notebooks.
 
@@ -70,9 +165,86 @@ class NbcollectionConverter:
         Either a string path to a single notebook, a path to a collection of
         notebooks, or an iterable containing individual notebook files.
     overwrite : bool (optional)
+    cache : bool (optional)
+        Whether to use the execution cache, so that notebooks are only
+        executed again when their code, kernel, or execution options change.
+        Default is True.
+    cache_path : str (optional)
+        The directory of the execution cache. Default is
+        ``.nbcollection_cache`` inside the build path.
+    kernel_pool : str (optional)
+        If set, notebooks are executed with warm kernels from a
+        `~nbcollection.kernels.KernelPool` instead of starting a new kernel
+        for each notebook. The value is the policy for resetting kernels
+        between notebooks, either ``"restart"`` or ``"reset"``. Default is
+        None, not using a kernel pool.
+    validate : bool (optional)
+        Whether to validate notebooks against the notebook format schema when
+        they are read and written. Default is True.
+    shard : str (optional)
+        If set, only the notebooks of one shard of the collection are
+        executed and converted, given as ``"K/N"`` for the K-th of N shards.
+        Each notebook is in exactly one shard, and the shards of a collection
+        don't change between machines, so the collection can be built by N
+        machines and the builds combined with `merge`. See
+        `~nbcollection.sharding.assign_shards`.
+    balance_shards : bool (optional)
+        Whether to assign the notebooks to shards so that the shards have
+        about the same total execution time, based on the build manifest.
+        All shards must then have the same build manifest, e.g., a merged
+        manifest restored from a previous build. Default is False, assigning
+        notebooks to shards from a hash of their path.
+    cell_time_budget : float (optional)
+        If set, a warning is logged for each cell that takes longer than this
+        time to execute, in seconds.
+    slow_cells : int (optional)
+        The number of cells listed in the report of the slowest cells of the
+        collection, in the timing report. Default is 10.
+    max_memory : int (optional)
+        The total memory budget of the notebooks executed in parallel, in
+        bytes. Notebooks are started only if the peak memory of their kernel
+        in previous builds, recorded in the build manifest, fits in the budget
+        next to the notebooks that are running. Default is no budget.
+    asset_store : bool (optional)
+        Whether to write the outputs extracted from the notebooks (e.g.,
+        figures) once per distinct content to the ``_assets`` directory of
+        the build path, and link the pages to it. Default is False, writing
+        the outputs of each notebook to an ``nboutput`` directory next to its
+        page. See `~nbcollection.assets.AssetStore`.
+    optimize_images : bool (optional)
+        Whether to optimize the PNG images of the executed notebooks before
+        converting them to HTML. This requires the Pillow package. The
+        optimized images are cached in the ``images`` directory of the
+        execution cache. See `~nbcollection.images.ImageOptimizer`.
+    image_max_size : int (optional)
+        If ``optimize_images`` is True, the maximum width and height of the
+        images, in pixels. Larger images are downsampled.
+    webp_images : bool (optional)
+        If ``optimize_images`` is True, whether to add WebP versions of the
+        images to the pages.
+    discovery_index : bool (optional)
+        Whether to keep an index of the notebooks in each directory of the
+        source tree, in the build path, so that directories that weren't
+        modified since the last build aren't listed again. See
+        `~nbcollection.discovery.discover_notebooks`.
+    search_index : bool (optional)
+        Whether to write a search index of the pages to the ``_search``
+        directory of the build path, for client-side search. The index
+        entries of each page are computed when it is converted, and reused
+        in later builds while the page doesn't change. See
+        `~nbcollection.search`.
     """
 
     build_dir_name = "_build"
+    cache_dir_name = ".nbcollection_cache"
+    asset_dir_name = "_assets"
+    manifest_name = ".nbcollection_manifest.db"
+    timing_report_name = "nbcollection_timings"
+    index_name = ".nbcollection_index.json"
+    metadata_name = "nbcollection_metadata.json"
+    search_dir_name = "_search"
+    search_data_name = ".nbcollection_search.json"
+    engines = ("process", "async")
 
     def __init__(
         self,
@@ -87,6 +259,21 @@ class NbcollectionConverter:
         execute_kwargs=None,
         convert_kwargs=None,
         convert_preprocessors=None,
+        cache=True,
+        cache_path=None,
+        kernel_pool=None,
+        validate=True,
+        shard=None,
+        balance_shards=False,
+        cell_time_budget=None,
+        slow_cells=10,
+        max_memory=None,
+        asset_store=False,
+        optimize_images=False,
+        image_max_size=None,
+        webp_images=False,
+        discovery_index=False,
+        search_index=False,
         **kwargs,  # noqa: ARG002
     ) -> None:
         self._config = config
@@ -126,84 +313,79 @@ class NbcollectionConverter:
         else:
             build_path = os.path.join(build_path, self.build_dir_name)
 
+        store = (
+            AssetStore(os.path.join(build_path, self.asset_dir_name))
+            if asset_store
+            else None
+        )
+
+        if cache_path is None:
+            cache_path = os.path.join(build_path, self.cache_dir_name)
+        execution_cache = ExecutionCache(cache_path) if cache else None
+
+        if optimize_images:
+            image_optimizer = ImageOptimizer(
+                os.path.join(cache_path, "images"),
+                max_size=image_max_size,
+                webp=webp_images,
+            )
+        else:
+            image_optimizer = None
+
+        manifest = BuildManifest(os.path.join(build_path, self.manifest_name))
+
+        self.flatten = flatten
+        self.build_path = build_path
+        self._include_pattern = include_pattern
+        self._exclude_pattern = exclude_pattern
+        self._notebook_kwargs = {
+            "config": self._config,
+            "overwrite": overwrite,
+            "execute_kwargs": execute_kwargs,
+            "convert_kwargs": convert_kwargs,
+            "convert_preprocessors": convert_preprocessors,
+            "cache": execution_cache,
+            "validate": validate,
+            "cell_time_budget": cell_time_budget,
+            "asset_store": store,
+            "image_optimizer": image_optimizer,
+            "search_index": search_index,
+            "manifest": manifest,
+        }
+
+        discover_start = time.perf_counter()
+        index_path = (
+            os.path.join(build_path, self.index_name) if discovery_index else None
+        )
         nbs = []
         for notebook in notebooks:
             if os.path.isdir(notebook):
                 # It's a directory, so we need to walk through recursively and
                 # collect any notebook files
-                for root, dirs, files in os.walk(notebook):
-                    for d in dirs:
-                        if d.startswith((".", "_")):
-                            # calling remove here actually modifies the paths
-                            # that os.walk will recursively explore
-                            dirs.remove(d)
-
-                    for name in files:
-                        basename, ext = os.path.splitext(name)
-                        file_path = os.path.join(root, name)
-
-                        if exclude_pattern is not None and re.search(
-                            exclude_pattern, name
-                        ):
-                            continue
-
-                        if (
-                            include_pattern is not None
-                            and re.search(include_pattern, name) is None
-                        ):
-                            continue
-
-                        if ext == ".ipynb":
-                            # repo_path is the path to the notebook file
-                            # relative to the root repository directory
-                            repo_path = (
-                                Path(file_path)
-                                .resolve()
-                                .relative_to(self._root_source_dir)
-                                .as_posix()
-                            )
-                            nb = NbcollectionNotebook(
-                                file_path,
-                                output_path=get_output_path(
-                                    file_path,
-                                    build_path=build_path,
-                                    relative_root_path=self._relative_root_path,
-                                    flatten=flatten,
-                                ),
-                                config=self._config,
-                                repo_path=repo_path,
-                                overwrite=overwrite,
-                                execute_kwargs=execute_kwargs,
-                                convert_kwargs=convert_kwargs,
-                                convert_preprocessors=convert_preprocessors,
-                            )
-                            nbs.append(nb)
+                root_repo_path = PurePosixPath(
+                    Path(notebook).resolve().relative_to(self._root_source_dir)
+                )
+                for relative_path in discover_notebooks(
+                    notebook,
+                    include_pattern=include_pattern,
+                    exclude_pattern=exclude_pattern,
+                    index_path=index_path,
+                ):
+                    nb_start = time.perf_counter()
+                    # repo_path is the path to the notebook file relative to
+                    # the root repository directory
+                    nb = self._create_notebook(
+                        os.path.join(notebook, *relative_path.split("/")),
+                        repo_path=(root_repo_path / relative_path).as_posix(),
+                    )
+                    nb.summary["timings"]["discover"] = time.perf_counter() - nb_start
+                    nbs.append(nb)
 
             elif os.path.isfile(notebook):
                 # It's a single file:
-
-                # repo_path is the path to the notebook file
-                # relative to the root repository directory
-                repo_path = (
-                    Path(notebook)
-                    .resolve()
-                    .relative_to(self._root_source_dir)
-                    .as_posix()
-                )
-                nb = NbcollectionNotebook(
-                    notebook,
-                    output_path=get_output_path(
-                        notebook,
-                        build_path=build_path,
-                        relative_root_path=self._relative_root_path,
-                        flatten=flatten,
-                    ),
-                    config=self._config,
-                    repo_path=repo_path,
-                    overwrite=overwrite,
-                    execute_kwargs=execute_kwargs,
-                    convert_kwargs=convert_kwargs,
-                )
+                nb_start = time.perf_counter()
+                nb = self._create_notebook(notebook)
+                nb.summary["timings"]["discover"] = time.perf_counter() - nb_start
                 nbs.append(nb)
 
             else:
@@ -213,23 +395,718 @@ class NbcollectionConverter:
                 )
                 raise ValueError(msg)
 
+        self._discover_time = time.perf_counter() - discover_start
         logger.info(f"Collected {len(nbs)} notebook files")
         logger.debug(f"Executed/converted notebooks will be saved in: {build_path}")
 
         self.notebooks = nbs
-        self.flatten = flatten
-        self.build_path = build_path
+        self._sources = [os.path.abspath(notebook) for notebook in notebooks]
+        self.cache = execution_cache
+        self.asset_store = store
+        self.search_index = search_index
+        self.kernel_pool = kernel_pool
+        self.slow_cells = slow_cells
+        self.max_memory = max_memory
+        self.manifest = manifest
+
+        if shard is not None:
+            self.notebooks = self._select_shard(shard, balance=balance_shards)
+
+    def _create_notebook(self, file_path, *, repo_path=None):
+        """Create a notebook of the collection.
+
+        Parameters
+        ----------
+        file_path : str
+            The path to the notebook file.
+        repo_path : str (optional)
+            The path to the notebook file relative to the root repository
+            directory. Default is to compute it from ``file_path``.
+        """
+        if repo_path is None:
+            repo_path = (
+                Path(file_path).resolve().relative_to(self._root_source_dir).as_posix()
+            )
+        return NbcollectionNotebook(
+            file_path,
+            output_path=get_output_path(
+                file_path,
+                build_path=self.build_path,
+                relative_root_path=self._relative_root_path,
+                flatten=self.flatten,
+            ),
+            repo_path=repo_path,
+            **self._notebook_kwargs,
+        )
+
+    def execute(self, *, stop_on_error=False, jobs=1, engine="process"):
+        """Execute all notebooks in the collection.
+
+        Parameters
+        ----------
+        stop_on_error : bool (optional)
+            Whether to stop at the first notebook that raises an exception,
+            rather than executing all notebooks and reporting all errors at
+            the end.
+        jobs : int (optional)
+            The number of notebooks to execute at the same time. Default is 1,
+            executing notebooks one after another.
+        engine : str (optional)
+            How notebooks are executed at the same time when ``jobs`` is more
+            than one. With ``"process"`` (default), each notebook is executed
+            in a pool of worker processes. With ``"async"``, all kernels are
+            driven from one event loop in this process, see `execute_async`.
+        """
+        try:
+            exceptions = self._execute(
+                stop_on_error=stop_on_error, jobs=jobs, engine=engine
+            )
+            self._raise_for_exceptions(exceptions)
+        finally:
+            self._record_build()
+
+    def _execute(self, *, stop_on_error, jobs, engine):
+        """Execute the notebooks and collect their errors.
+
+        The build is not recorded, so that `convert` records it once after
+        converting the notebooks.
+
+        Returns
+        -------
+        exceptions : dict
+            The exceptions raised by the notebooks, keyed by notebook filename
+            and in the order of ``self.notebooks``.
+        """
+        self._check_jobs(jobs)
+        self._check_engine(engine)
+
+        if engine == "async":
+            return run_sync(self._execute_async)(
+                jobs=jobs, stop_on_error=stop_on_error, on_executed=None
+            )
+
+        if jobs > 1:
+            notebooks, predicted_makespan = self.schedule(jobs=jobs)
+            start = time.monotonic()
+            try:
+                return self._run_parallel(
+                    _execute_notebook,
+                    self.kernel_pool,
+                    jobs=jobs,
+                    stop_on_error=stop_on_error,
+                    notebooks=notebooks,
+                    max_memory=self.max_memory,
+                )
+            finally:
+                self._report_makespan(start, predicted_makespan, jobs=jobs)
+
+        exceptions = {}
+        pool = self._create_kernel_pool()
+        try:
+            for nb in self.notebooks:
+                try:
+                    nb.execute(kernel_pool=pool)
+                except Exception as e:
+                    if stop_on_error:
+                        raise
+                    exceptions[nb.filename] = e
+                # Only the summary is needed after the execute stage
+                nb.executed_nb = None
+        finally:
+            if pool is not None:
+                pool.shutdown()
+        return exceptions
+
+    async def execute_async(self, *, stop_on_error=False, jobs=1, on_executed=None):
+        """Execute all notebooks in the collection from an asyncio event loop.
+
+        Kernels are driven with nbclient's asynchronous API, so that many
+        notebooks can be executed at the same time without a process per
+        notebook. Use this method to embed nbcollection in an asynchronous
+        application.
+
+        Parameters
+        ----------
+        stop_on_error : bool (optional)
+            Whether to stop at the first notebook that raises an exception,
+            cancelling the notebooks that are still running.
+        jobs : int (optional)
+            The maximum number of notebooks to execute at the same time.
+        on_executed : callable (optional)
+            A function called with each `~nbcollection.notebook.NbcollectionNotebook`
+            as soon as it has been executed successfully, e.g., to start
+            converting it while other notebooks are still running.
+        """
+        try:
+            self._check_jobs(jobs)
+            exceptions = await self._execute_async(
+                jobs=jobs, stop_on_error=stop_on_error, on_executed=on_executed
+            )
+            self._raise_for_exceptions(exceptions)
+        finally:
+            self._record_build()
+
+    async def _execute_async(self, *, jobs, stop_on_error, on_executed):
+        """Execute the notebooks from the event loop and collect their errors.
+
+        Returns
+        -------
+        exceptions : dict
+            The exceptions raised by the notebooks, keyed by notebook filename
+            and in the order of ``self.notebooks``.
+        """
+        notebooks, predicted_makespan = self.schedule(jobs=jobs)
+        start = time.monotonic()
+        pool = self._create_kernel_pool()
+        queue = self._admission_queue(notebooks, jobs=jobs, max_memory=self.max_memory)
+        admitted = {nb: asyncio.Event() for nb in notebooks}
+
+        def start_admitted():
+            for nb in queue.admit():
+                admitted[nb].set()
+
+        async def execute_notebook(nb):
+            await admitted[nb].wait()
+            try:
+                await nb.execute_async(kernel_pool=pool)
+            finally:
+                queue.release(nb)
+                start_admitted()
+            if on_executed is not None:
+                on_executed(nb)
+            else:
+                # Only the summary is needed after the execute stage
+                nb.executed_nb = None
+
+        tasks = {nb: asyncio.ensure_future(execute_notebook(nb)) for nb in notebooks}
+        start_admitted()
+        try:
+            if tasks:
+                return_when = (
+                    asyncio.FIRST_EXCEPTION if stop_on_error else asyncio.ALL_COMPLETED
+                )
+                await asyncio.wait(tasks.values(), return_when=return_when)
+        finally:
+            self._report_makespan(start, predicted_makespan, jobs=jobs)
+            for task in tasks.values():
+                task.cancel()
+            await asyncio.gather(*tasks.values(), return_exceptions=True)
+            if pool is not None:
+                await pool.shutdown_async()
 
-    def execute(self, *, stop_on_error=False):
         exceptions = {}
         for nb in self.notebooks:
+            task = tasks[nb]
+            exception = None if task.cancelled() else task.exception()
+            if exception is None:
+                continue
+            if stop_on_error:
+                raise exception
+            exceptions[nb.filename] = exception
+
+        return exceptions
+
+    def _record_build(self):
+        """Record the notebooks built in this run in the manifest and timing report."""
+        self._update_records()
+        self._write_timing_report()
+
+    def _update_records(self):
+        """Record the notebooks built in this run for later builds and the index.
+
+        The manifest, the metadata of the index page and, if enabled, the
+        search index are updated.
+        """
+        self._update_manifest()
+        self._update_metadata()
+        if self.search_index:
+            self._update_search_index()
+
+    def _write_timing_report(self):
+        """Write the durations of the build phases of each notebook.
+
+        The report is written as JSON and CSV files in the build path, see
+        `~nbcollection.timing.write_timing_report`. It only includes the
+        notebooks built in this run, and the slowest cells of these notebooks.
+        """
+        built = [
+            nb
+            for nb in self.notebooks
+            if "execute_status" in nb.summary or "convert_status" in nb.summary
+        ]
+        rows = [
+            {
+                "notebook": nb._repo_path,
+                "execute_status": nb.summary.get("execute_status"),
+                "convert_status": nb.summary.get("convert_status"),
+                "timings": nb.summary["timings"],
+                "peak_memory": nb.summary.get("peak_memory"),
+                "image_savings": nb.summary.get("image_savings"),
+            }
+            for nb in built
+        ]
+        cells = slowest_cells(
+            {nb._repo_path: nb.summary.get("cells", []) for nb in built},
+            self.slow_cells,
+        )
+        write_timing_report(
+            os.path.join(self.build_path, self.timing_report_name),
+            rows,
+            discover_time=self._discover_time,
+            slowest_cells=cells,
+        )
+
+    def _update_manifest(self):
+        """Record the outcome of the notebooks built in this run in the manifest."""
+        self.manifest.update(
+            [
+                NotebookRecord.from_summary(
+                    nb._repo_path,
+                    exec_path=nb.exec_path,
+                    html_path=nb.html_path,
+                    summary=nb.summary,
+                )
+                for nb in self.notebooks
+                if "execute_status" in nb.summary or "convert_status" in nb.summary
+            ]
+        )
+
+    def _update_metadata(self):
+        """Record the index metadata of the notebooks built in this run.
+
+        The metadata is stored in a JSON file in the build path, so that the
+        index page can be rendered without reading the executed notebooks.
+        The file is only written if an entry changed.
+
+        Returns
+        -------
+        entries : dict
+            The metadata of the notebooks, see `~nbcollection.metadata`.
+        """
+        path = os.path.join(self.build_path, self.metadata_name)
+        entries = read_metadata(path)
+        records = self.manifest.get_all()
+        changed = False
+        for nb in self.notebooks:
+            index = nb.summary.get("index")
+            if index is None:
+                # Neither executed nor converted in this run
+                continue
+            entry = self._metadata_entry(nb, index, records.get(nb._repo_path))
+            if entries.get(nb._repo_path) != entry:
+                entries[nb._repo_path] = entry
+                changed = True
+        if changed:
+            write_metadata(path, entries)
+        return entries
+
+    def _update_search_index(self):
+        """Record the search index entries of the pages converted in this run.
+
+        The entries of each page are kept in a JSON file in the build path,
+        so that the entries of the pages that weren't converted in this run
+        are reused. Pages that weren't converted and have no entries, e.g.,
+        because the index was enabled on an existing build, are indexed from
+        their executed notebook. The search index of the collection is then
+        written from them, see `~nbcollection.search.write_search_index`.
+        """
+        path = os.path.join(self.build_path, self.search_data_name)
+        pages = read_metadata(path)
+        changed = False
+        for nb in self.notebooks:
+            sections = nb.summary.get("search")
+            if sections is not None:
+                title = nb.summary["index"]["title"]
+            elif nb._repo_path in pages or not (
+                os.path.exists(nb.html_path) and os.path.exists(nb.exec_path)
+            ):
+                # Not converted in this run, and indexed in a previous build
+                # (or not built yet)
+                continue
+            else:
+                # The page is up to date, but was built before the search
+                # index was enabled
+                executed_nb = read_notebook(nb.exec_path, as_version=4)
+                sections = notebook_sections(executed_nb)
+                title = get_index_metadata(executed_nb)["title"]
+            page = {
+                "html_path": PurePosixPath(
+                    Path(os.path.relpath(nb.html_path, self.build_path))
+                ).as_posix(),
+                "title": title,
+                "sections": sections,
+            }
+            if pages.get(nb._repo_path) != page:
+                pages[nb._repo_path] = page
+                changed = True
+        if changed:
+            write_metadata(path, pages)
+
+        # Only the pages of the notebooks of the collection are searched
+        repo_paths = {nb._repo_path for nb in self.notebooks}
+        count = write_search_index(
+            {key: page for key, page in pages.items() if key in repo_paths},
+            os.path.join(self.build_path, self.search_dir_name),
+        )
+        logger.debug(f"Wrote {count} files of the search index")
+
+    def _metadata_entry(self, nb, index, record):
+        """Get the entry of a notebook in the metadata file."""
+        return {
+            **index,
+            "html_path": PurePosixPath(
+                Path(os.path.relpath(nb.html_path, self.build_path))
+            ).as_posix(),
+            "execute_time": record.execute_time if record is not None else None,
+        }
+
+    def status(self):
+        """Get the build status of the notebooks, without executing them.
+
+        The status is determined from the build manifest, the content of the
+        notebooks and the execution cache, and the files in the build path.
+        Notebooks that can't be read are reported with the ``"error"`` state.
+        The estimated rebuild times are based on the durations of previous
+        builds. Notebooks that were never built are estimated with the mean
+        duration of the other notebooks.
+
+        Returns
+        -------
+        statuses : list of `~nbcollection.manifest.NotebookStatus`
+            The status of each notebook.
+        """
+        records = self.manifest.get_all()
+        mean_times = {}
+        for stage in ("execute", "convert"):
+            times = [
+                getattr(r, f"{stage}_time")
+                for r in records.values()
+                if getattr(r, f"{stage}_time") is not None
+            ]
+            mean_times[stage] = statistics.fmean(times) if times else None
+
+        statuses = []
+        for nb in self.notebooks:
+            record = records.get(nb._repo_path)
             try:
-                nb.execute()
+                input_hash = hash_file(nb.file_path)
+                execute, _ = nb.plan_execution()
             except Exception as e:
-                if stop_on_error:
-                    raise
-                exceptions[nb.filename] = e
+                # The error is reported when the notebook is built
+                statuses.append(
+                    NotebookStatus(
+                        name=nb._repo_path,
+                        state="error",
+                        execute="unknown",
+                        convert="unknown",
+                        estimated_time=None,
+                        record=record,
+                        error=str(e) or repr(e),
+                    )
+                )
+                continue
+
+            # The executed notebook is reused if it was built from the same
+            # source and cache entry, see NbcollectionNotebook.plan_execution
+            changes_outputs = execute != "skip"
+            convert = (
+                "convert" if changes_outputs or not nb._is_html_up_to_date() else "skip"
+            )
+
+            if record is None:
+                state = "new"
+            elif record.failed and record.input_hash == input_hash:
+                state = "failed"
+            elif (
+                record.input_hash != input_hash
+                or changes_outputs
+                or convert == "convert"
+            ):
+                state = "stale"
+            else:
+                state = "up to date"
+
+            estimated_time = 0.0
+            for stage, action in (("execute", execute), ("convert", convert)):
+                if action != stage:
+                    continue
+                t = getattr(record, f"{stage}_time", None)
+                if t is None:
+                    t = mean_times[stage]
+                if t is None or estimated_time is None:
+                    estimated_time = None
+                else:
+                    estimated_time += t
+
+            statuses.append(
+                NotebookStatus(
+                    name=nb._repo_path,
+                    state=state,
+                    execute=execute,
+                    convert=convert,
+                    estimated_time=estimated_time,
+                    record=record,
+                )
+            )
+
+        return statuses
+
+    def _select_shard(self, shard, *, balance):
+        """Get the notebooks of one shard of the collection."""
+        index, count = parse_shard(shard)
+        times = None
+        if balance:
+            records = self.manifest.get_all()
+            times = []
+            for nb in self.notebooks:
+                record = records.get(nb._repo_path)
+                times.append(None if record is None else record.execute_time)
+
+        shards = assign_shards(
+            [nb._repo_path for nb in self.notebooks], count, times=times
+        )
+        notebooks = [nb for nb, s in zip(self.notebooks, shards) if s == index]
+        logger.info(
+            f"Selected {len(notebooks)} of {len(self.notebooks)} notebooks for "
+            f"shard {shard}"
+        )
+        return notebooks
+
+    def merge(self, build_paths):
+        """Combine the build directories of the shards of this collection.
+
+        The files built by each shard are copied to the build path of this
+        converter and their build manifests are merged, see
+        `~nbcollection.sharding.merge_builds`. The state of the build of each
+        shard is merged explicitly: the entries of the execution caches are
+        combined, and the discovery indexes are left out. Notebooks that weren't built
+        by any shard are then removed from ``self.notebooks`` with a warning,
+        so that `make_html_index` lists the notebooks that were built.
+
+        Parameters
+        ----------
+        build_paths : list of str
+            The build directories of the shards (the ``_build`` directories).
+        """
+        merge_builds(
+            build_paths,
+            self.build_path,
+            manifest_name=self.manifest_name,
+            # The timing reports are about the build of each shard
+            exclude=(
+                f"{self.timing_report_name}.json",
+                f"{self.timing_report_name}.csv",
+                # Merged below
+                self.metadata_name,
+                self.search_data_name,
+                # Written again from the merged entries
+                self.search_dir_name,
+                # Lists the source directories as seen by each shard
+                self.index_name,
+            ),
+            keep_existing=(self.cache_dir_name,),
+        )
+
+        metadata_path = os.path.join(self.build_path, self.metadata_name)
+        entries = read_metadata(metadata_path)
+        for build_path in build_paths:
+            entries.update(read_metadata(os.path.join(build_path, self.metadata_name)))
+        write_metadata(metadata_path, entries)
+
+        search_path = os.path.join(self.build_path, self.search_data_name)
+        pages = read_metadata(search_path)
+        for build_path in build_paths:
+            pages.update(read_metadata(os.path.join(build_path, self.search_data_name)))
+        if pages:
+            write_metadata(search_path, pages)
+
+        missing = [
+            nb
+            for nb in self.notebooks
+            if not (os.path.exists(nb.exec_path) or os.path.exists(nb.html_path))
+        ]
+        if missing:
+            logger.warning(
+                f"{len(missing)} notebooks were not built by any shard: "
+                f"{[nb._repo_path for nb in missing]}"
+            )
+            self.notebooks = [nb for nb in self.notebooks if nb not in missing]
+
+        if pages:
+            self._update_search_index()
+
+    def schedule(self, *, jobs):
+        """Order the notebooks to execute them in parallel, longest first.
 
+        The expected execution time of each notebook is the duration of its
+        last execution, recorded in the build manifest. Notebooks whose
+        source didn't change since they were last built are expected to take
+        no time. The sources aren't parsed to schedule them, so notebooks that
+        changed are expected to take the duration of their last execution
+        even if their outputs will be restored from the execution cache.
+        Notebooks that were never executed are expected to take the mean
+        execution time of the other notebooks, or are started first if no
+        notebook was executed before.
+
+        Parameters
+        ----------
+        jobs : int
+            The number of notebooks executed at the same time.
+
+        Returns
+        -------
+        notebooks : list of `~nbcollection.notebook.NbcollectionNotebook`
+            The notebooks, in the order in which to start them.
+        predicted_makespan : float or None
+            The predicted time to execute all notebooks, in seconds, or None if
+            some notebooks were never executed and there is no history to
+            estimate them from.
+        """
+        records = self.manifest.get_all()
+        known_times = [
+            r.execute_time for r in records.values() if r.execute_time is not None
+        ]
+        default_time = statistics.fmean(known_times) if known_times else None
+
+        times = []
+        for nb in self.notebooks:
+            record = records.get(nb._repo_path)
+            if self._is_unchanged(nb, record):
+                times.append(0.0)
+            elif record is not None and record.execute_time is not None:
+                times.append(record.execute_time)
+            else:
+                times.append(default_time)
+
+        order = longest_first(times)
+        notebooks = [self.notebooks[i] for i in order]
+        if None in times:
+            predicted_makespan = None
+        else:
+            predicted_makespan = predict_makespan([times[i] for i in order], jobs)
+            logger.debug(
+                "Predicted makespan in discovery order: "
+                f"{predict_makespan(times, jobs):.1f} seconds"
+            )
+        return notebooks, predicted_makespan
+
+    @staticmethod
+    def _is_unchanged(nb, record):
+        """Whether a notebook is unchanged since it was last built.
+
+        Only the hash of the source notebook is compared with the build
+        manifest, so that the notebook doesn't need to be parsed.
+        """
+        if nb.overwrite:
+            return False
+        if nb.cache is None:
+            return nb._is_executed_up_to_date()
+        try:
+            input_hash = hash_file(nb.file_path)
+        except OSError:
+            # The error is reported when the notebook is executed
+            return False
+        return (
+            record is not None
+            and record.execute_status in ("executed", "cached", "skipped")
+            and record.input_hash == input_hash
+            and os.path.exists(nb.exec_path)
+        )
+
+    def _admission_queue(self, notebooks, *, jobs, max_memory=None):
+        """Create the queue that admits notebooks to execute at the same time.
+
+        Without a memory budget, notebooks are only limited by the number of
+        jobs. Otherwise, the expected memory of each notebook is the peak
+        memory of its kernel in its last execution, recorded in the build
+        manifest. Notebooks without a recorded peak are expected to use as
+        much memory as the notebook that used the most, so that they don't
+        run next to a memory-heavy notebook by accident.
+
+        Parameters
+        ----------
+        notebooks : list of `~nbcollection.notebook.NbcollectionNotebook`
+            The notebooks, in the order in which to start them.
+        jobs : int
+            The number of notebooks executed at the same time.
+        max_memory : int (optional)
+            The memory budget of the notebooks running at the same time, in
+            bytes.
+
+        Returns
+        -------
+        queue : `~nbcollection.scheduler.AdmissionQueue`
+        """
+        if max_memory is None:
+            return AdmissionQueue(notebooks, jobs=jobs)
+
+        records = self.manifest.get_all()
+        peaks = {
+            path: record.peak_memory
+            for path, record in records.items()
+            if record.peak_memory is not None
+        }
+        if not peaks:
+            logger.warning(
+                "No peak memory was recorded in previous builds, the memory "
+                "budget only applies once notebooks have been executed"
+            )
+        default_memory = max(peaks.values(), default=0)
+        memory = [peaks.get(nb._repo_path, default_memory) for nb in notebooks]
+        for nb, nb_memory in zip(notebooks, memory):
+            if nb_memory > max_memory:
+                logger.warning(
+                    f"Notebook '{nb.filename}' is expected to use "
+                    f"{format_memory(nb_memory)}, more than the memory budget of "
+                    f"{format_memory(max_memory)}. It will run alone."
+                )
+        return AdmissionQueue(
+            notebooks, jobs=jobs, memory=memory, max_memory=max_memory
+        )
+
+    @staticmethod
+    def _report_makespan(start, predicted_makespan, *, jobs):
+        """Log the predicted and actual time to execute the notebooks."""
+        actual = time.monotonic() - start
+        predicted = (
+            "unknown"
+            if predicted_makespan is None
+            else f"{predicted_makespan:.1f} seconds"
+        )
+        logger.info(
+            f"Executed notebooks with {jobs} jobs in {actual:.1f} seconds "
+            f"(predicted: {predicted})"
+        )
+
+    def _create_kernel_pool(self):
+        """Create the kernel pool for this process, if enabled."""
+        if self.kernel_pool is None:
+            return None
+        return KernelPool(policy=self.kernel_pool)
+
+    def _check_engine(self, engine):
+        if engine not in self.engines:
+            msg = (
+                f"Unknown execution engine '{engine}'. Must be one of "
+                f"{list(self.engines)}."
+            )
+            raise ValueError(msg)
+
+    @staticmethod
+    def _check_jobs(jobs):
+        if jobs < 1:
+            msg = f"The number of jobs must be at least 1 (received: {jobs})"
+            raise ValueError(msg)
+
+    @staticmethod
+    def _raise_for_exceptions(exceptions):
+        """Log the errors of the notebooks and raise a summary error.
+
+        Parameters
+        ----------
+        exceptions : dict
+            The exceptions raised by the notebooks, keyed by notebook filename.
+        """
         if exceptions:
             for nb, exception in exceptions.items():
                 logger.error(f"Notebook '{nb}' errored: {exception!s}")
@@ -241,9 +1118,336 @@ class NbcollectionConverter:
             )
             raise RuntimeError(msg)
 
-    def convert(self):
-        for nb in self.notebooks:
-            nb.convert()
+    def _run_parallel(
+        self, worker, *args, jobs, stop_on_error, notebooks=None, max_memory=None
+    ):
+        """Run a worker function on each notebook in a pool of processes.
+
+        Log messages from each notebook are emitted together once that
+        notebook finishes, so that output from different workers is not
+        interleaved.
+
+        Parameters
+        ----------
+        worker : callable
+            A module-level function called as ``worker(nb, log_level, *args)``
+            that returns the buffered log records, the exception raised for
+            the notebook (if any), and the summary of the notebook.
+        *args
+            Additional arguments passed to the worker.
+        jobs : int
+            The number of worker processes.
+        stop_on_error : bool
+            Whether to raise the first exception instead of collecting them.
+        notebooks : list of `~nbcollection.notebook.NbcollectionNotebook` (optional)
+            The notebooks to submit to the pool, in order. Default is
+            ``self.notebooks``.
+        max_memory : int (optional)
+            The memory budget of the notebooks running at the same time, in
+            bytes. See `_admission_queue`.
+
+        Returns
+        -------
+        exceptions : dict
+            The exceptions raised by the notebooks, keyed by notebook filename
+            and in the order of ``self.notebooks``.
+        """
+        errors = {}
+        queue = self._admission_queue(
+            self.notebooks if notebooks is None else notebooks,
+            jobs=jobs,
+            max_memory=max_memory,
+        )
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            futures = {}
+            pending = set()
+
+            def submit_admitted():
+                for nb in queue.admit():
+                    future = pool.submit(worker, nb, logger.getEffectiveLevel(), *args)
+                    futures[future] = nb
+                    pending.add(future)
+
+            submit_admitted()
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                pending.difference_update(done)
+                for future in done:
+                    nb = futures[future]
+                    queue.release(nb)
+                    try:
+                        records, exception, summary = future.result()
+                    except Exception as e:
+                        # The worker itself failed, e.g., it was killed
+                        records, exception, summary = [], e, {}
+                    nb.summary.update(summary)
+
+                    for record in records:
+                        logger.handle(record)
+
+                    if exception is not None:
+                        if stop_on_error:
+                            for f in pending:
+                                f.cancel()
+                            raise exception
+                        errors[nb] = exception
+                submit_admitted()
+
+        return self._by_filename(errors)
+
+    def convert(self, *, jobs=1, engine="process", convert_jobs=1, pipeline=False):
+        """Convert all notebooks in the collection to HTML.
+
+        With one job for each stage, each notebook is converted right after it
+        is executed. Otherwise, by default, the notebooks are all executed
+        first, see `execute`, and then converted. Errors are collected, so
+        that all other notebooks are still converted, and reported together
+        at the end.
+
+        Parameters
+        ----------
+        jobs : int (optional)
+            The number of notebooks to execute at the same time before
+            converting them. See `execute`.
+        engine : str (optional)
+            How notebooks are executed at the same time. See `execute`.
+        convert_jobs : int (optional)
+            The number of notebooks to convert to HTML at the same time in a
+            pool of worker processes. Default is 1, converting notebooks one
+            after another.
+        pipeline : bool (optional)
+            If True, each notebook is handed to the pool of conversion
+            workers as soon as it has been executed, so that HTML export
+            overlaps with the execution of the other notebooks. Notebooks
+            are always executed in worker processes (or from the event loop
+            with the ``"async"`` engine) in this mode.
+        """
+        try:
+            self._check_jobs(jobs)
+            self._check_jobs(convert_jobs)
+            self._check_engine(engine)
+
+            if pipeline:
+                if engine == "async":
+                    run_sync(self._convert_async)(jobs=jobs, convert_jobs=convert_jobs)
+                else:
+                    self._convert_pipelined(jobs=jobs, convert_jobs=convert_jobs)
+                return
+
+            if jobs == 1 and convert_jobs == 1:
+                self._convert_serial()
+                return
+
+            execute_exceptions = self._execute(
+                stop_on_error=False, jobs=jobs, engine=engine
+            )
+            # Only the notebooks that were executed successfully are converted
+            notebooks = [
+                nb
+                for nb in self.notebooks
+                if nb.summary.get("execute_status") in ("executed", "cached", "skipped")
+            ]
+
+            if convert_jobs == 1:
+                convert_exceptions = {}
+                for nb in notebooks:
+                    try:
+                        nb.convert(execute=False)
+                    except Exception as e:
+                        convert_exceptions[nb.filename] = e
+            else:
+                convert_exceptions = self._run_parallel(
+                    _convert_notebook,
+                    jobs=convert_jobs,
+                    stop_on_error=False,
+                    notebooks=notebooks,
+                )
+
+            self._raise_for_pipeline_exceptions(execute_exceptions, convert_exceptions)
+        finally:
+            self._record_build()
+
+    def _convert_serial(self):
+        """Execute and convert the notebooks one after another.
+
+        Each notebook is converted right after it is executed, so the executed
+        notebook is handed to the HTML exporter in memory.
+        """
+        execute_exceptions = {}
+        convert_exceptions = {}
+        pool = self._create_kernel_pool()
+        try:
+            for nb in self.notebooks:
+                try:
+                    nb.execute(kernel_pool=pool)
+                except Exception as e:
+                    execute_exceptions[nb.filename] = e
+                    continue
+
+                try:
+                    nb.convert(execute=False)
+                except Exception as e:
+                    convert_exceptions[nb.filename] = e
+        finally:
+            if pool is not None:
+                pool.shutdown()
+
+        self._raise_for_pipeline_exceptions(execute_exceptions, convert_exceptions)
+
+    def _convert_pipelined(self, *, jobs, convert_jobs):
+        """Execute and convert the notebooks with two pools of worker processes.
+
+        Each notebook is submitted to the conversion pool as soon as its
+        execution finishes.
+        """
+        log_level = logger.getEffectiveLevel()
+        errors = {"execute": {}, "convert": {}}
+        notebooks, predicted_makespan = self.schedule(jobs=jobs)
+        queue = self._admission_queue(notebooks, jobs=jobs, max_memory=self.max_memory)
+        start = time.monotonic()
+        with ProcessPoolExecutor(max_workers=jobs) as execute_pool, ProcessPoolExecutor(
+            max_workers=convert_jobs
+        ) as convert_pool:
+            futures = {}
+            pending = set()
+
+            def submit_admitted():
+                for nb in queue.admit():
+                    future = execute_pool.submit(
+                        _execute_notebook, nb, log_level, self.kernel_pool
+                    )
+                    futures[future] = (nb, "execute")
+                    pending.add(future)
+
+            submit_admitted()
+            executing = len(notebooks)
+            while pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    nb, stage = futures[future]
+                    if stage == "execute":
+                        queue.release(nb)
+                        executing -= 1
+                        if executing == 0:
+                            self._report_makespan(start, predicted_makespan, jobs=jobs)
+                    try:
+                        records, exception, summary = future.result()
+                    except Exception as e:
+                        # The worker itself failed, e.g., it was killed
+                        records, exception, summary = [], e, {}
+                    nb.summary.update(summary)
+
+                    for record in records:
+                        logger.handle(record)
+
+                    if exception is not None:
+                        errors[stage][nb] = exception
+                    elif stage == "execute":
+                        logger.debug(f"Queueing notebook '{nb.filename}' to convert")
+                        convert_future = convert_pool.submit(
+                            _convert_notebook, nb, log_level
+                        )
+                        futures[convert_future] = (nb, "convert")
+                        pending.add(convert_future)
+                submit_admitted()
+
+        self._raise_for_pipeline_exceptions(
+            self._by_filename(errors["execute"]), self._by_filename(errors["convert"])
+        )
+
+    async def convert_async(self, *, jobs=1, convert_jobs=1):
+        """Execute notebooks from an asyncio event loop and convert them in a pipeline.
+
+        Notebooks are executed as in `execute_async`. As soon as a notebook
+        has been executed, it is converted to HTML in a pool of worker
+        processes, so that HTML export overlaps with kernel execution.
+
+        Parameters
+        ----------
+        jobs : int (optional)
+            The maximum number of notebooks to execute at the same time.
+        convert_jobs : int (optional)
+            The number of worker processes converting notebooks to HTML.
+        """
+        try:
+            await self._convert_async(jobs=jobs, convert_jobs=convert_jobs)
+        finally:
+            self._record_build()
+
+    async def _convert_async(self, *, jobs, convert_jobs):
+        """Execute and convert the notebooks in a pipeline, see `convert_async`.
+
+        The build is not recorded, so that `convert` records it once.
+        """
+        self._check_jobs(jobs)
+        self._check_jobs(convert_jobs)
+
+        loop = asyncio.get_running_loop()
+        log_level = logger.getEffectiveLevel()
+        convert_errors = {}
+        conversions = []
+
+        with ProcessPoolExecutor(max_workers=convert_jobs) as convert_pool:
+
+            async def convert_notebook(nb):
+                records, exception, summary = await loop.run_in_executor(
+                    convert_pool, _convert_notebook, nb, log_level
+                )
+                nb.executed_nb = None
+                nb.summary.update(summary)
+                for record in records:
+                    logger.handle(record)
+                if exception is not None:
+                    convert_errors[nb] = exception
+
+            def on_executed(nb):
+                logger.debug(f"Queueing notebook '{nb.filename}' to convert")
+                conversions.append(asyncio.ensure_future(convert_notebook(nb)))
+
+            try:
+                execute_exceptions = await self._execute_async(
+                    jobs=jobs, stop_on_error=False, on_executed=on_executed
+                )
+            finally:
+                await asyncio.gather(*conversions)
+
+        self._raise_for_pipeline_exceptions(
+            execute_exceptions, self._by_filename(convert_errors)
+        )
+
+    def _by_filename(self, errors):
+        """Key errors by notebook filename, in the order of ``self.notebooks``."""
+        return {nb.filename: errors[nb] for nb in self.notebooks if nb in errors}
+
+    def _raise_for_pipeline_exceptions(self, execute_exceptions, convert_exceptions):
+        """Raise the errors of a pipelined conversion.
+
+        Execution errors take precedence, but conversion errors are logged
+        too.
+        """
+        if execute_exceptions:
+            for nb, exception in convert_exceptions.items():
+                logger.error(f"Notebook '{nb}' failed to convert: {exception!r}")
+            self._raise_for_exceptions(execute_exceptions)
+        self._raise_for_convert_exceptions(convert_exceptions)
+
+    @staticmethod
+    def _raise_for_convert_exceptions(exceptions):
+        """Log the conversion errors of the notebooks and raise a summary error.
+
+        Parameters
+        ----------
+        exceptions : dict
+            The exceptions raised by the notebooks, keyed by notebook filename.
+        """
+        if exceptions:
+            for nb, exception in exceptions.items():
+                logger.error(f"Notebook '{nb}' failed to convert: {exception!r}")
+            msg = (
+                f"{len(exceptions)} notebooks failed to convert to HTML: "
+                f"{list(exceptions.keys())} — see above for more details."
+            )
+            raise RuntimeError(msg)
 
     def make_html_index(self, template_file, output_filename="index.html"):
         """Generate an html index page for a set of notebooks.
@@ -253,14 +1457,20 @@ class NbcollectionConverter:
         template_file : str
             A path to the template file to be used for generating the index. The
             template should be in jinja2 format and have a loop over
-            ``notebook_html_paths`` to populate with the links
+            ``notebooks`` to populate with the links. Each notebook has the
+            ``html_path`` of its page, its ``name``, and the metadata
+            recorded when it was built: its ``title``, ``description``,
+            ``toc`` and ``tags`` (see
+            `~nbcollection.nb_helpers.get_index_metadata`), and its
+            ``execute_time`` in seconds (or None).
         output_filename : str or None
             the output file name, or None to not write the file
 
         Returns
         -------
         content : str
-            The content of the index file
+            The content of the index file. The file is only written if its
+            content changed.
         """
         if isinstance(template_file, str):
             # Load jinja2 template for index page:
@@ -287,16 +1497,177 @@ class NbcollectionConverter:
             out_path = self.build_path
         os.makedirs(out_path, exist_ok=True)
 
+        # The title and other metadata of the notebooks were recorded when
+        # they were executed or converted, so the (possibly large) executed
+        # notebooks don't need to be read again
+        entries = read_metadata(os.path.join(self.build_path, self.metadata_name))
+        missing = [nb for nb in self.notebooks if nb._repo_path not in entries]
+        if missing:
+            # E.g., built by an older version of nbcollection
+            records = self.manifest.get_all()
+            for nb in missing:
+                index = get_index_metadata(read_notebook(nb.exec_path, as_version=4))
+                entries[nb._repo_path] = self._metadata_entry(
+                    nb, index, records.get(nb._repo_path)
+                )
+            write_metadata(os.path.join(self.build_path, self.metadata_name), entries)
+
         notebook_metadata = []
         for nb in self.notebooks:
-            relpath = os.path.relpath(nb.html_path, out_path)
+            entry = entries[nb._repo_path]
+            if entry["title"] is None:
+                msg = (
+                    f"Failed to find a title for the notebook '{nb.filename}'. To "
+                    "include it in an index page, each notebook must have a H1 "
+                    "heading that is treated as the notebooks title."
+                )
+                raise RuntimeError(msg)
 
             notebook_metadata.append(
-                {"html_path": relpath, "name": get_title(nb.exec_path)}
+                {
+                    **entry,
+                    "html_path": os.path.relpath(nb.html_path, out_path),
+                    "name": entry["title"],
+                }
             )
 
         content = templ.render(notebooks=notebook_metadata)
-        with open(os.path.join(out_path, output_filename), "w") as f:
+        index_path = os.path.join(out_path, output_filename)
+        if os.path.exists(index_path):
+            with open(index_path) as f:
+                if f.read() == content:
+                    # Not written again, so that its modification time shows
+                    # when the index last changed
+                    logger.debug(f"Index page '{index_path}' is up to date")
+                    return content
+        with open(index_path, "w") as f:
             f.write(content)
 
         return content
+
+    def watch(
+        self,
+        *,
+        index_template=None,
+        interval=1.0,
+        polling=False,
+        stop_event=None,
+    ):
+        """Rebuild the notebooks of the collection whenever they change.
+
+        The collection should be built first, e.g., with `convert`. Each
+        notebook that is modified or created in the watched directories is
+        then executed and converted again, and the index page is written
+        again. The collection, the execution cache, and the kernel pool (see
+        the ``kernel_pool`` option) are kept between rebuilds, so that editing
+        a markdown cell only takes the time to convert the notebook. This runs
+        until interrupted, e.g., with Ctrl+C.
+
+        Parameters
+        ----------
+        index_template : str or `jinja2.Template` (optional)
+            If set, the template of the index page, written again after each
+            rebuild. See `make_html_index`.
+        interval : float (optional)
+            The time between two polls of the notebooks, in seconds, if they
+            are polled. See `~nbcollection.watch.NotebookWatcher`.
+        polling : bool (optional)
+            Whether to poll the notebooks for changes even if the file system
+            can notify them.
+        stop_event : `threading.Event` (optional)
+            If set, watching stops once this event is set.
+        """
+        pool = self._create_kernel_pool()
+        watcher = NotebookWatcher(self._sources, interval=interval, polling=polling)
+        watcher.start()
+        backend = "polling" if watcher.polling else "file system events"
+        logger.info(
+            f"Watching {len(self.notebooks)} notebooks for changes ({backend}), "
+            "press Ctrl+C to stop"
+        )
+        try:
+            while stop_event is None or not stop_event.is_set():
+                changes = watcher.wait(timeout=interval)
+                if changes:
+                    self._rebuild(
+                        changes, index_template=index_template, kernel_pool=pool
+                    )
+        except KeyboardInterrupt:
+            logger.info("Stopped watching")
+        finally:
+            watcher.stop()
+            if pool is not None:
+                pool.shutdown()
+
+    def _rebuild(self, paths, *, index_template=None, kernel_pool=None):
+        """Execute and convert changed notebooks again.
+
+        Parameters
+        ----------
+        paths : iterable of str
+            The absolute paths of the notebooks that were created, modified,
+            or deleted.
+        index_template : str or `jinja2.Template` (optional)
+            If set, the index page is written again with this template.
+        kernel_pool : `nbcollection.kernels.KernelPool` (optional)
+            A pool of warm kernels used to execute the notebooks.
+
+        Returns
+        -------
+        rebuilt : list of `~nbcollection.notebook.NbcollectionNotebook`
+            The notebooks that were rebuilt successfully.
+        """
+        by_path = {nb.file_path: nb for nb in self.notebooks}
+        rebuilt = []
+        for path in sorted(paths):
+            nb = by_path.get(path)
+            if not os.path.isfile(path):
+                if nb is not None:
+                    logger.info(f"Notebook '{nb.filename}' was removed")
+                    self.notebooks.remove(nb)
+                continue
+
+            if nb is None:
+                filename = os.path.basename(path)
+                if (
+                    self._exclude_pattern is not None
+                    and re.search(self._exclude_pattern, filename)
+                ) or (
+                    self._include_pattern is not None
+                    and re.search(self._include_pattern, filename) is None
+                ):
+                    continue
+                try:
+                    nb = self._create_notebook(path)
+                except Exception as e:
+                    logger.error(f"Failed to add notebook '{path}': {e!s}")
+                    continue
+                logger.info(f"Notebook '{nb.filename}' was added")
+                self.notebooks.append(nb)
+
+            logger.info(f"Rebuilding notebook '{nb.filename}'")
+            t0 = time.perf_counter()
+            nb.summary = {"timings": {}}
+            # The source changed, so existing outputs are stale. With the
+            # execution cache, the notebook is only executed again if its code
+            # changed, and its page is converted again if its outputs changed.
+            overwrite = nb.overwrite
+            nb.overwrite = overwrite or nb.cache is None
+            try:
+                nb.execute(kernel_pool=kernel_pool)
+                nb.convert(execute=False)
+            except Exception as e:
+                logger.error(f"Failed to rebuild notebook '{nb.filename}': {e!s}")
+                continue
+            finally:
+                nb.overwrite = overwrite
+            logger.info(
+                f"Rebuilt notebook '{nb.filename}' in "
+                f"{time.perf_counter() - t0:.2f} seconds"
+            )
+            rebuilt.append(nb)
+
+        self._update_records()
+        if index_template is not None:
+            self.make_html_index(index_template)
+        return rebuilt
@@ -0,0 +1,209 @@
+"""Tracking of the data files that notebooks read while they are executed."""
+
+from __future__ import annotations
+
+import ast
+import json
+import os
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+from nbclient.util import ensure_async
+
+from nbcollection.logger import logger
+
+if TYPE_CHECKING:
+    from nbclient import NotebookClient
+    from nbformat import NotebookNode
+
+__all__ = ["DependencyTracer", "declared_dependencies"]
+
+# Code run silently in the kernel before the first cell. It installs an audit
+# hook (PEP 578) that records the files opened by the kernel, and whether they
+# were opened for writing. The hook can't be removed, so a kernel that is
+# reused for another notebook only clears the recorded files.
+_TRACE_CODE = """\
+def _nbcollection_trace():
+    import os, sys
+    if hasattr(sys, "_nbcollection_opened"):
+        sys._nbcollection_opened.clear()
+        return
+    opened = sys._nbcollection_opened = {}
+    write_flags = os.O_WRONLY | os.O_RDWR | os.O_APPEND | os.O_CREAT
+    def hook(event, args):
+        if event != "open":
+            return
+        try:
+            path, mode, flags = args
+            if isinstance(path, int):
+                return
+            path = os.path.abspath(os.fsdecode(path))
+            if mode is None:
+                writes = bool(flags & write_flags)
+            else:
+                writes = any(c in mode for c in "wax+")
+            opened[path] = opened.get(path, False) or writes
+        except Exception:
+            pass
+    sys.addaudithook(hook)
+_nbcollection_trace()
+del _nbcollection_trace
+"""
+
+# Expression evaluated in the kernel after the last cell to get the files
+_OPENED_EXPRESSION = (
+    "__import__('json').dumps(getattr(__import__('sys'), '_nbcollection_opened', {}))"
+)
+
+
+def declared_dependencies(nb: NotebookNode, path: str) -> list[str]:
+    """Get the data files declared in the metadata of a notebook.
+
+    Notebooks can declare the files they read as a list of glob patterns,
+    relative to the notebook directory, in their metadata::
+
+        "metadata": {"nbcollection": {"data_files": ["data/*.fits"]}}
+
+    Parameters
+    ----------
+    nb : `nbformat.NotebookNode`
+        The notebook.
+    path : str
+        The directory of the notebook.
+
+    Returns
+    -------
+    files : list of str
+        The existing files matching the patterns, as POSIX paths relative to
+        the notebook directory.
+    """
+    patterns = nb.metadata.get("nbcollection", {}).get("data_files", [])
+    root = Path(path)
+    files: set[str] = set()
+    for pattern in patterns:
+        files.update(
+            p.relative_to(root).as_posix() for p in root.glob(pattern) if p.is_file()
+        )
+    return sorted(files)
+
+
+def _filter_opened_files(opened: dict[str, bool], path: str) -> list[str]:
+    """Select the data files that a notebook read from the files it opened.
+
+    Only files in the notebook directory (or its subdirectories) that were
+    not written by the notebook are kept. Files in hidden or private
+    directories, e.g., ``_build`` or ``__pycache__``, are ignored, as they are
+    by notebook discovery.
+    """
+    root = os.path.abspath(path)
+    files = []
+    for file, writes in opened.items():
+        if writes or not os.path.isfile(file):
+            continue
+        try:
+            relpath = os.path.relpath(file, root)
+        except ValueError:
+            # On a different drive
+            continue
+        parts = Path(relpath).parts
+        if parts[0] == os.pardir or any(p.startswith((".", "_")) for p in parts[:-1]):
+            continue
+        files.append(Path(relpath).as_posix())
+    return sorted(files)
+
+
+class DependencyTracer:
+    """Records the data files that a Python kernel reads while executing a notebook.
+
+    The tracer is attached to an nbclient ``NotebookClient`` (or nbconvert
+    ``ExecutePreprocessor``) through its cell hooks, see `hooks`. Before the
+    first cell runs, an audit hook is installed in the kernel to record the
+    files it opens. After the last cell, the files that the notebook read from
+    its directory are collected in `files`. Only reads made through Python
+    (e.g., ``open()`` or ``os.open()``) are seen; files read by compiled
+    libraries directly can be declared in the notebook metadata instead (see
+    `declared_dependencies`).
+
+    Parameters
+    ----------
+    path : str
+        The directory of the notebook, which is the working directory of the
+        kernel.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        # The client executing the notebook, set by `hooks`
+        self.client: Any = None
+        self._last_cell_index: int | None = None
+
+        self.files: list[str] | None = None
+        """The data files read by the notebook, as POSIX paths relative to
+        its directory, or None if they couldn't be traced."""
+
+        self._started = False
+        self._enabled = True
+
+    def hooks(self, client: NotebookClient, nb: NotebookNode) -> dict[str, Any]:
+        """Get the cell hooks to attach to the client executing the notebook.
+
+        Parameters
+        ----------
+        client : `nbclient.NotebookClient`
+            The client executing the notebook.
+        nb : `nbformat.NotebookNode`
+            The notebook to execute.
+        """
+        self.client = client
+
+        # The last cell that nbclient will run
+        self._last_cell_index = max(
+            (
+                i
+                for i, cell in enumerate(nb.cells)
+                if cell.cell_type == "code"
+                and cell.source.strip()
+                and client.skip_cells_with_tag not in cell.metadata.get("tags", [])
+            ),
+            default=None,
+        )
+        return {
+            "on_cell_execute": self._on_cell_execute,
+            "on_cell_executed": self._on_cell_executed,
+        }
+
+    async def _on_cell_execute(self, **kwargs: Any) -> None:  # noqa: ARG002
+        if self._started:
+            return
+        self._started = True
+
+        language = self.client.nb.metadata.get("language_info", {}).get("name")
+        if language != "python":
+            logger.debug(f"Not tracing the files read by a {language} kernel")
+            self._enabled = False
+            return
+
+        reply = await self._run(_TRACE_CODE)
+        self._enabled = reply["content"]["status"] == "ok"
+
+    async def _on_cell_executed(
+        self, cell_index: int, **kwargs: Any  # noqa: ARG002
+    ) -> None:
+        if not self._enabled or cell_index != self._last_cell_index:
+            return
+
+        reply = await self._run("", user_expressions={"opened": _OPENED_EXPRESSION})
+        result = reply["content"].get("user_expressions", {}).get("opened", {})
+        if result.get("status") != "ok":
+            self.files = None
+            return
+        opened = json.loads(ast.literal_eval(result["data"]["text/plain"]))
+        self.files = _filter_opened_files(opened, self.path)
+
+    async def _run(self, code: str, **kwargs: Any) -> dict[str, Any]:
+        """Run code silently in the kernel and get the reply."""
+        kc = self.client.kc
+        msg_id = await ensure_async(
+            kc.execute(code, silent=True, store_history=False, **kwargs)
+        )
+        return await self.client.async_wait_for_reply(msg_id)
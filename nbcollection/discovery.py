@@ -0,0 +1,157 @@
+"""Discovery of the notebooks in a directory tree."""
+
+from __future__ import annotations
+
+import json
+import os
+import re
+import tempfile
+import time
+from typing import Any
+
+from nbcollection.logger import logger
+
+__all__ = ["discover_notebooks"]
+
+# Version of the format of the index file
+_INDEX_VERSION = 1
+
+# Directory modification times closer than this to the time the index was
+# written may not reflect changes made right after the directory was scanned
+# (e.g., on file systems with a coarse timestamp resolution), so the
+# directory is scanned again.
+_RACY_NS = 2_000_000_000
+
+
+def discover_notebooks(
+    root: str,
+    *,
+    include_pattern: str | None = None,
+    exclude_pattern: str | None = None,
+    index_path: str | None = None,
+) -> list[str]:
+    """Find the notebooks in a directory tree.
+
+    Directories whose name starts with ``.`` or ``_`` (e.g., ``.git`` or
+    ``_build``) are skipped, as are symbolic links to directories.
+
+    Parameters
+    ----------
+    root : str
+        The root directory of the tree.
+    include_pattern : str (optional)
+        A regular expression that the filename of a notebook must match.
+    exclude_pattern : str (optional)
+        A regular expression that the filename of a notebook must not match.
+    index_path : str (optional)
+        The path to a JSON file caching the notebooks and subdirectories of
+        each directory of the tree, with the modification time of the
+        directory. Directories that weren't modified since the index was
+        written aren't listed again, so finding the notebooks of an
+        unchanged tree only needs one ``stat`` call per directory. The
+        index is created or updated if needed.
+
+    Returns
+    -------
+    paths : list of str
+        The paths to the notebooks, relative to ``root`` and with ``/``
+        separators. The notebooks of a directory come before the notebooks
+        of its subdirectories, and each level is sorted by name.
+    """
+    include = None if include_pattern is None else re.compile(include_pattern)
+    exclude = None if exclude_pattern is None else re.compile(exclude_pattern)
+
+    root_key = os.path.abspath(root)
+    index = _read_index(index_path) if index_path is not None else {}
+    old_entries = index.get("roots", {}).get(root_key, {})
+    indexed_at = index.get("created", 0)
+    entries: dict[str, dict[str, Any]] = {}
+    scanned = 0
+
+    paths = []
+    stack = [""]
+    while stack:
+        relative_dir = stack.pop()
+        path = os.path.join(root, *relative_dir.split("/")) if relative_dir else root
+
+        if index_path is None:
+            entry = _scan_directory(path)
+            scanned += 1
+        else:
+            mtime_ns = os.stat(path).st_mtime_ns
+            entry = old_entries.get(relative_dir)
+            if not _is_fresh(entry, mtime_ns, indexed_at):
+                entry = {**_scan_directory(path), "mtime_ns": mtime_ns}
+                scanned += 1
+        entries[relative_dir] = entry
+
+        prefix = f"{relative_dir}/" if relative_dir else ""
+        for name in entry["notebooks"]:
+            if exclude is not None and exclude.search(name):
+                continue
+            if include is not None and include.search(name) is None:
+                continue
+            paths.append(prefix + name)
+        stack.extend(prefix + name for name in reversed(entry["dirs"]))
+
+    if index_path is not None:
+        logger.debug(
+            f"Listed {scanned} of {len(entries)} directories of '{root}', the "
+            "others are unchanged in the index"
+        )
+        if scanned or entries.keys() != old_entries.keys():
+            index.setdefault("roots", {})[root_key] = entries
+            _write_index(index_path, index)
+    return paths
+
+
+def _is_fresh(entry: dict[str, Any] | None, mtime_ns: int, indexed_at: int) -> bool:
+    """Whether the indexed entry of a directory is up to date."""
+    return (
+        entry is not None
+        and entry["mtime_ns"] == mtime_ns
+        and mtime_ns <= indexed_at - _RACY_NS
+    )
+
+
+def _scan_directory(path: str) -> dict[str, Any]:
+    """List the notebooks and the subdirectories to walk of a directory."""
+    notebooks = []
+    dirs = []
+    with os.scandir(path) as it:
+        for entry in it:
+            name = entry.name
+            if entry.is_dir():
+                if not name.startswith((".", "_")) and not entry.is_symlink():
+                    dirs.append(name)
+            elif name.endswith(".ipynb"):
+                notebooks.append(name)
+    return {"notebooks": sorted(notebooks), "dirs": sorted(dirs)}
+
+
+def _read_index(path: str) -> dict[str, Any]:
+    """Read the index of directory trees, or return an empty index."""
+    try:
+        with open(path, encoding="utf-8") as f:
+            index = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    if not isinstance(index, dict) or index.get("version") != _INDEX_VERSION:
+        return {}
+    return index
+
+
+def _write_index(path: str, index: dict[str, Any]) -> None:
+    """Write the index of directory trees through a temporary file."""
+    index["version"] = _INDEX_VERSION
+    index["created"] = time.time_ns()
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(index, f)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.remove(tmp_path)
+        raise
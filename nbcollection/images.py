@@ -0,0 +1,228 @@
+"""Optimization of the image outputs of executed notebooks.
+
+Figures, e.g., from Matplotlib, are stored in notebooks as PNG images that are
+often larger than they need to be. Before a notebook is converted to HTML,
+`ImageOptimizer` can:
+
+- Re-compress each PNG image losslessly, keeping it only if it is smaller.
+- Downsample images larger than a maximum size, keeping their display size.
+- Add a lossless WebP version of each image, which the pages offer to the
+  browsers that support it.
+
+This requires the optional `Pillow <https://python-pillow.org>`_ package.
+"""
+
+from __future__ import annotations
+
+import base64
+import hashlib
+import io
+import json
+import os
+import tempfile
+from typing import TYPE_CHECKING, Any
+
+from nbconvert.preprocessors import Preprocessor
+
+from nbcollection import __version__
+from nbcollection.logger import logger
+
+try:
+    from PIL import Image
+except ImportError:  # pragma: no cover
+    Image = None  # type: ignore[assignment]
+
+if TYPE_CHECKING:
+    from nbformat import NotebookNode
+
+__all__ = ["ExtractWebpPreprocessor", "ImageOptimizer"]
+
+
+class ImageOptimizer:
+    """Optimizes the PNG outputs of notebooks, with a cache keyed on their content.
+
+    Parameters
+    ----------
+    cache_path : str
+        The directory where the optimized images are cached, keyed by the
+        hash of the original image and the optimization options, so that an
+        image is only optimized once.
+    max_size : int (optional)
+        The maximum width and height of the images, in pixels. Larger images
+        are downsampled, keeping their aspect ratio and their display size
+        in the page. Default is to keep the size of the images.
+    webp : bool (optional)
+        Whether to add a lossless WebP version of each image, if it is
+        smaller than the PNG image.
+    """
+
+    def __init__(
+        self, cache_path: str, *, max_size: int | None = None, webp: bool = False
+    ) -> None:
+        if Image is None:
+            msg = (  # type: ignore[unreachable]
+                "Optimizing images requires the Pillow package. Install it with "
+                "`pip install nbcollection[images]`."
+            )
+            raise ImportError(msg)
+        self.cache_path = cache_path
+        self.max_size = max_size
+        self.webp = webp
+
+    def optimize(self, nb: NotebookNode) -> dict[str, int]:
+        """Optimize the PNG outputs of a notebook in place.
+
+        The PNG data of each output is replaced by its optimized version. If
+        WebP versions are enabled, they are added to the output data as
+        ``image/webp``. If an image is downsampled, its original size is
+        kept as its display size in the output metadata.
+
+        Parameters
+        ----------
+        nb : `nbformat.NotebookNode`
+            The executed notebook.
+
+        Returns
+        -------
+        savings : dict
+            The number of ``images``, and their total size before
+            (``original_bytes``) and after optimization (``optimized_bytes``,
+            including the WebP versions), in bytes.
+        """
+        savings = {"images": 0, "original_bytes": 0, "optimized_bytes": 0}
+        for cell in nb.cells:
+            for output in cell.get("outputs", []):
+                data = output.get("data", {})
+                if "image/png" not in data:
+                    continue
+                png = base64.b64decode(data["image/png"])
+                result = self._optimize_png(png)
+
+                data["image/png"] = base64.b64encode(result["png"]).decode("ascii")
+                optimized_bytes = len(result["png"])
+                if result["webp"] is not None:
+                    data["image/webp"] = base64.b64encode(result["webp"]).decode(
+                        "ascii"
+                    )
+                    optimized_bytes += len(result["webp"])
+                if result["size"] is not None:
+                    metadata = output.setdefault("metadata", {})
+                    image_metadata = metadata.setdefault("image/png", {})
+                    width, height = result["size"]
+                    if "width" not in image_metadata:
+                        image_metadata["width"] = width
+                        image_metadata["height"] = height
+                savings["images"] += 1
+                savings["original_bytes"] += len(png)
+                savings["optimized_bytes"] += optimized_bytes
+        return savings
+
+    def _key(self, png: bytes) -> str:
+        """Get the cache key of an image and the optimization options."""
+        options = json.dumps(
+            {
+                "max_size": self.max_size,
+                "webp": self.webp,
+                "version": __version__,
+            },
+            sort_keys=True,
+        )
+        return hashlib.sha256(png + options.encode("utf-8")).hexdigest()
+
+    def _optimize_png(self, png: bytes) -> dict[str, Any]:
+        """Optimize a PNG image, or get it from the cache.
+
+        Returns
+        -------
+        result : dict
+            The optimized ``png``, the ``webp`` version (or None), and the
+            original ``size`` of the image as (width, height) if it was
+            downsampled (or None).
+        """
+        base_path = os.path.join(self.cache_path, self._key(png))
+        try:
+            with open(f"{base_path}.json", encoding="utf-8") as f:
+                info = json.load(f)
+            with open(f"{base_path}.png", "rb") as f:
+                optimized = f.read()
+            webp = None
+            if info["webp"]:
+                with open(f"{base_path}.webp", "rb") as f:
+                    webp = f.read()
+        except (OSError, ValueError, KeyError):
+            pass
+        else:
+            return {"png": optimized, "webp": webp, "size": info["size"]}
+
+        try:
+            image = Image.open(io.BytesIO(png))
+            image.load()
+        except Exception as e:  # noqa: BLE001
+            logger.warning(f"Can't read PNG image, leaving it unchanged: {e!s}")
+            return {"png": png, "webp": None, "size": None}
+
+        size = None
+        if self.max_size is not None and max(image.size) > self.max_size:
+            size = list(image.size)
+            image.thumbnail((self.max_size, self.max_size), Image.Resampling.LANCZOS)
+
+        buffer = io.BytesIO()
+        image.save(buffer, "PNG", optimize=True)
+        optimized = buffer.getvalue()
+        if size is None and len(optimized) >= len(png):
+            # Re-compressing doesn't help: keep the original image
+            optimized = png
+
+        webp = None
+        if self.webp:
+            buffer = io.BytesIO()
+            image.save(buffer, "WEBP", lossless=True)
+            if len(buffer.getvalue()) < len(optimized):
+                webp = buffer.getvalue()
+
+        self._write_atomic(f"{base_path}.png", optimized)
+        if webp is not None:
+            self._write_atomic(f"{base_path}.webp", webp)
+        info = {"webp": webp is not None, "size": size}
+        # The metadata is written last, so that entries are only read complete
+        self._write_atomic(f"{base_path}.json", json.dumps(info).encode("utf-8"))
+        return {"png": optimized, "webp": webp, "size": size}
+
+    def _write_atomic(self, path: str, content: bytes) -> None:
+        """Write a file in the cache through a temporary file."""
+        os.makedirs(self.cache_path, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=self.cache_path, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(content)
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.remove(tmp_path)
+            raise
+
+
+class ExtractWebpPreprocessor(Preprocessor):
+    """Extracts the WebP versions of the images extracted to files.
+
+    nbconvert's ``ExtractOutputPreprocessor`` doesn't decode WebP images. This
+    preprocessor runs after it: each WebP version added by `ImageOptimizer`
+    to an output whose PNG image was extracted is extracted too, next to the
+    PNG file, and recorded in the ``filenames`` of the output metadata.
+    """
+
+    def preprocess_cell(
+        self, cell: NotebookNode, resources: dict[str, Any], index: int  # noqa: ARG002
+    ) -> tuple[NotebookNode, dict[str, Any]]:
+        """Extract the WebP images of the outputs of a cell."""
+        for output in cell.get("outputs", []):
+            filenames = output.get("metadata", {}).get("filenames", {})
+            if "image/webp" not in output.get("data", {}) or "image/png" not in (
+                filenames
+            ):
+                continue
+            filename = os.path.splitext(filenames["image/png"])[0] + ".webp"
+            resources.setdefault("outputs", {})[filename] = base64.b64decode(
+                output.data["image/webp"]
+            )
+            filenames["image/webp"] = filename
+        return cell, resources
@@ -0,0 +1,216 @@
+"""A pool of warm Jupyter kernels shared by the notebooks in a collection."""
+
+from __future__ import annotations
+
+import time
+from dataclasses import dataclass
+from multiprocessing.util import Finalize
+
+from jupyter_client.kernelspec import NATIVE_KERNEL_NAME, KernelSpecManager
+from jupyter_client.manager import AsyncKernelManager
+from jupyter_core.utils import run_sync
+
+from nbcollection.logger import logger
+
+__all__ = ["KernelLease", "KernelPool", "get_worker_kernel_pool"]
+
+RESET_POLICIES = ("restart", "reset")
+"""The allowed policies for resetting a kernel between notebooks."""
+
+
+@dataclass
+class KernelLease:
+    """A kernel handed out by a `KernelPool` to execute one notebook."""
+
+    km: AsyncKernelManager
+    """The manager of the running kernel."""
+
+    kernel_name: str
+    """The name of the kernelspec."""
+
+    wait_time: float
+    """The time spent waiting for the kernel to be ready, in seconds."""
+
+    startup_time: float
+    """The time a cold kernel of this kernelspec takes to start, in seconds."""
+
+    @property
+    def saved_time(self) -> float:
+        """The kernel startup time saved by using a warm kernel, in seconds."""
+        return max(self.startup_time - self.wait_time, 0.0)
+
+
+class KernelPool:
+    """A pool of warm Jupyter kernels, started once per kernelspec.
+
+    Kernels are reset before they are handed out to a notebook, according to
+    the reset policy:
+
+    ``"restart"``
+        Each notebook gets a fresh kernel process. As soon as a kernel is
+        handed out, a replacement kernel is started in the background so that
+        its startup overlaps with the execution of the current notebook.
+    ``"reset"``
+        Kernels are reused. Before each notebook, the user namespace and the
+        execution count are reset, as for a new IPython session. Modules that
+        were already imported stay loaded, so expensive imports are only paid
+        once, but any module-level state (e.g., Matplotlib settings) is shared
+        between notebooks.
+
+    In both cases, the working directory of the kernel is changed to the
+    directory of the notebook. Only Python kernels can be pooled.
+
+    Parameters
+    ----------
+    policy : str (optional)
+        The reset policy, either ``"restart"`` (default) or ``"reset"``.
+    startup_timeout : int (optional)
+        The time to wait for a kernel to start, in seconds.
+    """
+
+    def __init__(self, *, policy: str = "restart", startup_timeout: int = 60) -> None:
+        if policy not in RESET_POLICIES:
+            msg = (
+                f"Unknown kernel reset policy '{policy}'. Must be one of "
+                f"{list(RESET_POLICIES)}."
+            )
+            raise ValueError(msg)
+        self.policy = policy
+        self.startup_timeout = startup_timeout
+
+        # Idle kernels and their launch times, keyed by kernelspec name
+        self._idle: dict[str, list[tuple[AsyncKernelManager, float]]] = {}
+
+        # Time taken by the first (cold) kernel of each kernelspec to start
+        self._startup_times: dict[str, float] = {}
+
+        self._is_python: dict[str, bool] = {}
+
+    def supports(self, kernel_name: str) -> bool:
+        """Determine whether kernels of a kernelspec can be pooled."""
+        kernel_name = kernel_name or NATIVE_KERNEL_NAME
+        if kernel_name not in self._is_python:
+            try:
+                spec = KernelSpecManager().get_kernel_spec(kernel_name)
+            except Exception:  # noqa: BLE001
+                self._is_python[kernel_name] = False
+            else:
+                self._is_python[kernel_name] = spec.language.lower() == "python"
+        return self._is_python[kernel_name]
+
+    async def acquire_async(self, kernel_name: str, *, cwd: str) -> KernelLease:
+        """Get a ready kernel to execute a notebook.
+
+        Parameters
+        ----------
+        kernel_name : str
+            The name of the kernelspec. An empty string selects the default
+            Python kernel.
+        cwd : str
+            The working directory of the notebook.
+
+        Returns
+        -------
+        lease : `KernelLease`
+            The kernel, to be returned to the pool with `release`.
+        """
+        kernel_name = kernel_name or NATIVE_KERNEL_NAME
+        t0 = time.monotonic()
+
+        idle = self._idle.setdefault(kernel_name, [])
+        if idle:
+            km, launch_time = idle.pop(0)
+        else:
+            km, launch_time = await self._start_kernel(kernel_name), t0
+
+        if self.policy == "restart":
+            # Start the kernel for the next notebook while this one runs
+            idle.append((await self._start_kernel(kernel_name), time.monotonic()))
+
+        code = f"import os as _os\n_os.chdir({cwd!r})\ndel _os"
+        if self.policy == "reset":
+            # Unlike %reset, a new session also restarts the execution count,
+            # so that the cells of each notebook are numbered from 1
+            code = f"get_ipython().reset(new_session=True)\n{code}"
+        try:
+            await self._run_code(km, code)
+        except Exception:
+            await self._shutdown_kernel(km)
+            raise
+
+        t1 = time.monotonic()
+        if kernel_name not in self._startup_times:
+            self._startup_times[kernel_name] = t1 - launch_time
+
+        return KernelLease(
+            km=km,
+            kernel_name=kernel_name,
+            wait_time=t1 - t0,
+            startup_time=self._startup_times[kernel_name],
+        )
+
+    acquire = run_sync(acquire_async)
+
+    async def release_async(self, lease: KernelLease) -> None:
+        """Return a kernel to the pool after executing a notebook."""
+        km = lease.km
+        if self.policy == "reset" and await km.is_alive():
+            self._idle.setdefault(lease.kernel_name, []).append((km, time.monotonic()))
+        else:
+            await self._shutdown_kernel(km)
+
+    release = run_sync(release_async)
+
+    async def shutdown_async(self) -> None:
+        """Shut down all idle kernels in the pool."""
+        for kernels in self._idle.values():
+            for km, _ in kernels:
+                await self._shutdown_kernel(km)
+        self._idle.clear()
+
+    shutdown = run_sync(shutdown_async)
+
+    async def _start_kernel(self, kernel_name: str) -> AsyncKernelManager:
+        logger.debug(f"Starting a '{kernel_name}' kernel for the kernel pool")
+        km = AsyncKernelManager(kernel_name=kernel_name)
+        await km.start_kernel()
+        return km
+
+    async def _run_code(self, km: AsyncKernelManager, code: str) -> None:
+        """Run code in the kernel, raising an error if it fails."""
+        kc = km.client()
+        kc.start_channels()
+        try:
+            await kc.wait_for_ready(timeout=self.startup_timeout)
+            reply = await kc.execute_interactive(
+                code, silent=True, store_history=False, timeout=self.startup_timeout
+            )
+        finally:
+            kc.stop_channels()
+        if reply["content"]["status"] != "ok":
+            msg = f"Failed to reset the kernel: {reply['content'].get('evalue')}"
+            raise RuntimeError(msg)
+
+    @staticmethod
+    async def _shutdown_kernel(km: AsyncKernelManager) -> None:
+        try:
+            await km.shutdown_kernel(now=True)
+        except RuntimeError:
+            # The kernel is already dead
+            await km.cleanup_resources()
+
+
+_worker_kernel_pool: KernelPool | None = None
+
+
+def get_worker_kernel_pool(policy: str) -> KernelPool:
+    """Get the kernel pool of the current worker process.
+
+    The pool is created on first use and its kernels are shut down when the
+    worker process exits.
+    """
+    global _worker_kernel_pool  # noqa: PLW0603
+    if _worker_kernel_pool is None:
+        _worker_kernel_pool = KernelPool(policy=policy)
+        Finalize(_worker_kernel_pool, _worker_kernel_pool.shutdown, exitpriority=10)
+    return _worker_kernel_pool
@@ -4,8 +4,9 @@
 
 # Standard library
 import logging
+from contextlib import contextmanager
 
-__all__ = ["logger"]
+__all__ = ["logger", "buffered_logs"]
 
 
 class CustomHandler(logging.StreamHandler):
@@ -37,3 +38,55 @@ class CustomLogger(logging.getLoggerClass()):
 logging.setLoggerClass(CustomLogger)
 logger = logging.getLogger("nbcollection")
 logger._set_defaults()
+
+
+class BufferHandler(logging.Handler):
+    """A handler that stores log records instead of emitting them."""
+
+    def __init__(self):
+        super().__init__()
+        self.records = []
+
+    def emit(self, record):
+        """Store the log record."""
+        self.records.append(record)
+
+
+@contextmanager
+def buffered_logs(level=None):
+    """Temporarily buffer the nbcollection log records instead of emitting them.
+
+    This is used by worker processes so that the log messages for one notebook
+    can be sent back to the main process and emitted together, rather than
+    being interleaved with the messages from other workers.
+
+    Parameters
+    ----------
+    level : int (optional)
+        The log level to use while buffering. Defaults to the current level.
+
+    Yields
+    ------
+    records : list of `logging.LogRecord`
+        The list that the buffered records are appended to.
+    """
+    handlers = logger.handlers[:]
+    old_level = logger.level
+    old_propagate = logger.propagate
+
+    buffer = BufferHandler()
+    for handler in handlers:
+        logger.removeHandler(handler)
+    logger.addHandler(buffer)
+    logger.propagate = False
+    if level is not None:
+        logger.setLevel(level)
+
+    try:
+        yield buffer.records
+    finally:
+        logger.removeHandler(buffer)
+        for handler in handlers:
+            logger.addHandler(handler)
+        logger.propagate = old_propagate
+        logger.setLevel(old_level)
@@ -0,0 +1,246 @@
+"""Persistent record of the notebooks built in a build directory."""
+
+from __future__ import annotations
+
+import hashlib
+import os
+import sqlite3
+from contextlib import closing
+from dataclasses import dataclass, fields
+from typing import Any
+
+__all__ = ["BuildManifest", "NotebookRecord", "NotebookStatus", "hash_file"]
+
+
+def hash_file(path: str) -> str:
+    """Compute the SHA-256 hash of the content of a file."""
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        while chunk := f.read(1 << 16):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+@dataclass
+class NotebookRecord:
+    """The recorded build state of a notebook."""
+
+    path: str
+    """The path to the source notebook, relative to the root source directory.
+
+    Unlike the absolute path, it doesn't change if the collection is moved,
+    e.g., if a manifest restored from a previous build is used in another
+    working directory.
+    """
+
+    input_hash: str | None = None
+    """The SHA-256 hash of the source notebook when it was last built."""
+
+    cache_key: str | None = None
+    """The execution cache key of the notebook when it was last built."""
+
+    exec_path: str | None = None
+    """The path to the executed notebook."""
+
+    html_path: str | None = None
+    """The path to the HTML page."""
+
+    execute_status: str | None = None
+    """The outcome of the last execution: ``"executed"``, ``"cached"`` (the
+    outputs were restored from the execution cache), ``"skipped"`` (the
+    executed notebook was up to date) or ``"error"``.
+    """
+
+    execute_error: str | None = None
+    """The error message of the last execution, if it failed."""
+
+    execute_time: float | None = None
+    """The duration of the last actual execution of the notebook, in seconds."""
+
+    peak_memory: int | None = None
+    """The peak resident memory of the kernel during the last actual execution
+    of the notebook, in bytes. Only recorded for local kernels on Linux.
+    """
+
+    executed_at: float | None = None
+    """The time when the notebook was last executed (or skipped), as a Unix
+    timestamp.
+    """
+
+    convert_status: str | None = None
+    """The outcome of the last conversion: ``"converted"``, ``"skipped"`` (the
+    HTML page was up to date) or ``"error"``.
+    """
+
+    convert_error: str | None = None
+    """The error message of the last conversion, if it failed."""
+
+    convert_time: float | None = None
+    """The duration of the last actual conversion to HTML, in seconds."""
+
+    converted_at: float | None = None
+    """The time when the notebook was last converted (or skipped), as a Unix
+    timestamp.
+    """
+
+    @classmethod
+    def from_summary(
+        cls, path: str, *, exec_path: str, html_path: str, summary: dict[str, Any]
+    ) -> NotebookRecord:
+        """Create a record from the summary of a notebook built in this run."""
+        values = {
+            f.name: summary.get(f.name)
+            for f in fields(cls)
+            if f.name not in ("path", "exec_path", "html_path")
+        }
+        return cls(path=path, exec_path=exec_path, html_path=html_path, **values)
+
+    @property
+    def failed(self) -> bool:
+        """Whether the last execution or conversion of the notebook failed."""
+        return "error" in (self.execute_status, self.convert_status)
+
+    @property
+    def built_at(self) -> float | None:
+        """The time of the last execution or conversion, as a Unix timestamp."""
+        times = [t for t in (self.executed_at, self.converted_at) if t is not None]
+        return max(times, default=None)
+
+
+@dataclass
+class NotebookStatus:
+    """The build status of a notebook, determined without executing it."""
+
+    name: str
+    """The path to the notebook, relative to the root source directory."""
+
+    state: str
+    """``"new"`` if the notebook was never built, ``"failed"`` if its last
+    build failed and it is unchanged since, ``"stale"`` if it changed or its
+    outputs are out of date, ``"up to date"``, or ``"error"`` if it can't be
+    read (see `error`).
+    """
+
+    execute: str
+    """What executing the notebook would do: ``"skip"``, ``"restore"`` (from
+    the execution cache) or ``"execute"``, or ``"unknown"`` if the notebook
+    can't be read.
+    """
+
+    convert: str
+    """What converting the notebook would do: ``"skip"`` or ``"convert"``, or
+    ``"unknown"`` if the notebook can't be read.
+    """
+
+    estimated_time: float | None
+    """The estimated time to rebuild the notebook, in seconds, based on its
+    previous builds. None if it can't be estimated.
+    """
+
+    record: NotebookRecord | None
+    """The recorded build state of the notebook, if it was built before."""
+
+    error: str | None = None
+    """The error raised while reading the notebook, e.g., if it isn't valid
+    JSON or doesn't match the notebook format schema.
+    """
+
+
+_COLUMNS = [f.name for f in fields(NotebookRecord)]
+
+# The columns of each build stage, which are only updated if the stage ran
+_STAGE_COLUMNS = {
+    "execute": ("execute_status", "execute_error", "executed_at"),
+    "convert": ("convert_status", "convert_error", "converted_at"),
+}
+
+
+def _update_expression(name: str) -> str:
+    """Get the SQL expression that updates a column of an existing record."""
+    for stage, columns in _STAGE_COLUMNS.items():
+        if name in columns:
+            return (
+                f"CASE WHEN excluded.{stage}_status IS NULL THEN {name} "
+                f"ELSE excluded.{name} END"
+            )
+    # Other values are kept if they are unknown. In particular, durations are
+    # only measured when a notebook is actually executed or converted, so the
+    # previous durations are kept when it is skipped or restored from the
+    # cache. This lets them be used to estimate rebuild times.
+    return f"COALESCE(excluded.{name}, {name})"
+
+
+class BuildManifest:
+    """A persistent record of the notebooks built in a build directory.
+
+    The manifest is a SQLite database with one row per source notebook (see
+    `NotebookRecord`). It is updated at the end of each execution or
+    conversion, and read by the ``nbcollection status`` and
+    ``nbcollection plan`` commands to report which notebooks need to be
+    rebuilt without executing them.
+
+    Parameters
+    ----------
+    path : str
+        The path to the SQLite database file. It is created if needed.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+
+    def _connect(self) -> sqlite3.Connection:
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        conn = sqlite3.connect(self.path, timeout=30)
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS notebooks "
+            f"(path TEXT PRIMARY KEY, {', '.join(_COLUMNS[1:])})"
+        )
+        # Add the columns of fields added since the manifest was created
+        existing = {row[1] for row in conn.execute("PRAGMA table_info(notebooks)")}
+        for name in _COLUMNS:
+            if name not in existing:
+                conn.execute(f"ALTER TABLE notebooks ADD COLUMN {name}")
+        return conn
+
+    def get(self, path: str) -> NotebookRecord | None:
+        """Get the record of a notebook, or None if it was never built."""
+        if not os.path.exists(self.path):
+            return None
+        with closing(self._connect()) as conn:
+            row = conn.execute(
+                f"SELECT {', '.join(_COLUMNS)} FROM notebooks "  # noqa: S608
+                "WHERE path = ?",
+                (path,),
+            ).fetchone()
+        return None if row is None else NotebookRecord(*row)
+
+    def get_all(self) -> dict[str, NotebookRecord]:
+        """Get the records of all notebooks, keyed by `NotebookRecord.path`."""
+        if not os.path.exists(self.path):
+            return {}
+        with closing(self._connect()) as conn:
+            rows = conn.execute(
+                f"SELECT {', '.join(_COLUMNS)} FROM notebooks"  # noqa: S608
+            ).fetchall()
+        return {row[0]: NotebookRecord(*row) for row in rows}
+
+    def update(self, records: list[NotebookRecord]) -> None:
+        """Insert or update the records of notebooks.
+
+        The fields of a stage (execution or conversion) are only updated if
+        its status is set in the new record. Other fields are only updated if
+        they are not None in the new record.
+        """
+        if not records:
+            return
+        placeholders = ", ".join(f":{name}" for name in _COLUMNS)
+        updates = ", ".join(
+            f"{name} = {_update_expression(name)}" for name in _COLUMNS[1:]
+        )
+        with closing(self._connect()) as conn, conn:
+            conn.executemany(
+                f"INSERT INTO notebooks ({', '.join(_COLUMNS)}) "  # noqa: S608
+                f"VALUES ({placeholders}) "
+                f"ON CONFLICT(path) DO UPDATE SET {updates}",
+                [vars(record) for record in records],
+            )
@@ -0,0 +1,216 @@
+"""Memory usage of kernel processes."""
+
+from __future__ import annotations
+
+import re
+import sys
+import threading
+from typing import Any
+
+__all__ = [
+    "MemorySampler",
+    "current_memory",
+    "format_memory",
+    "kernel_pid",
+    "parse_memory",
+    "peak_memory",
+    "reset_peak_memory",
+]
+
+_MEMORY_RE = re.compile(r"^\s*(\d+(?:\.\d*)?)\s*([kmgt]?)i?b?\s*$", re.IGNORECASE)
+
+_MEMORY_UNITS = {"": 1, "k": 1 << 10, "m": 1 << 20, "g": 1 << 30, "t": 1 << 40}
+
+
+def parse_memory(size: str) -> int:
+    """Parse a memory size, e.g., ``"8G"`` or ``"512MB"``, in bytes.
+
+    Units are powers of 1024. A number without a unit is a number of bytes.
+    """
+    match = _MEMORY_RE.match(size)
+    if match is None:
+        msg = f"Invalid memory size '{size}'. Use, e.g., 8G or 512M."
+        raise ValueError(msg)
+    number, unit = match.groups()
+    return int(float(number) * _MEMORY_UNITS[unit.lower()])
+
+
+def format_memory(size: float | None) -> str:
+    """Format a memory size in bytes, or '?' if it is unknown."""
+    if size is None:
+        return "?"
+    for unit in ("B", "KiB", "MiB", "GiB"):
+        if size < 1024:  # noqa: PLR2004
+            return f"{size:.0f} {unit}" if unit == "B" else f"{size:.1f} {unit}"
+        size /= 1024
+    return f"{size:.1f} TiB"
+
+
+def kernel_pid(km: Any) -> int | None:
+    """Get the process ID of a local kernel, or None if it is unknown.
+
+    Parameters
+    ----------
+    km : `jupyter_client.KernelManager`
+        The manager of the kernel.
+    """
+    provisioner = getattr(km, "provisioner", None)
+    pid = getattr(provisioner, "pid", None)
+    return pid if isinstance(pid, int) else None
+
+
+def _read_status(pid: int, field: str) -> int | None:
+    """Read a memory size from ``/proc/<pid>/status``, in bytes."""
+    try:
+        with open(f"/proc/{pid}/status", encoding="ascii") as f:
+            for line in f:
+                if line.startswith(f"{field}:"):
+                    # e.g., "VmHWM:   123456 kB"
+                    return int(line.split()[1]) * 1024
+    except (OSError, ValueError):
+        pass
+    return None
+
+
+def current_memory(pid: int) -> int | None:
+    """Get the resident memory of a process, in bytes.
+
+    This is only available on Linux, from ``/proc``.
+
+    Parameters
+    ----------
+    pid : int
+        The process ID.
+
+    Returns
+    -------
+    memory : int or None
+        The resident set size, or None if it isn't available.
+    """
+    if not sys.platform.startswith("linux"):
+        return None
+    return _read_status(pid, "VmRSS")
+
+
+def peak_memory(pid: int) -> int | None:
+    """Get the peak resident memory of a process, in bytes.
+
+    This is only available on Linux, from ``/proc``. It is the peak since the
+    process started, or since it was last reset with `reset_peak_memory`.
+
+    Parameters
+    ----------
+    pid : int
+        The process ID.
+
+    Returns
+    -------
+    peak : int or None
+        The peak resident set size, or None if it isn't available.
+    """
+    if not sys.platform.startswith("linux"):
+        return None
+    return _read_status(pid, "VmHWM")
+
+
+def reset_peak_memory(pid: int) -> bool:
+    """Reset the peak resident memory of a process to its current memory.
+
+    Parameters
+    ----------
+    pid : int
+        The process ID.
+
+    Returns
+    -------
+    reset : bool
+        Whether the peak was reset. It can only be reset on Linux, for
+        processes of the same user.
+    """
+    if not sys.platform.startswith("linux"):
+        return False
+    try:
+        with open(f"/proc/{pid}/clear_refs", "w", encoding="ascii") as f:
+            f.write("5")
+    except OSError:
+        return False
+    return True
+
+
+class MemorySampler:
+    """Samples the resident memory of a kernel while it runs a notebook.
+
+    The sampler is attached to an nbclient ``NotebookClient`` (or nbconvert
+    ``ExecutePreprocessor``) through its notebook hooks, see `hooks`. Once the
+    kernel has started, a background thread reads the resident memory of the
+    kernel process at a regular interval and keeps the peak. Memory is only
+    sampled for local kernels on Linux.
+
+    Parameters
+    ----------
+    interval : float (optional)
+        The time between two samples, in seconds.
+    """
+
+    def __init__(self, *, interval: float = 0.1) -> None:
+        self.interval = interval
+        self.peak: int | None = None
+        self.client: Any = None
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def hooks(self, client: Any) -> dict[str, Any]:
+        """Get the notebook hooks to attach to the client executing the notebook.
+
+        Parameters
+        ----------
+        client : `nbclient.NotebookClient`
+            The client executing the notebook.
+        """
+        self.client = client
+        return {
+            "on_notebook_start": self._on_notebook_start,
+            "on_notebook_complete": self._on_notebook_end,
+            "on_notebook_error": self._on_notebook_end,
+        }
+
+    def start(self, pid: int) -> None:
+        """Start sampling the memory of a process."""
+        if self._thread is not None or current_memory(pid) is None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._sample, args=(pid,), name="nbcollection-memory", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> int | None:
+        """Stop sampling.
+
+        Returns
+        -------
+        peak : int or None
+            The peak resident memory of the kernel, in bytes, or None if it
+            wasn't sampled.
+        """
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join()
+            self._thread = None
+        return self.peak
+
+    def _sample(self, pid: int) -> None:
+        while True:
+            memory = current_memory(pid)
+            if memory is not None and (self.peak is None or memory > self.peak):
+                self.peak = memory
+            if self._stop.wait(self.interval):
+                return
+
+    def _on_notebook_start(self, **kwargs: Any) -> None:  # noqa: ARG002
+        pid = kernel_pid(self.client.km)
+        if pid is not None:
+            self.start(pid)
+
+    def _on_notebook_end(self, **kwargs: Any) -> None:  # noqa: ARG002
+        self.stop()
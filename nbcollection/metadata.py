@@ -0,0 +1,58 @@
+"""The metadata of the notebooks of a build, used to render the index page."""
+
+from __future__ import annotations
+
+import json
+import os
+import uuid
+from typing import Any
+
+__all__ = ["read_metadata", "write_metadata"]
+
+
+def read_metadata(path: str) -> dict[str, dict[str, Any]]:
+    """Read the metadata file of a build.
+
+    Parameters
+    ----------
+    path : str
+        The path to the metadata file.
+
+    Returns
+    -------
+    entries : dict
+        The metadata of each notebook, keyed by the path of the notebook
+        relative to the root source directory. Empty if the file doesn't
+        exist or can't be read.
+    """
+    try:
+        with open(path, encoding="utf-8") as f:
+            entries = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    return entries if isinstance(entries, dict) else {}
+
+
+def write_metadata(path: str, entries: dict[str, dict[str, Any]]) -> None:
+    """Write the metadata file of a build through a temporary file.
+
+    Parameters
+    ----------
+    path : str
+        The path to the metadata file.
+    entries : dict
+        The metadata of each notebook, see `read_metadata`.
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    # Created with the permissions of the umask, like the other files of the
+    # build (unlike with tempfile.mkstemp)
+    tmp_path = os.path.join(directory, f".{uuid.uuid4().hex}.tmp")
+    try:
+        with open(tmp_path, "x", encoding="utf-8") as f:
+            json.dump(entries, f, indent=1, sort_keys=True)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
@@ -2,26 +2,55 @@
 
 import re
 
-import nbformat
+from markdown_it import MarkdownIt
 
-__all__ = ["is_executed", "get_title"]
+from nbcollection.nb_io import read_notebook
+from nbcollection.themes.learnastropy.tocpreprocessor import parse_heading
 
+__all__ = ["is_executed", "get_title", "find_title", "get_index_metadata"]
 
-def is_executed(nb_path):
+
+# Matches an "outputs" key of a notebook cell followed by a non-empty array.
+# Inside JSON strings, double quotes are always escaped, so an unescaped
+# '"outputs":' can only be an object key.
+_NONEMPTY_OUTPUTS_RE = re.compile(rb'[{,\s]"outputs"\s*:\s*\[\s*[^\]\s]')
+
+# Number of bytes kept between chunks, so that a match split across two chunks
+# is still found.
+_SCAN_OVERLAP = 1024
+
+# Only the block structure of the markdown is needed to find the headings and
+# paragraphs, so inline parsing (emphasis, links, etc.) is turned off.
+_md = MarkdownIt().disable("inline")
+
+
+def is_executed(nb_path, *, chunk_size=1 << 16):
     """Determine whether the notebook file has been executed.
 
+    Rather than parsing the whole notebook, including any large embedded
+    image outputs, the file is scanned incrementally and the scan stops at
+    the first non-empty ``outputs`` array of a cell.
+
     Parameters
     ----------
     nb_path : str
         The string path to a notebook file.
+    chunk_size : int (optional)
+        The number of bytes read at a time.
 
     Returns
     -------
     is_executed : bool
         True if the notebook has been executed.
     """
-    nb = nbformat.read(nb_path, nbformat.NO_CONVERT)
-    return any(cell.cell_type == "code" and cell.outputs for cell in nb.cells)
+    tail = b""
+    with open(nb_path, "rb") as f:
+        while chunk := f.read(chunk_size):
+            data = tail + chunk
+            if _NONEMPTY_OUTPUTS_RE.search(data):
+                return True
+            tail = data[-_SCAN_OVERLAP:]
+    return False
 
 
 def get_title(nb_path):
@@ -38,16 +67,10 @@ def get_title(nb_path):
         The string title.
     """
     # read the first top-level header as the notebook title
-    with open(nb_path) as f:
-        nb = nbformat.read(f, as_version=4)  # TODO: make config item?
-
-    for cell in nb["cells"]:
-        match = re.search("# (.*)", cell["source"])
-
-        if match:
-            break
+    nb = read_notebook(nb_path, as_version=4)  # TODO: make config item?
 
-    else:
+    title = find_title(nb)
+    if title is None:
         msg = (
             "Failed to find a title for the notebook. To include it in an index page, "
             "each notebook must have a H1 heading that is treated as the notebooks "
@@ -55,4 +78,91 @@ def get_title(nb_path):
         )
         raise RuntimeError(msg)
 
-    return match.groups()[0]
+    return title
+
+
+def find_title(nb):
+    """Find the title of a notebook by finding the first H1 header.
+
+    Only the headings of markdown cells are considered, so that, e.g., a
+    ``# comment`` line in a code cell isn't taken as the title.
+
+    Parameters
+    ----------
+    nb : `nbformat.NotebookNode`
+        The notebook.
+
+    Returns
+    -------
+    title : str or None
+        The string title, or None if the notebook doesn't have a H1 header.
+    """
+    for block, level, content in _markdown_blocks(nb):
+        if block == "heading" and level == 1:
+            return content
+    return None
+
+
+def get_index_metadata(nb):
+    """Get the metadata of a notebook that is shown on the index page.
+
+    Parameters
+    ----------
+    nb : `nbformat.NotebookNode`
+        The notebook.
+
+    Returns
+    -------
+    metadata : dict
+        The ``title`` of the notebook (see `find_title`), its
+        ``description`` (the first paragraph after the title, or None), its
+        table of contents ``toc`` (the other headings, each with its plain
+        text ``title``, ``level`` and the ``href`` of its anchor in the page,
+        see `~nbcollection.themes.learnastropy.tocpreprocessor.parse_heading`),
+        and the ``tags`` listed in the notebook metadata.
+    """
+    title = None
+    description = None
+    toc = []
+    for block, level, content in _markdown_blocks(nb):
+        if block == "heading":
+            if title is None and level == 1:
+                title = content
+            else:
+                toc_title, href = parse_heading(content, level)
+                toc.append({"title": toc_title, "level": level, "href": href})
+        elif description is None and title is not None:
+            description = content
+    return {
+        "title": title,
+        "description": description,
+        "toc": toc,
+        "tags": list(nb.metadata.get("tags", [])),
+    }
+
+
+def _markdown_blocks(nb):
+    """Iterate over the top-level headings and paragraphs of the markdown cells.
+
+    Yields
+    ------
+    block : str
+        Either ``"heading"`` or ``"paragraph"``.
+    level : int
+        The heading level, or 0 for paragraphs.
+    content : str
+        The markdown content of the block.
+    """
+    for cell in nb["cells"]:
+        if cell["cell_type"] != "markdown":
+            continue
+        tokens = _md.parse(cell["source"])
+        for i, token in enumerate(tokens):
+            # Not, e.g., headings in block quotes. The inline token, with the
+            # content, always follows the opening token.
+            if token.level != 0:
+                continue
+            if token.type == "heading_open":
+                yield "heading", int(token.tag.lstrip("h")), tokens[i + 1].content
+            elif token.type == "paragraph_open":
+                yield "paragraph", 0, tokens[i + 1].content
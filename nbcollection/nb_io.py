@@ -0,0 +1,166 @@
+"""Reading and writing notebook files.
+
+These functions are drop-in replacements for ``nbformat.read`` and
+``nbformat.writes`` with two speed-ups for large collections:
+
+- Schema validation with ``jsonschema`` can be skipped for trusted notebooks
+  by passing ``validate=False``. Validation is on by default.
+- If the optional `orjson <https://github.com/ijl/orjson>`_ package is
+  installed, it is used to parse and serialize the notebook JSON instead of
+  the standard library's ``json`` module.
+"""
+
+from __future__ import annotations
+
+import copy
+import json
+from typing import Any
+
+import nbformat
+from nbformat import NO_CONVERT, NotebookNode
+from nbformat.reader import NotJSONError, get_version
+from nbformat.v4.rwbase import split_lines, strip_transient
+from nbformat.validator import ValidationError
+
+from nbcollection.logger import logger
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None  # type: ignore[assignment]
+
+__all__ = ["read_notebook", "reads_notebook", "writes_notebook"]
+
+
+def _loads(data: bytes | str) -> Any:
+    if orjson is not None:
+        try:
+            return orjson.loads(data)
+        except orjson.JSONDecodeError:
+            # orjson is strict, e.g., it doesn't accept NaN; fall back to json
+            pass
+    return json.loads(data)
+
+
+def _default(obj: Any) -> Any:
+    # Same as nbformat's BytesEncoder: b64-encoded data may be stored as bytes
+    if isinstance(obj, bytes):
+        return obj.decode("ascii")
+    raise TypeError
+
+
+def _dumps(nb_dict: dict) -> str:
+    if orjson is not None:
+        try:
+            return orjson.dumps(
+                nb_dict,
+                default=_default,
+                option=orjson.OPT_INDENT_2 | orjson.OPT_SORT_KEYS,
+            ).decode("utf-8")
+        except orjson.JSONEncodeError:
+            # e.g., integers larger than 64 bits; fall back to json
+            pass
+    return json.dumps(
+        nb_dict,
+        default=_default,
+        indent=1,
+        sort_keys=True,
+        separators=(",", ": "),
+        ensure_ascii=False,
+    )
+
+
+def _validate(nb: NotebookNode) -> None:
+    # Like nbformat, log invalid notebooks instead of raising an error
+    try:
+        nbformat.validate(nb)
+    except ValidationError as e:
+        logger.error(f"Notebook JSON is invalid: {e}")
+
+
+def reads_notebook(
+    data: bytes | str, *, as_version: Any = 4, validate: bool = True
+) -> NotebookNode:
+    """Read a notebook from a JSON string.
+
+    Parameters
+    ----------
+    data : bytes or str
+        The notebook JSON.
+    as_version : int (optional)
+        The version of the notebook format to return. Pass
+        ``nbformat.NO_CONVERT`` to prevent conversion.
+    validate : bool (optional)
+        Whether to validate the notebook against the notebook format schema.
+
+    Returns
+    -------
+    nb : `nbformat.NotebookNode`
+        The notebook.
+    """
+    try:
+        nb_dict = _loads(data)
+    except ValueError as e:
+        msg = f"Notebook does not appear to be JSON: {data[:50]!r}..."
+        raise NotJSONError(msg) from e
+
+    major, minor = get_version(nb_dict)
+    if major not in nbformat.versions:
+        msg = f"Unsupported nbformat version {major}"
+        raise nbformat.NBFormatError(msg)
+    nb = nbformat.versions[major].to_notebook_json(nb_dict, minor=minor)
+
+    if as_version is not NO_CONVERT:
+        nb = nbformat.convert(nb, as_version)
+    if validate:
+        _validate(nb)
+    return nb
+
+
+def read_notebook(
+    path: str, *, as_version: Any = 4, validate: bool = True
+) -> NotebookNode:
+    """Read a notebook file.
+
+    Parameters
+    ----------
+    path : str
+        The path to the notebook file.
+    as_version : int (optional)
+        The version of the notebook format to return. Pass
+        ``nbformat.NO_CONVERT`` to prevent conversion.
+    validate : bool (optional)
+        Whether to validate the notebook against the notebook format schema.
+
+    Returns
+    -------
+    nb : `nbformat.NotebookNode`
+        The notebook.
+    """
+    with open(path, "rb") as f:
+        return reads_notebook(f.read(), as_version=as_version, validate=validate)
+
+
+def writes_notebook(nb: NotebookNode, *, validate: bool = True) -> str:
+    """Write a (version 4) notebook to a JSON string.
+
+    With the standard library's ``json`` module, the output is identical to
+    the file written by ``nbformat.write``. With ``orjson``, it is indented
+    with two spaces instead of one.
+
+    Parameters
+    ----------
+    nb : `nbformat.NotebookNode`
+        The notebook.
+    validate : bool (optional)
+        Whether to validate the notebook against the notebook format schema.
+
+    Returns
+    -------
+    content : str
+        The notebook JSON, ending with a newline.
+    """
+    if validate:
+        _validate(nb)
+    nb = strip_transient(split_lines(copy.deepcopy(nb)))
+    return _dumps(nb) + "\n"
@@ -1,25 +1,94 @@
 """Operations on an individual notebook."""
 
 # Standard library
+import asyncio
+import datetime
+import hashlib
+import json
 import os
+import sys
 import time
+from contextlib import contextmanager
+from copy import deepcopy
 from pathlib import PurePosixPath
+from typing import Any
 from urllib.parse import urlencode
 
-import nbformat
-
 # Third-party
+from nbclient import NotebookClient
+from nbclient.util import run_hook
 from nbconvert.preprocessors import CellExecutionError, ExecutePreprocessor
 from nbconvert.writers import FilesWriter
 from traitlets.config import Config
 
 # Package
+from nbcollection.cache import restore_outputs
+from nbcollection.dependencies import DependencyTracer
 from nbcollection.logger import logger
-from nbcollection.nb_helpers import is_executed
+from nbcollection.memory import MemorySampler, format_memory
+from nbcollection.nb_helpers import get_index_metadata, is_executed
+from nbcollection.nb_io import read_notebook, reads_notebook, writes_notebook
+from nbcollection.profiling import CellProfiler, cell_profiles
+from nbcollection.search import notebook_sections
 from nbcollection.themes.learnastropy.html import LearnAstropyHtmlExporter
+from nbcollection.timing import PHASES, KernelTimer, timed
 
 __all__ = ["NbcollectionNotebook"]
 
+# HTML exporters shared by all notebooks with the same conversion options
+_exporters: dict[str, LearnAstropyHtmlExporter] = {}
+
+
+def get_exporter(config, convert_kwargs):
+    """Get the HTML exporter for a conversion configuration.
+
+    Exporters are created once per configuration and reused, so that the
+    Jinja environment, the compiled templates, and the theme CSS are only
+    loaded once per collection (and once per worker process).
+
+    Parameters
+    ----------
+    config : `traitlets.config.Config`
+        The configuration of the exporter.
+    convert_kwargs : dict
+        Keyword arguments passed through to the exporter.
+
+    Returns
+    -------
+    exporter : `nbcollection.themes.learnastropy.html.LearnAstropyHtmlExporter`
+        The HTML exporter.
+    """
+    key = json.dumps([config, convert_kwargs], sort_keys=True, default=str)
+    if key not in _exporters:
+        logger.debug("Creating the HTML exporter")
+        _exporters[key] = LearnAstropyHtmlExporter(
+            config=deepcopy(config), **convert_kwargs
+        )
+    return _exporters[key]
+
+
+def _add_hooks(client, hooks):
+    """Attach hooks to an nbclient client, after the hooks it already has.
+
+    Parameters
+    ----------
+    client : `nbclient.NotebookClient`
+        The client executing a notebook.
+    hooks : dict
+        The hooks (e.g., ``on_cell_executed``), keyed by name.
+    """
+    for name, hook in hooks.items():
+        previous = getattr(client, name)
+        if previous is None:
+            setattr(client, name, hook)
+            continue
+
+        async def chained_hook(previous=previous, hook=hook, **kwargs):
+            await run_hook(previous, **kwargs)
+            await run_hook(hook, **kwargs)
+
+        setattr(client, name, chained_hook)
+
 
 class NbcollectionNotebook:
     """An individual notebook.
@@ -40,6 +109,32 @@ class NbcollectionNotebook:
     convert_preprocessors : list of str (optional)
         The preprocessors enabled for the HTMLExporter. For example,
         ``"nbconvert.preprocessors.ExtractOutputPreprocessor"``.
+    cache : `nbcollection.cache.ExecutionCache` (optional)
+        The execution cache. If set, the notebook is only executed when its
+        cache key has changed or ``overwrite`` is True; otherwise, its
+        outputs are restored from the cache. If not set, an existing executed
+        notebook is reused unless ``overwrite`` is True.
+    validate : bool (optional)
+        Whether to validate notebooks against the notebook format schema when
+        they are read and written. Validation can be turned off to save time
+        on large, trusted notebooks.
+    cell_time_budget : float (optional)
+        If set, a warning is logged for each cell that takes longer than this
+        time to execute, in seconds.
+    asset_store : `nbcollection.assets.AssetStore` (optional)
+        If set, the outputs extracted from the notebook (e.g., figures) are
+        written to this store, shared by all pages, instead of an
+        ``nboutput`` directory next to the page.
+    image_optimizer : `nbcollection.images.ImageOptimizer` (optional)
+        If set, the images of the executed notebook are optimized before it
+        is converted to HTML. The executed notebook file is left unchanged.
+    search_index : bool (optional)
+        Whether to split the notebook into the sections of the search index
+        when it is converted, see `nbcollection.search.notebook_sections`.
+    manifest : `nbcollection.manifest.BuildManifest` (optional)
+        The build manifest. If set, with an execution cache, the existing
+        executed notebook is reused if it was built from the same source
+        notebook and cache key, without restoring its outputs again.
     """
 
     nbformat_version = 4
@@ -55,9 +150,23 @@ class NbcollectionNotebook:
         execute_kwargs=None,
         convert_kwargs=None,
         convert_preprocessors=None,
+        cache=None,
+        validate=True,
+        cell_time_budget=None,
+        asset_store=None,
+        image_optimizer=None,
+        search_index=False,
+        manifest=None,
     ) -> None:
         self._config = config
         self._repo_path = repo_path
+        self.cache = cache
+        self.validate = validate
+        self.cell_time_budget = cell_time_budget
+        self.asset_store = asset_store
+        self.image_optimizer = image_optimizer
+        self.search_index = search_index
+        self.manifest = manifest
 
         if not os.path.exists(file_path):
             msg = f"Notebook file '{file_path}' does not exist"
@@ -85,6 +194,18 @@ class NbcollectionNotebook:
         self.exec_path = os.path.join(output_path, f"{self.basename}.ipynb")
         self.html_path = os.path.join(output_path, f"{self.basename}.html")
 
+        # The executed notebook, kept in memory after execution so that it
+        # doesn't need to be read again to convert it. It is released once
+        # the notebook has been converted.
+        self.executed_nb = None
+
+        # Light metadata about the executed notebook, e.g., its title for the
+        # index page (see `nbcollection.nb_helpers.get_index_metadata`) or the
+        # durations of the build phases (see `nbcollection.timing.PHASES`).
+        # This is small enough to be kept for the whole build and sent back
+        # from worker processes.
+        self.summary: dict[str, Any] = {"timings": {}}
+
         self.overwrite = overwrite
 
         if execute_kwargs is None:
@@ -99,71 +220,462 @@ class NbcollectionNotebook:
         if convert_preprocessors is not None:
             self.converter_config.HTMLExporter.preprocessors = convert_preprocessors
 
-    def execute(self):
+    def execute(self, *, kernel_pool=None):
         """Execute this notebook file.
 
-        The output notebook is written to a  new file.
+        The output notebook is written to a  new file. If an execution cache is
+        set and it contains an entry for the current content of the notebook,
+        the outputs are restored from the cache instead of running the
+        notebook.
+
+        Parameters
+        ----------
+        kernel_pool : `nbcollection.kernels.KernelPool` (optional)
+            A pool of warm kernels. If set, the notebook is executed with a
+            kernel from the pool instead of starting a new kernel.
+
+        Returns
+        -------
+        executed_nb_path : str, ``None``
+            The path to the executed notebook.
+        """
+        with self._record_stage("execute"):
+            nb, cache_key = self._prepare_execution()
+            if nb is None:
+                return self.exec_path
+
+            # Execute the notebook
+            logger.debug(f"Executing notebook '{self.filename}' ⏳")
+            t0 = time.perf_counter()
+
+            executor = ExecutePreprocessor(**self.execute_kwargs)
+            self._profile_cells(executor)
+            tracer = self._trace_dependencies(executor, nb)
+            kernel_timer = KernelTimer(self.summary["timings"])
+            _add_hooks(executor, kernel_timer.hooks())
+            memory_sampler = MemorySampler()
+            _add_hooks(executor, memory_sampler.hooks(executor))
+
+            kernel_name = self._get_kernel_name(nb)
+            kernel_timer.start()
+            lease = None
+            if kernel_pool is not None and kernel_pool.supports(kernel_name):
+                lease = kernel_pool.acquire(kernel_name, cwd=self.path)
+
+            try:
+                executor.preprocess(
+                    nb,
+                    {"metadata": {"path": self.path}},
+                    km=lease.km if lease is not None else None,
+                )
+            except CellExecutionError:
+                logger.error(f"Notebook '{self.filename}' errored ❌")
+                raise
+            finally:
+                if lease is not None:
+                    if executor.kc is not None:
+                        executor.kc.stop_channels()
+                    kernel_pool.release(lease)
+                kernel_timer.stop()
+                self._record_peak_memory(nb, memory_sampler)
+
+            self._finish_execution(
+                nb,
+                cache_key,
+                run_time=time.perf_counter() - t0,
+                lease=lease,
+                tracer=tracer,
+            )
+            return self.exec_path
+
+    async def execute_async(self, *, kernel_pool=None):
+        """Execute this notebook file with nbclient's asynchronous API.
+
+        This is the asynchronous version of `execute`, so that many notebooks
+        can be executed at the same time from one event loop. Reading the
+        notebook, computing its cache key and writing the executed notebook
+        are done in a worker thread, so that they don't block the kernels of
+        the other notebooks.
 
         Parameters
         ----------
-        overwrite : bool, optional
-            Whether or not to overwrite an existing executed notebook file.
+        kernel_pool : `nbcollection.kernels.KernelPool` (optional)
+            A pool of warm kernels. If set, the notebook is executed with a
+            kernel from the pool instead of starting a new kernel.
 
         Returns
         -------
         executed_nb_path : str, ``None``
             The path to the executed notebook.
         """
-        if (
-            os.path.exists(self.exec_path)
+        with self._record_stage("execute"):
+            nb, cache_key = await asyncio.to_thread(self._prepare_execution)
+            if nb is None:
+                return self.exec_path
+
+            # Execute the notebook
+            logger.debug(f"Executing notebook '{self.filename}' ⏳")
+            t0 = time.perf_counter()
+
+            kernel_name = self._get_kernel_name(nb)
+            kernel_timer = KernelTimer(self.summary["timings"])
+            kernel_timer.start()
+            lease = None
+            if kernel_pool is not None and kernel_pool.supports(kernel_name):
+                lease = await kernel_pool.acquire_async(kernel_name, cwd=self.path)
+
+            client = NotebookClient(
+                nb,
+                km=lease.km if lease is not None else None,
+                resources={"metadata": {"path": self.path}},
+                **self.execute_kwargs,
+            )
+            self._profile_cells(client)
+            tracer = self._trace_dependencies(client, nb)
+            _add_hooks(client, kernel_timer.hooks())
+            memory_sampler = MemorySampler()
+            _add_hooks(client, memory_sampler.hooks(client))
+            try:
+                await client.async_execute()
+            except CellExecutionError:
+                logger.error(f"Notebook '{self.filename}' errored ❌")
+                raise
+            finally:
+                if lease is not None:
+                    if client.kc is not None:
+                        client.kc.stop_channels()
+                    await kernel_pool.release_async(lease)
+                kernel_timer.stop()
+                self._record_peak_memory(nb, memory_sampler)
+
+            await asyncio.to_thread(
+                self._finish_execution,
+                nb,
+                cache_key,
+                run_time=time.perf_counter() - t0,
+                lease=lease,
+                tracer=tracer,
+            )
+            return self.exec_path
+
+    def plan_execution(self):
+        """Determine what executing this notebook would do, without executing it.
+
+        Returns
+        -------
+        action : str
+            ``"skip"`` if the existing executed notebook would be reused,
+            ``"restore"`` if its outputs would be restored from the execution
+            cache, or ``"execute"`` if it would be executed.
+        cache_key : str or None
+            The execution cache key of the notebook.
+        """
+        if self._is_executed_up_to_date():
+            return "skip", None
+        if self.cache is None:
+            return "execute", None
+
+        with open(self.file_path, "rb") as f:
+            data = f.read()
+        nb = reads_notebook(
+            data, as_version=self.nbformat_version, validate=self.validate
+        )
+        cache_key = self._cache_key(nb)
+        if self._is_built_from(hashlib.sha256(data).hexdigest(), cache_key):
+            return "skip", cache_key
+        if self.overwrite or cache_key not in self.cache:
+            return "execute", cache_key
+        return "restore", cache_key
+
+    def _is_executed_up_to_date(self):
+        """Whether the existing executed notebook is reused without the cache."""
+        return (
+            self.cache is None
+            and os.path.exists(self.exec_path)
             and is_executed(self.exec_path)
             and not self.overwrite
-        ):
+        )
+
+    def _is_built_from(self, input_hash, cache_key):
+        """Whether the executed notebook was built from this source and cache key.
+
+        The source notebook and the cache key of the last build are recorded
+        in the build manifest. If they didn't change, restoring the outputs
+        from the cache would give the same executed notebook.
+        """
+        if self.manifest is None or self.overwrite:
+            return False
+        record = self.manifest.get(self._repo_path)
+        return (
+            record is not None
+            and record.execute_status in ("executed", "cached", "skipped")
+            and record.input_hash == input_hash
+            and record.cache_key == cache_key
+            and os.path.exists(self.exec_path)
+        )
+
+    def _prepare_execution(self):
+        """Read the source notebook if it needs to be executed.
+
+        Returns
+        -------
+        nb : `nbformat.NotebookNode` or None
+            The source notebook, or None if the executed notebook is up to
+            date (either because it exists, or because its outputs were
+            restored from the execution cache) or was already built from the
+            same source and cache key (see `_is_built_from`).
+        cache_key : str or None
+            The execution cache key of the notebook.
+        """
+        if self._is_executed_up_to_date():
             logger.debug(
                 f"Executed notebook exists at '{self.exec_path}'. "
                 "Use overwrite=True or set the config item "
                 "exec_overwrite=True to overwrite."
             )
-            return self.exec_path
+            self.summary["execute_status"] = "skipped"
+            return None, None
+
+        with self._timed("read"):
+            with open(self.file_path, "rb") as f:
+                data = f.read()
+            self.summary["input_hash"] = hashlib.sha256(data).hexdigest()
+            nb = reads_notebook(
+                data, as_version=self.nbformat_version, validate=self.validate
+            )
+
+        if self.cache is None:
+            return nb, None
+
+        with self._timed("cache"):
+            cache_key = self._cache_key(nb)
+            self.summary["cache_key"] = cache_key
+            is_built = self._is_built_from(self.summary["input_hash"], cache_key)
+
+        if is_built:
+            logger.debug(
+                f"Executed notebook '{self.exec_path}' is up to date with the "
+                "execution cache"
+            )
+            self.summary["execute_status"] = "skipped"
+            return None, cache_key
+
+        with self._timed("cache"):
+            # With overwrite, the notebook is executed again and its cache
+            # entry replaced
+            cached_nb = None if self.overwrite else self.cache.get(cache_key)
+            if cached_nb is not None:
+                restore_outputs(nb, cached_nb)
 
-        # Execute the notebook
-        logger.debug(f"Executing notebook '{self.filename}' ⏳")
-        t0 = time.time()
+        if cached_nb is not None:
+            logger.debug(
+                f"Restored outputs of notebook '{self.filename}' from the "
+                "execution cache"
+            )
+            self._write_executed(nb)
+            self._keep_executed(nb)
+            self.summary["execute_status"] = "cached"
+            return None, cache_key
+
+        return nb, cache_key
+
+    @property
+    def _repo_dir(self):
+        """The directory of the notebook relative to the root repository directory."""
+        return PurePosixPath(self._repo_path).parent.as_posix()
+
+    def _cache_key(self, nb):
+        """Compute the execution cache key of the source notebook."""
+        return self.cache.key(
+            nb, self.execute_kwargs, path=self.path, directory=self._repo_dir
+        )
+
+    def _get_kernel_name(self, nb):
+        """Get the name of the kernelspec used to execute the notebook."""
+        return self.execute_kwargs.get("kernel_name") or nb.metadata.get(
+            "kernelspec", {}
+        ).get("name", "")
+
+    def _profile_cells(self, client):
+        """Record the execution time and peak memory of each cell.
+
+        See `nbcollection.profiling.CellProfiler`.
+        """
+        profiler = CellProfiler(self.filename, time_budget=self.cell_time_budget)
+        _add_hooks(client, profiler.hooks(client))
+
+    def _record_peak_memory(self, nb, memory_sampler):
+        """Record the peak memory of the kernel while it ran the notebook.
 
-        executor = ExecutePreprocessor(**self.execute_kwargs)
-        with open(self.file_path) as f:
-            nb = nbformat.read(f, as_version=self.nbformat_version)
+        This is the largest of the memory sampled while the notebook ran and
+        of the peak memory of each cell, which also includes short peaks
+        between two samples.
+        """
+        peaks = [
+            profile["peak_memory"]
+            for profile in cell_profiles(nb)
+            if profile["peak_memory"] is not None
+        ]
+        sampled = memory_sampler.stop()
+        if sampled is not None:
+            peaks.append(sampled)
+        self.summary["peak_memory"] = max(peaks, default=None)
+
+    def _trace_dependencies(self, client, nb):
+        """Record the data files read by the notebook, to add them to its cache key.
 
+        Returns
+        -------
+        tracer : `nbcollection.dependencies.DependencyTracer` or None
+            The tracer attached to the client, or None if there is no
+            execution cache.
+        """
+        if self.cache is None:
+            return None
+        tracer = DependencyTracer(self.path)
+        _add_hooks(client, tracer.hooks(client, nb))
+        return tracer
+
+    def _finish_execution(self, nb, cache_key, *, run_time, lease=None, tracer=None):
+        """Log, cache, and write a notebook that finished executing."""
+        if lease is not None:
+            logger.info(
+                f"Finished running notebook '{self.filename}' "
+                f"({run_time:.2f} seconds, {lease.saved_time:.2f} seconds of "
+                "kernel startup saved) ✅"
+            )
+        else:
+            logger.info(
+                f"Finished running notebook '{self.filename}' "
+                f"({run_time:.2f} seconds) ✅"
+            )
+
+        if self.cache is not None:
+            with self._timed("cache"):
+                if tracer is not None and tracer.files is not None:
+                    # The key changes if the notebook read data files that
+                    # weren't known before it was executed
+                    self.cache.set_dependencies(
+                        nb,
+                        self.execute_kwargs,
+                        path=self.path,
+                        files=tracer.files,
+                        directory=self._repo_dir,
+                    )
+                    cache_key = self._cache_key(nb)
+                    self.summary["cache_key"] = cache_key
+                self.cache.put(cache_key, nb)
+
+        self._write_executed(nb)
+        self._keep_executed(nb)
+        self.summary["execute_status"] = "executed"
+        self.summary["execute_time"] = run_time
+
+    @contextmanager
+    def _record_stage(self, stage):
+        """Record the outcome of a build stage (execute or convert) in the summary.
+
+        The stage sets its own status, unless it fails, and its duration if
+        it actually ran. These are stored in the build manifest.
+        """
+        for key in ("status", "error", "time"):
+            self.summary.pop(f"{stage}_{key}", None)
+        timings = self.summary["timings"]
+        for phase, phase_stage in PHASES.items():
+            if phase_stage == stage:
+                timings.pop(phase, None)
         try:
-            executor.preprocess(nb, {"metadata": {"path": self.path}})
-        except CellExecutionError:
-            logger.error(f"Notebook '{self.filename}' errored ❌")
+            yield
+        except Exception as e:
+            self.summary[f"{stage}_status"] = "error"
+            self.summary[f"{stage}_error"] = str(e)
             raise
+        finally:
+            self.summary[f"{stage}d_at"] = time.time()
 
-        run_time = time.time() - t0
-        logger.info(
-            f"Finished running notebook '{self.filename}' "
-            f"({run_time:.2f} seconds) ✅"
-        )
+    def _timed(self, phase):
+        """Time a phase of the build of the notebook, see `nbcollection.timing`."""
+        return timed(self.summary["timings"], phase)
+
+    def _keep_executed(self, nb):
+        """Keep the executed notebook and its summary in memory."""
+        self.executed_nb = nb
+        self.summary["index"] = get_index_metadata(nb)
+        self.summary["cells"] = cell_profiles(nb)
 
-        logger.debug(f"Writing executed notebook to file {self.exec_path}")
-        with open(self.exec_path, "w") as f:
-            nbformat.write(nb, f)
+    def _write_executed(self, nb):
+        """Write the executed notebook to ``exec_path``.
+
+        The file is left untouched if its content is unchanged, so that its
+        modification time tells whether the HTML page is out of date.
+        """
+        with self._timed("write_executed"):
+            content = writes_notebook(nb, validate=self.validate)
+            if os.path.exists(self.exec_path):
+                with open(self.exec_path, encoding="utf-8") as f:
+                    if f.read() == content:
+                        logger.debug(f"Executed notebook {self.exec_path} is unchanged")
+                        return
+
+            logger.debug(f"Writing executed notebook to file {self.exec_path}")
+            os.makedirs(os.path.dirname(self.exec_path), exist_ok=True)
+            with open(self.exec_path, "w", encoding="utf-8") as f:
+                f.write(content)
+
+    def convert(self, *, execute=True):
+        """Convert the executed notebook to a static HTML file.
+
+        Parameters
+        ----------
+        execute : bool (optional)
+            Whether to execute the notebook before converting it. Set this to
+            False if the notebook was already executed, e.g., by
+            `NbcollectionConverter.execute` running notebooks in parallel.
+        """
+        if execute:
+            self.execute()
 
-        return self.exec_path
+        with self._record_stage("convert"):
+            return self._convert()
 
-    def convert(self):
-        """Convert the executed notebook to a static HTML file."""
-        self.execute()
+    def _optimize_images(self, nb):
+        """Optimize the images of the notebook before converting it to HTML.
 
-        if os.path.exists(self.html_path) and not self.overwrite:
+        See `nbcollection.images.ImageOptimizer`.
+        """
+        with self._timed("optimize_images"):
+            savings = self.image_optimizer.optimize(nb)
+        self.summary["image_savings"] = savings
+        if savings["images"]:
+            logger.info(
+                f"Optimized {savings['images']} images of notebook "
+                f"'{self.filename}': {format_memory(savings['original_bytes'])} "
+                f"to {format_memory(savings['optimized_bytes'])}"
+            )
+
+    def _is_html_up_to_date(self):
+        """Whether the HTML page is newer than the executed notebook."""
+        return (
+            os.path.exists(self.html_path)
+            and os.path.exists(self.exec_path)
+            and not self.overwrite
+            and os.path.getmtime(self.html_path) >= os.path.getmtime(self.exec_path)
+        )
+
+    def _convert(self):
+        """Convert the executed notebook, unless the HTML page is up to date."""
+        if self._is_html_up_to_date():
             logger.debug(
                 "Rendered notebook page already exists at "
                 f"{self.html_path}. Use overwrite=True to "
                 "overwrite."
             )
+            self.executed_nb = None
+            self.summary["convert_status"] = "skipped"
             return self.html_path
 
+        t0 = time.perf_counter()
+
         # Initialize the resources dict:
         resources = {}
         resources["config_dir"] = ""  # we don't need to specify config
@@ -171,6 +683,12 @@ class NbcollectionNotebook:
 
         # path to store extra files, like plots generated
         resources["output_files_dir"] = "nboutput"
+        if self.asset_store is not None:
+            # Extracted outputs are moved to the asset store, see
+            # `nbcollection.assets.AssetStorePreprocessor`
+            resources["asset_store_url"] = self.asset_store.url(
+                os.path.dirname(self.html_path)
+            )
 
         if self._config.github_repo_url is not None:
             # Path of the notebook relative to the root of the repository
@@ -201,13 +719,55 @@ class NbcollectionNotebook:
             PurePosixPath(self.html_path).with_suffix(".ipynb").name
         )
 
+        # Use the executed notebook in memory, if available
+        nb = self.executed_nb
+        if nb is None:
+            with self._timed("read_executed"):
+                nb = read_notebook(
+                    self.exec_path,
+                    as_version=self.nbformat_version,
+                    validate=self.validate,
+                )
+            self.summary["index"] = get_index_metadata(nb)
+            self.summary["cells"] = cell_profiles(nb)
+        self.executed_nb = None
+
+        if self.search_index:
+            with self._timed("search_index"):
+                self.summary["search"] = notebook_sections(nb)
+
+        if self.image_optimizer is not None:
+            self._optimize_images(nb)
+
+        # The same metadata that nbconvert sets when exporting from a file
+        modified_date = datetime.datetime.fromtimestamp(
+            os.path.getmtime(self.exec_path), tz=datetime.timezone.utc
+        )
+        date_format = "%B %d, %Y" if sys.platform == "win32" else "%B %-d, %Y"
+        resources["metadata"] = {
+            "name": self.basename,
+            "path": os.path.dirname(self.exec_path),
+            "modified_date": modified_date.strftime(date_format),
+        }
+
         # Exports the notebook to HTML
         logger.debug("Exporting notebook to HTML...")
-        exporter = LearnAstropyHtmlExporter(
-            config=self.converter_config, **self.convert_kwargs
-        )
-        output, resources = exporter.from_filename(self.exec_path, resources=resources)
+        exporter = get_exporter(self.converter_config, self.convert_kwargs)
+        export_start = time.perf_counter()
+        output, resources = exporter.from_notebook_node(nb, resources=resources)
+        export_time = time.perf_counter() - export_start
+        preprocess_time = resources.pop("preprocess_time", 0.0)
+        timings = self.summary["timings"]
+        timings["export_preprocess"] = preprocess_time
+        timings["export_render"] = export_time - preprocess_time
 
         # Write the output HTML file
-        writer = FilesWriter(build_directory=os.path.dirname(self.html_path))
-        return writer.write(output, resources, notebook_name=self.basename)
+        with self._timed("write_html"):
+            writer = FilesWriter(build_directory=os.path.dirname(self.html_path))
+            html_path = writer.write(output, resources, notebook_name=self.basename)
+            if self.asset_store is not None:
+                self.asset_store.write(resources.get("assets", {}))
+
+        self.summary["convert_status"] = "converted"
+        self.summary["convert_time"] = time.perf_counter() - t0
+        return html_path
@@ -0,0 +1,147 @@
+"""Timing of the cells of executed notebooks."""
+
+from __future__ import annotations
+
+import time
+from typing import TYPE_CHECKING, Any
+
+from nbcollection.logger import logger
+from nbcollection.memory import kernel_pid, peak_memory, reset_peak_memory
+
+if TYPE_CHECKING:
+    from nbformat import NotebookNode
+
+__all__ = ["CellProfiler", "cell_profiles", "slowest_cells"]
+
+
+class CellProfiler:
+    """Records the execution time and peak kernel memory of each cell.
+
+    The profiler is attached to an nbclient ``NotebookClient`` (or nbconvert
+    ``ExecutePreprocessor``) through its cell hooks, see `hooks`. The results
+    are stored in the metadata of each executed code cell::
+
+        "metadata": {"nbcollection": {"execution_time": 1.2, "peak_memory": 1024}}
+
+    The execution time is the wall time in seconds between sending the cell to
+    the kernel and receiving its reply. The peak memory is the peak resident
+    memory of the kernel process during the cell, in bytes. It is only
+    recorded for local kernels on Linux.
+
+    Parameters
+    ----------
+    filename : str
+        The filename of the notebook, for log messages.
+    time_budget : float (optional)
+        If set, a warning is logged for each cell that takes longer than this
+        time, in seconds.
+    """
+
+    def __init__(self, filename: str, *, time_budget: float | None = None) -> None:
+        self.filename = filename
+        self.time_budget = time_budget
+        self.client: Any = None
+        self._start: float | None = None
+        self._pid: int | None = None
+        self._track_memory = True
+
+    def hooks(self, client: Any) -> dict[str, Any]:
+        """Get the cell hooks to attach to the client executing the notebook.
+
+        Parameters
+        ----------
+        client : `nbclient.NotebookClient`
+            The client executing the notebook.
+        """
+        self.client = client
+        return {
+            "on_cell_execute": self._on_cell_execute,
+            "on_cell_executed": self._on_cell_executed,
+        }
+
+    def _on_cell_execute(self, **kwargs: Any) -> None:  # noqa: ARG002
+        if self._track_memory:
+            self._pid = kernel_pid(self.client.km)
+            self._track_memory = self._pid is not None and reset_peak_memory(self._pid)
+        self._start = time.perf_counter()
+
+    def _on_cell_executed(
+        self, cell: NotebookNode, cell_index: int, **kwargs: Any  # noqa: ARG002
+    ) -> None:
+        if self._start is None:
+            return
+        execution_time = time.perf_counter() - self._start
+        self._start = None
+
+        profile = {"execution_time": round(execution_time, 6)}
+        if self._track_memory and self._pid is not None:
+            memory = peak_memory(self._pid)
+            if memory is not None:
+                profile["peak_memory"] = memory
+        cell.metadata.setdefault("nbcollection", {}).update(profile)
+
+        if self.time_budget is not None and execution_time > self.time_budget:
+            logger.warning(
+                f"Cell {cell_index} of notebook '{self.filename}' took "
+                f"{execution_time:.1f} seconds, over the budget of "
+                f"{self.time_budget:g} seconds"
+            )
+
+
+def cell_profiles(nb: NotebookNode) -> list[dict[str, Any]]:
+    """Get the execution time and peak memory of the cells of a notebook.
+
+    Parameters
+    ----------
+    nb : `nbformat.NotebookNode`
+        The executed notebook, with the metadata recorded by `CellProfiler`.
+
+    Returns
+    -------
+    profiles : list of dict
+        The ``cell`` index, ``execution_time``, ``peak_memory`` (or None), and
+        first ``line`` of the source of each profiled cell.
+    """
+    profiles = []
+    for index, cell in enumerate(nb.cells):
+        profile = cell.metadata.get("nbcollection", {})
+        if cell.cell_type != "code" or "execution_time" not in profile:
+            continue
+        lines = cell.source.strip().splitlines()
+        profiles.append(
+            {
+                "cell": index,
+                "execution_time": profile["execution_time"],
+                "peak_memory": profile.get("peak_memory"),
+                "line": lines[0][:80] if lines else "",
+            }
+        )
+    return profiles
+
+
+def slowest_cells(
+    profiles: dict[str, list[dict[str, Any]]], count: int
+) -> list[dict[str, Any]]:
+    """Get the slowest cells of a collection of notebooks.
+
+    Parameters
+    ----------
+    profiles : dict
+        The cell profiles of each notebook (see `cell_profiles`), keyed by
+        notebook name.
+    count : int
+        The number of cells to return.
+
+    Returns
+    -------
+    cells : list of dict
+        The profiles of the slowest cells, from the slowest, with the name of
+        their ``notebook``.
+    """
+    cells = [
+        {"notebook": name, **profile}
+        for name, nb_profiles in profiles.items()
+        for profile in nb_profiles
+    ]
+    cells.sort(key=lambda c: c["execution_time"], reverse=True)
+    return cells[:count]
@@ -0,0 +1,141 @@
+"""Scheduling of notebooks executed in parallel."""
+
+from __future__ import annotations
+
+import heapq
+import math
+from typing import Generic, TypeVar
+
+__all__ = ["AdmissionQueue", "longest_first", "predict_makespan"]
+
+T = TypeVar("T")
+
+
+def longest_first(times: list[float | None]) -> list[int]:
+    """Order jobs from the longest to the shortest expected duration.
+
+    Starting the longest jobs first keeps a long job from starting last and
+    running alone at the end of a parallel build. Jobs with an unknown
+    duration are started first, since they may be the longest. Jobs with the
+    same expected duration keep their order.
+
+    Parameters
+    ----------
+    times : list of float or None
+        The expected duration of each job, or None if it is unknown.
+
+    Returns
+    -------
+    order : list of int
+        The indices of the jobs, in the order in which to start them.
+    """
+
+    def key(i: int) -> float:
+        t = times[i]
+        return -math.inf if t is None else -t
+
+    return sorted(range(len(times)), key=key)
+
+
+def predict_makespan(times: list[float], jobs: int) -> float:
+    """Predict the total duration of jobs run by a pool of workers.
+
+    Each job is started, in order, by the first worker that becomes free, as
+    in a process pool or with an `asyncio.Semaphore`.
+
+    Parameters
+    ----------
+    times : list of float
+        The expected duration of each job, in the order in which they are
+        started.
+    jobs : int
+        The number of workers.
+
+    Returns
+    -------
+    makespan : float
+        The time from the start of the first job to the end of the last one.
+    """
+    workers = [0.0] * min(jobs, len(times))
+    for t in times:
+        heapq.heappush(workers, heapq.heappop(workers) + t)
+    return max(workers, default=0.0)
+
+
+class AdmissionQueue(Generic[T]):
+    """Admits jobs to run, in order, within a number of jobs and a memory budget.
+
+    A job is admitted when fewer than ``jobs`` jobs are running and, if there
+    is a memory budget, when its expected memory fits in the budget next to
+    the expected memory of the running jobs. A job that doesn't fit waits,
+    and later jobs that fit are admitted before it. A job is always admitted
+    if no other job is running, even if it doesn't fit in the budget on its
+    own, so that every job eventually runs.
+
+    Parameters
+    ----------
+    items : list
+        The jobs, in the order in which to start them.
+    jobs : int
+        The maximum number of jobs running at the same time.
+    memory : list of int (optional)
+        The expected memory of each job, in bytes.
+    max_memory : int (optional)
+        The total memory budget of the running jobs, in bytes. If None, jobs
+        are only limited by their number.
+    """
+
+    def __init__(
+        self,
+        items: list[T],
+        *,
+        jobs: int,
+        memory: list[int] | None = None,
+        max_memory: int | None = None,
+    ) -> None:
+        if memory is None:
+            memory = [0] * len(items)
+        self.jobs = jobs
+        self.max_memory = max_memory
+        self._waiting = list(zip(items, memory))
+        self._running: dict[T, int] = {}
+
+    def __len__(self) -> int:
+        """Get the number of jobs waiting to be admitted."""
+        return len(self._waiting)
+
+    @property
+    def memory_in_use(self) -> int:
+        """The total expected memory of the running jobs, in bytes."""
+        return sum(self._running.values())
+
+    def admit(self) -> list[T]:
+        """Admit the waiting jobs that can start now.
+
+        Returns
+        -------
+        items : list
+            The admitted jobs, in order. They are running until `release` is
+            called.
+        """
+        admitted = []
+        waiting = []
+        for item, memory in self._waiting:
+            if len(self._running) < self.jobs and self._fits(memory):
+                self._running[item] = memory
+                admitted.append(item)
+            else:
+                waiting.append((item, memory))
+        self._waiting = waiting
+        return admitted
+
+    def release(self, item: T) -> None:
+        """Record that a running job finished."""
+        self._running.pop(item, None)
+
+    def _fits(self, memory: int) -> bool:
+        return (
+            self.max_memory is None
+            or not self._running
+            or self.memory_in_use + memory <= self.max_memory
+        )
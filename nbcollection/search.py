@@ -0,0 +1,189 @@
+"""A search index of the pages of a collection, for client-side search.
+
+The index is written to a directory of the build path (``_search``) as small
+JSON files, so that a search box in the browser only downloads the parts of
+the index it needs:
+
+- ``index.json`` describes the index: its ``version``, the
+  ``prefix_length`` of the terms used to name the shards, and the list of
+  ``shards``.
+- ``documents.json`` lists the sections of the pages that can be found. Each
+  section has the ``page`` (the URL of the page relative to the build path),
+  the ``href`` of its anchor in the page (empty for the top of the page), the
+  ``title`` of the page, and the ``section`` title (or None for the top of
+  the page).
+- ``terms/<prefix>.json`` maps each term that starts with ``<prefix>`` to its
+  postings, a list of ``[document, count]`` pairs: the index of a section in
+  ``documents.json`` and the number of times the term appears in it.
+
+A term is a lowercase word of at least two characters (see `tokenize`). To
+look up a term, a client loads ``terms/<term[:prefix_length]>.json`` if the
+prefix is one of the ``shards``.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import re
+from collections import Counter, defaultdict
+from typing import TYPE_CHECKING, Any
+
+from markdown_it import MarkdownIt
+
+from nbcollection.themes.learnastropy.tocpreprocessor import parse_heading
+
+if TYPE_CHECKING:
+    from nbformat import NotebookNode
+
+__all__ = ["notebook_sections", "tokenize", "write_search_index"]
+
+# Version of the format of the index
+_INDEX_VERSION = 1
+
+# Number of leading characters of the terms that name their shard
+_PREFIX_LENGTH = 2
+
+_TOKEN_RE = re.compile(r"\w+")
+
+# Only the block structure of the markdown is needed to split it into sections
+_md = MarkdownIt().disable("inline")
+
+
+def tokenize(text: str) -> list[str]:
+    """Split text into the terms of the search index.
+
+    Parameters
+    ----------
+    text : str
+        The text, e.g., the markdown source of a cell.
+
+    Returns
+    -------
+    terms : list of str
+        The lowercase words of at least two characters of the text.
+    """
+    return [term for term in _TOKEN_RE.findall(text.lower()) if len(term) > 1]
+
+
+def notebook_sections(nb: NotebookNode) -> list[dict[str, Any]]:
+    """Split a notebook into the sections of its page, with their terms.
+
+    Sections start at the top-level markdown headings, like the table of
+    contents of the page (see
+    `~nbcollection.themes.learnastropy.tocpreprocessor.TocPreprocessor`).
+    The text of a section is the markdown and the code of its cells, but not
+    their outputs.
+
+    Parameters
+    ----------
+    nb : `nbformat.NotebookNode`
+        The notebook.
+
+    Returns
+    -------
+    sections : list of dict
+        The plain text ``title`` of each section (None for the top of the
+        page), the ``href`` of its anchor (empty for the top of the page, see
+        `~nbcollection.themes.learnastropy.tocpreprocessor.parse_heading`),
+        and the number of times each term appears in it, as ``terms``.
+        Sections without any terms are left out.
+    """
+    sections: list[dict[str, Any]] = [{"title": None, "href": "", "text": []}]
+    for cell in nb.cells:
+        if cell.cell_type == "code":
+            sections[-1]["text"].append(cell.source)
+        elif cell.cell_type == "markdown":
+            tokens = _md.parse(cell.source)
+            for i, token in enumerate(tokens):
+                if token.type == "heading_open" and token.level == 0:
+                    # The heading's inline token, with its content, follows
+                    title, href = parse_heading(
+                        tokens[i + 1].content, int(token.tag.lstrip("h"))
+                    )
+                    sections.append({"title": title, "href": href, "text": []})
+                elif token.content:
+                    sections[-1]["text"].append(token.content)
+
+    result = []
+    for section in sections:
+        terms = Counter(tokenize("\n".join(section.pop("text"))))
+        if terms:
+            result.append({**section, "terms": dict(sorted(terms.items()))})
+    return result
+
+
+def write_search_index(pages: dict[str, dict[str, Any]], path: str) -> int:
+    """Write the search index of the pages of a collection.
+
+    Only the files whose content changed are written, and shards that are no
+    longer needed are removed.
+
+    Parameters
+    ----------
+    pages : dict
+        The pages, keyed by the path of their notebook. Each page has the
+        ``html_path`` of the page relative to the build path, its ``title``,
+        and its ``sections`` (see `notebook_sections`).
+    path : str
+        The directory of the index, e.g., ``_search`` in the build path.
+
+    Returns
+    -------
+    count : int
+        The number of files that were written.
+    """
+    documents: list[dict[str, Any]] = []
+    shards: dict[str, dict[str, list[list[int]]]] = defaultdict(
+        lambda: defaultdict(list)
+    )
+    for key in sorted(pages):
+        page = pages[key]
+        for section in page["sections"]:
+            document = len(documents)
+            documents.append(
+                {
+                    "page": page["html_path"],
+                    "href": section["href"],
+                    "title": page["title"],
+                    "section": section["title"],
+                }
+            )
+            for term, count in section["terms"].items():
+                shards[term[:_PREFIX_LENGTH]][term].append([document, count])
+
+    terms_path = os.path.join(path, "terms")
+    files = {
+        os.path.join(path, "index.json"): {
+            "version": _INDEX_VERSION,
+            "prefix_length": _PREFIX_LENGTH,
+            "shards": sorted(shards),
+        },
+        os.path.join(path, "documents.json"): documents,
+    }
+    for prefix, postings in shards.items():
+        files[os.path.join(terms_path, f"{prefix}.json")] = dict(
+            sorted(postings.items())
+        )
+
+    count = sum(_write_if_changed(file_path, data) for file_path, data in files.items())
+    if os.path.isdir(terms_path):
+        for name in os.listdir(terms_path):
+            if os.path.join(terms_path, name) not in files:
+                os.remove(os.path.join(terms_path, name))
+    return count
+
+
+def _write_if_changed(path: str, data: Any) -> bool:
+    """Write data as compact JSON, unless the file already has this content."""
+    content = json.dumps(data, ensure_ascii=False, separators=(",", ":"))
+    try:
+        with open(path, encoding="utf-8") as f:
+            if f.read() == content:
+                return False
+    except OSError:
+        pass
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(content)
+    return True
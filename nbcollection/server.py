@@ -0,0 +1,275 @@
+"""A local HTTP server to preview the pages of a collection."""
+
+from __future__ import annotations
+
+import functools
+import html
+import io
+import os
+import threading
+import urllib.parse
+from collections import OrderedDict
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from typing import TYPE_CHECKING, Any
+
+from nbcollection.logger import logger
+
+if TYPE_CHECKING:
+    from nbcollection.converter import NbcollectionConverter
+    from nbcollection.notebook import NbcollectionNotebook
+
+__all__ = ["PreviewServer"]
+
+
+class PreviewServer:
+    """Serves the build path of a collection, rendering pages on demand.
+
+    Each page is executed and converted when it is first requested if it is
+    missing or older than its source notebook, so that any page of a
+    collection can be previewed without building the whole collection first.
+    Rendered pages are kept in an in-memory LRU cache. Other files, e.g.,
+    extracted figures, are served from the build path.
+
+    Notebooks are rendered one at a time. With ``prerender``, the pages that
+    are missing or stale are rendered in a background thread, in the order of
+    the collection, while no page is requested.
+
+    Parameters
+    ----------
+    converter : `~nbcollection.converter.NbcollectionConverter`
+        The collection to serve.
+    host : str (optional)
+        The address to listen on. Default is only to accept local
+        connections.
+    port : int (optional)
+        The port to listen on, or 0 to pick a free port.
+    cache_size : int (optional)
+        The maximum number of pages kept in memory.
+    prerender : bool (optional)
+        Whether to render the missing or stale pages in the background.
+    """
+
+    def __init__(
+        self,
+        converter: NbcollectionConverter,
+        *,
+        host: str = "127.0.0.1",
+        port: int = 8000,
+        cache_size: int = 64,
+        prerender: bool = True,
+    ) -> None:
+        self.converter = converter
+        self.host = host
+        self.prerender = prerender
+        self.pages = {os.path.abspath(nb.html_path): nb for nb in converter.notebooks}
+
+        self._cache = _PageCache(cache_size)
+        self._render_lock = threading.Lock()
+        # Requests waiting for a page to be rendered take precedence over
+        # pre-rendering
+        self._condition = threading.Condition()
+        self._requests = 0
+        self._stop_event = threading.Event()
+
+        handler = functools.partial(
+            _PreviewRequestHandler, directory=converter.build_path
+        )
+        self.httpd = _PreviewHTTPServer((host, port), handler)
+        self.httpd.preview = self
+
+    @property
+    def url(self) -> str:
+        """The URL of the server."""
+        return f"http://{self.host}:{self.httpd.server_port}/"
+
+    def serve_forever(self) -> None:
+        """Serve the collection until interrupted, e.g., with Ctrl+C."""
+        if self.prerender:
+            threading.Thread(target=self._prerender, daemon=True).start()
+        logger.info(
+            f"Serving {len(self.pages)} notebooks of '{self.converter.build_path}' "
+            f"at {self.url}, press Ctrl+C to stop"
+        )
+        try:
+            self.httpd.serve_forever()
+        except KeyboardInterrupt:
+            logger.info("Stopped serving")
+        finally:
+            self._stop_event.set()
+            self.httpd.server_close()
+
+    def shutdown(self) -> None:
+        """Stop `serve_forever`, from another thread."""
+        self._stop_event.set()
+        with self._condition:
+            self._condition.notify_all()
+        self.httpd.shutdown()
+
+    def page(self, nb: NbcollectionNotebook) -> bytes:
+        """Get the HTML page of a notebook, rendering it if it is out of date.
+
+        Parameters
+        ----------
+        nb : `~nbcollection.notebook.NbcollectionNotebook`
+            A notebook of the collection.
+
+        Returns
+        -------
+        content : bytes
+            The content of the HTML page.
+        """
+        if self._is_stale(nb):
+            with self._condition:
+                self._requests += 1
+            try:
+                self._render(nb)
+            finally:
+                with self._condition:
+                    self._requests -= 1
+                    self._condition.notify_all()
+
+        mtime_ns = os.stat(nb.html_path).st_mtime_ns
+        content = self._cache.get(nb.html_path, mtime_ns)
+        if content is None:
+            with open(nb.html_path, "rb") as f:
+                content = f.read()
+            self._cache.put(nb.html_path, mtime_ns, content)
+        return content
+
+    def index_page(self) -> bytes:
+        """Get a page listing the notebooks, if the build has no index page."""
+        items = "".join(
+            f'<li><a href="{urllib.parse.quote(path)}">{html.escape(name)}</a></li>'
+            for name, path in sorted(
+                (
+                    nb._repo_path,
+                    os.path.relpath(nb.html_path, self.converter.build_path).replace(
+                        os.sep, "/"
+                    ),
+                )
+                for nb in self.pages.values()
+            )
+        )
+        return (
+            '<!DOCTYPE html>\n<html><head><meta charset="utf-8">'
+            "<title>Notebooks</title></head>\n"
+            f"<body><h1>Notebooks</h1><ul>{items}</ul></body></html>\n"
+        ).encode()
+
+    @staticmethod
+    def _is_stale(nb: NbcollectionNotebook) -> bool:
+        """Whether the page of a notebook is missing or older than its sources."""
+        if not os.path.exists(nb.html_path):
+            return True
+        html_mtime = os.path.getmtime(nb.html_path)
+        return any(
+            os.path.exists(path) and os.path.getmtime(path) > html_mtime
+            for path in (nb.file_path, nb.exec_path)
+        )
+
+    def _render(self, nb: NbcollectionNotebook) -> None:
+        """Execute and convert a notebook, unless its page is up to date."""
+        with self._render_lock:
+            if not self._is_stale(nb):
+                # Rendered while waiting for the lock
+                return
+
+            # Without the execution cache, an existing executed notebook is
+            # only reused if its source didn't change since
+            source_changed = not os.path.exists(nb.exec_path) or (
+                os.path.getmtime(nb.file_path) > os.path.getmtime(nb.exec_path)
+            )
+            logger.info(f"Rendering notebook '{nb.filename}' ⏳")
+            nb.summary = {"timings": {}}
+            overwrite = nb.overwrite
+            nb.overwrite = overwrite or (source_changed and nb.cache is None)
+            try:
+                nb.execute()
+                # The page is older than its sources, so it is converted again
+                # even if the executed notebook didn't change
+                nb.overwrite = True
+                nb.convert(execute=False)
+            finally:
+                nb.overwrite = overwrite
+                self.converter._update_records()
+
+    def _prerender(self) -> None:
+        """Render the missing or stale pages, while no page is requested."""
+        for nb in self.pages.values():
+            with self._condition:
+                self._condition.wait_for(
+                    lambda: not self._requests or self._stop_event.is_set()
+                )
+            if self._stop_event.is_set():
+                return
+            if not self._is_stale(nb):
+                continue
+            try:
+                self._render(nb)
+            except Exception as e:  # noqa: BLE001
+                logger.error(f"Failed to render notebook '{nb.filename}': {e!r}")
+        logger.info("All pages are rendered")
+
+
+class _PageCache:
+    """An LRU cache of page contents, invalidated by the page modification time."""
+
+    def __init__(self, size: int) -> None:
+        self.size = size
+        self._pages: OrderedDict[str, tuple[int, bytes]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, path: str, mtime_ns: int) -> bytes | None:
+        with self._lock:
+            entry = self._pages.get(path)
+            if entry is None or entry[0] != mtime_ns:
+                return None
+            self._pages.move_to_end(path)
+            return entry[1]
+
+    def put(self, path: str, mtime_ns: int, content: bytes) -> None:
+        with self._lock:
+            self._pages[path] = (mtime_ns, content)
+            self._pages.move_to_end(path)
+            while len(self._pages) > self.size:
+                self._pages.popitem(last=False)
+
+
+class _PreviewHTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+    preview: PreviewServer
+
+
+class _PreviewRequestHandler(SimpleHTTPRequestHandler):
+    server: _PreviewHTTPServer
+
+    def send_head(self) -> Any:
+        """Send the headers of a notebook page, rendering it if needed."""
+        preview = self.server.preview
+        path = os.path.abspath(self.translate_path(self.path))
+        nb = preview.pages.get(path)
+        if nb is not None:
+            try:
+                content = preview.page(nb)
+            except Exception as e:  # noqa: BLE001
+                logger.error(f"Failed to render notebook '{nb.filename}': {e!r}")
+                self.send_error(
+                    500, f"Notebook '{nb.filename}' failed to render", repr(e)
+                )
+                return None
+        elif path == os.path.abspath(self.directory) and not os.path.exists(
+            os.path.join(path, "index.html")
+        ):
+            content = preview.index_page()
+        else:
+            return super().send_head()
+
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(content)))
+        self.send_header("Cache-Control", "no-cache")
+        self.end_headers()
+        return io.BytesIO(content)
+
+    def log_message(self, format: str, *args: Any) -> None:
+        logger.debug(f"{self.address_string()} - {format % args}")
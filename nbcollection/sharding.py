@@ -0,0 +1,175 @@
+"""Splitting a collection of notebooks across machines and merging the builds."""
+
+from __future__ import annotations
+
+import dataclasses
+import filecmp
+import hashlib
+import os
+import shutil
+import statistics
+from typing import Any
+
+from nbcollection.logger import logger
+from nbcollection.manifest import BuildManifest, NotebookRecord
+
+__all__ = ["assign_shards", "merge_builds", "parse_shard"]
+
+
+def parse_shard(spec: str) -> tuple[int, int]:
+    """Parse a shard specification.
+
+    Parameters
+    ----------
+    spec : str
+        The shard, as ``"K/N"`` to select the K-th of N shards (starting at 1).
+
+    Returns
+    -------
+    index : int
+        The index of the shard, starting at 0.
+    count : int
+        The number of shards.
+    """
+    try:
+        k, n = (int(x) for x in spec.split("/"))
+    except ValueError:
+        msg = f"Invalid shard '{spec}'. Must be K/N, e.g., 1/4."
+        raise ValueError(msg) from None
+    if not 1 <= k <= n:
+        msg = f"Invalid shard '{spec}'. K must be between 1 and N."
+        raise ValueError(msg)
+    return k - 1, n
+
+
+def assign_shards(
+    names: list[str], count: int, *, times: list[float | None] | None = None
+) -> list[int]:
+    """Assign notebooks to shards deterministically.
+
+    By default, each notebook is assigned from a hash of its name, so that a
+    notebook stays in the same shard when others are added or removed (and its
+    shard can keep reusing a cached build). If the expected run times of the
+    notebooks are given, the notebooks are instead assigned from the longest
+    to the shortest to the shard with the least total run time, so that all
+    shards take about as long. The assignment then only depends on the names
+    and times, so all shards must be given the same times.
+
+    Parameters
+    ----------
+    names : list of str
+        The names of the notebooks, e.g., their paths relative to the root
+        source directory.
+    count : int
+        The number of shards.
+    times : list of float or None (optional)
+        The expected run time of each notebook, or None if it is unknown.
+        Unknown times are replaced with the mean of the known times.
+
+    Returns
+    -------
+    shards : list of int
+        The index of the shard of each notebook, starting at 0.
+    """
+    if times is None:
+        return [
+            int(hashlib.sha256(name.encode("utf-8")).hexdigest(), 16) % count
+            for name in names
+        ]
+
+    known_times = [t for t in times if t is not None]
+    default_time = statistics.fmean(known_times) if known_times else 1.0
+    filled_times = [default_time if t is None else t for t in times]
+
+    loads = [0.0] * count
+    shards = [0] * len(names)
+    for i in sorted(range(len(names)), key=lambda i: (-filled_times[i], names[i])):
+        shard = min(range(count), key=lambda s: (loads[s], s))
+        shards[i] = shard
+        loads[shard] += filled_times[i]
+    return shards
+
+
+def merge_builds(
+    build_paths: list[str],
+    build_path: str,
+    *,
+    manifest_name: str,
+    exclude: tuple[str, ...] = (),
+    keep_existing: tuple[str, ...] = (),
+) -> None:
+    """Combine the build directories of several shards into one.
+
+    All files are copied to the same relative path in the merged build
+    directory. The build manifests are merged rather than copied, with the
+    paths of the built files updated to point to the merged build directory.
+
+    Parameters
+    ----------
+    build_paths : list of str
+        The build directories of the shards (the ``_build`` directories).
+    build_path : str
+        The merged build directory.
+    manifest_name : str
+        The filename of the build manifest in a build directory.
+    exclude : tuple of str (optional)
+        The names of files or directories at the root of the build
+        directories that are not copied, e.g., reports about the build of
+        each shard.
+    keep_existing : tuple of str (optional)
+        The names of directories at the root of the build directories whose
+        files are only copied if they aren't in the merged build directory
+        yet, e.g., the execution cache, whose entries are identified by their
+        content but can differ between shards.
+    """
+    build_path = os.path.abspath(build_path)
+    manifest = BuildManifest(os.path.join(build_path, manifest_name))
+    for path in build_paths:
+        shard_path = os.path.abspath(path)
+        if not os.path.isdir(shard_path):
+            msg = f"The build directory of a shard does not exist: {shard_path}"
+            raise ValueError(msg)
+        if shard_path == build_path:
+            continue
+
+        logger.info(f"Merging build directory '{shard_path}'")
+        for root, dirs, files in os.walk(shard_path):
+            if root == shard_path:
+                dirs[:] = [name for name in dirs if name not in exclude]
+            relative_root = os.path.relpath(root, shard_path)
+            keep = relative_root.split(os.sep)[0] in keep_existing
+            dest_dir = os.path.join(build_path, relative_root)
+            os.makedirs(dest_dir, exist_ok=True)
+            for name in files:
+                if root == shard_path and (
+                    name.startswith(manifest_name) or name in exclude
+                ):
+                    continue
+                src = os.path.join(root, name)
+                dest = os.path.join(dest_dir, name)
+                if keep and os.path.exists(dest):
+                    continue
+                if os.path.exists(dest) and not filecmp.cmp(src, dest, shallow=False):
+                    logger.warning(
+                        f"File '{os.path.relpath(dest, build_path)}' differs "
+                        "between shards, keeping the last one"
+                    )
+                shutil.copy2(src, dest)
+
+        records = BuildManifest(os.path.join(shard_path, manifest_name)).get_all()
+        manifest.update(
+            [_relocate(record, shard_path, build_path) for record in records.values()]
+        )
+
+
+def _relocate(record: NotebookRecord, old_path: str, new_path: str) -> NotebookRecord:
+    """Update the paths of the built files of a notebook moved to a new build path."""
+    changes: dict[str, Any] = {}
+    for name in ("exec_path", "html_path"):
+        path = getattr(record, name)
+        if path is None:
+            continue
+        path = os.path.abspath(path)
+        if os.path.commonpath([path, old_path]) == old_path:
+            changes[name] = os.path.join(new_path, os.path.relpath(path, old_path))
+    return dataclasses.replace(record, **changes)
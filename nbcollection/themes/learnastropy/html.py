@@ -2,14 +2,20 @@
 
 from __future__ import annotations
 
+import time
 from pathlib import Path
-from typing import Any
+from typing import TYPE_CHECKING, Any
 
 from nbconvert.exporters.html import HTMLExporter
 from traitlets.config import Config
 
 from .tocpreprocessor import TocPreprocessor
 
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+    from markupsafe import Markup
+
 
 class LearnAstropyHtmlExporter(HTMLExporter):
     """HTML exporter for Learn Astropy HTML notebooks."""
@@ -28,6 +34,10 @@ class LearnAstropyHtmlExporter(HTMLExporter):
         # Add the default template to the search path
         self.extra_template_basedirs.append(self._template_name_default())
 
+        # Content of the CSS files embedded in the pages, cached so that an
+        # exporter reused across notebooks only reads each file once
+        self._include_cache: dict[str, dict[str, Markup]] = {}
+
     def _template_name_default(self) -> str:
         """Select built-in HTML theme as the default.
 
@@ -39,4 +49,37 @@ class LearnAstropyHtmlExporter(HTMLExporter):
         """Add additional metadata to the Jinja context via the resources dictionary."""
         # This is an exporter hook that we can use in the future to add
         # additional metadata to the Jinja context.
-        return super()._init_resources(resources)
+        resources = super()._init_resources(resources)
+
+        # Cache the CSS files that are embedded in every page
+        for key in ("include_css", "include_lab_theme"):
+            resources[key] = self._cache_include(key, resources[key])
+
+        return resources
+
+    def _preprocess(
+        self, nb: Any, resources: dict[str, Any]
+    ) -> tuple[Any, dict[str, Any]]:
+        """Run the preprocessors, recording their duration in the resources.
+
+        Overrides `Exporter._preprocess`. The duration is stored as
+        ``preprocess_time``, in seconds, to tell the time spent in the
+        preprocessors from the time spent rendering the template.
+        """
+        start = time.perf_counter()
+        nb, resources = super()._preprocess(nb, resources)
+        resources["preprocess_time"] = time.perf_counter() - start
+        return nb, resources
+
+    def _cache_include(
+        self, key: str, include: Callable[[str], Markup]
+    ) -> Callable[[str], Markup]:
+        """Wrap a resources include function to cache its output by name."""
+        cache = self._include_cache.setdefault(key, {})
+
+        def cached_include(name: str) -> Markup:
+            if name not in cache:
+                cache[name] = include(name)
+            return cache[name]
+
+        return cached_include
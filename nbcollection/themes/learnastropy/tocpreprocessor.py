@@ -2,19 +2,101 @@
 
 from __future__ import annotations
 
+import re
 from collections.abc import Collection, Iterator
 from dataclasses import dataclass
 from typing import TYPE_CHECKING, Any
+from urllib.parse import quote
+from xml.etree import ElementTree
 
-from bs4 import BeautifulSoup
 from markdown_it import MarkdownIt
-from markdown_it.tree import SyntaxTreeNode
-from nbconvert.filters import add_anchor
+from nbconvert.filters import html2text
 from nbconvert.preprocessors import Preprocessor
 
 if TYPE_CHECKING:
+    from markdown_it.tree import SyntaxTreeNode
     from nbformat import NotebookNode
 
+# Only the block structure of the markdown is needed to find the headings, so
+# inline parsing (emphasis, links, etc.) is turned off.
+_md = MarkdownIt().disable("inline")
+
+# The content of headings is rendered to HTML like nbconvert does, so that
+# their anchors are computed from the same text, without inline formatting
+_inline_md = MarkdownIt()
+
+# Characters that an XML parser doesn't pass through unchanged as text. Titles
+# without them don't need to be parsed as XML to compute their anchor.
+_XML_SPECIAL_RE = re.compile(
+    r"[<&\r\x00-\x08\x0b\x0c\x0e-\x1f\ud800-\udfff\ufffe\uffff]|]]>"
+)
+
+
+def make_anchor_href(title: str, level: int) -> str:
+    """Compute the href of the anchor that nbconvert adds to a heading.
+
+    The result is identical to the href of the anchor link added by
+    ``nbconvert.filters.add_anchor`` to ``<h{level}>{title}</h{level}>``,
+    without serializing the heading as HTML and parsing it back.
+
+    Parameters
+    ----------
+    title : str
+        The title of the heading, which may contain inline HTML.
+    level : int
+        The heading level.
+
+    Returns
+    -------
+    href : str
+        The href of the anchor, e.g. ``#Section-title``. If nbconvert can't
+        parse the heading, and so doesn't add an anchor, the href is ``#``.
+    """
+    if _XML_SPECIAL_RE.search(title) is None:
+        text = title
+    else:
+        heading = f"<h{level}>{title}</h{level}>"
+        try:
+            # Parsed the same way as in nbconvert
+            text = html2text(ElementTree.fromstring(heading))  # noqa: S314
+        except Exception:  # noqa: BLE001
+            return "#"
+    # Same as nbconvert.filters.strings._convert_header_id, which is private
+    anchor = quote(text.replace(" ", "-"), safe="?/:@!$&'()*+,;=")
+    return f"#{anchor}"
+
+
+def parse_heading(content: str, level: int) -> tuple[str, str]:
+    """Get the plain text title and the anchor href of a Markdown heading.
+
+    Inline formatting (code, emphasis, links, and HTML tags) is stripped from
+    the title, and the href is the one of the anchor that nbconvert adds to
+    the heading once it is rendered to HTML.
+
+    Parameters
+    ----------
+    content : str
+        The Markdown content of the heading, e.g. ``Using `astropy.units```.
+    level : int
+        The heading level.
+
+    Returns
+    -------
+    title : str
+        The plain text title, e.g. ``Using astropy.units``.
+    href : str
+        The href of the anchor, e.g. ``#Using-astropy.units``. See
+        `make_anchor_href`.
+    """
+    tokens = _inline_md.parseInline(content)
+    html = _inline_md.renderer.render(tokens, _inline_md.options, {})
+    title = "".join(
+        token.content
+        for token in tokens[0].children or []
+        if token.type in ("text", "code_inline")
+    )
+    return title.strip(), make_anchor_href(html, level)
+
 
 class TocPreprocessor(Preprocessor):
     """An nbconvert preprocessor that extracts the document outline (TOC).
@@ -35,14 +117,16 @@ class TocPreprocessor(Preprocessor):
     ) -> tuple[NotebookNode, dict[str, Any]]:
         """Extract the document outline into the resources for the HTML exporter."""
         markdown = self._extract_markdown(nb)
-        md = MarkdownIt()
-        md_tokens = md.parse(markdown)
-        token_tree = SyntaxTreeNode(md_tokens)
+        md_tokens = _md.parse(markdown)
         sections = SectionChildren([])
-        heading_nodes = [n for n in token_tree.children if n.type == "heading"]
-        for node in heading_nodes:
-            section = Section.create_from_node(node)
-            sections.insert_section(section)
+        for i, token in enumerate(md_tokens):
+            # Only top-level headings, e.g., not headings in block quotes.
+            # The heading's inline token, with its content, always follows.
+            if token.type == "heading_open" and token.level == 0:
+                section = Section.create(
+                    md_tokens[i + 1].content, level=int(token.tag.lstrip("h"))
+                )
+                sections.insert_section(section)
 
         # Add the document outine, including only the sections, but not
         # the h1 title
@@ -110,31 +194,17 @@ class Section:
     level: int = 0
     """The heading level of the section."""
 
+    @classmethod
+    def create(cls, content: str, *, level: int) -> Section:
+        """Create a section from the Markdown content of a heading."""
+        # The content of the heading can contain inline formatting
+        title, href = parse_heading(content, level)
+        return cls(title=title, children=SectionChildren([]), href=href, level=level)
+
     @classmethod
     def create_from_node(cls, node: SyntaxTreeNode) -> Section:
         """Create a section from a Markdown heading node."""
-        # The content of the heading can contain inline formatting. This is
-        # a basic way to strip out code, bold, and italics. We need to
-        # revisit this to strip out links.
-        title = node.children[0].content
-        title = title.replace("`", "")
-        title = title.replace("*", "")
-        title = title.replace("_", "")
-
-        level = int(node.tag.lstrip("h"))
-
-        # Use nbconvert's own add_anchor function to compute the anchor
-        # href. Unfortunately this relies on a roundtrip through HTML. The
-        # function that works directly on the title text isn't a pubilc API.
-        header_html = f"<h{level}>{title}</h{level}>"
-        header_html = add_anchor(header_html, anchor_link_text="#")
-        header_soup = BeautifulSoup(header_html, "html.parser")
-        try:
-            href = header_soup.find("a")["href"]
-        except KeyError:
-            href = "#"
-
-        return cls(title=title, children=SectionChildren([]), href=href, level=level)
+        return cls.create(node.children[0].content, level=int(node.tag.lstrip("h")))
 
     def as_dict(self) -> dict[str, Any]:
         """Convert the section to a dictionary."""
@@ -0,0 +1,185 @@
+"""Timing of the phases of building notebooks."""
+
+from __future__ import annotations
+
+import csv
+import datetime
+import json
+import os
+import time
+from contextlib import contextmanager
+from typing import TYPE_CHECKING, Any
+
+from nbcollection import __version__
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+
+__all__ = ["PHASES", "KernelTimer", "timed", "write_timing_report"]
+
+# The phases of building a notebook, in order, with the build stage they are
+# part of. Durations are measured with a monotonic clock, in seconds.
+PHASES = {
+    # Creating the notebook when the collection is discovered
+    "discover": None,
+    # Reading and parsing the source notebook
+    "read": "execute",
+    # Computing the cache key, and restoring or storing the outputs
+    "cache": "execute",
+    # Starting the kernel (or getting one from the kernel pool)
+    "kernel_startup": "execute",
+    # Running the cells
+    "execute_cells": "execute",
+    # Shutting down the kernel (or returning it to the kernel pool)
+    "kernel_shutdown": "execute",
+    # Writing the executed notebook
+    "write_executed": "execute",
+    # Reading the executed notebook, if it isn't in memory
+    "read_executed": "convert",
+    # Optimizing the images of the executed notebook, if enabled
+    "optimize_images": "convert",
+    # Splitting the notebook into sections for the search index, if enabled
+    "search_index": "convert",
+    # Running the preprocessors of the HTML exporter
+    "export_preprocess": "convert",
+    # Rendering the HTML template
+    "export_render": "convert",
+    # Writing the HTML page and the extracted outputs
+    "write_html": "convert",
+}
+
+
+@contextmanager
+def timed(timings: dict[str, float], phase: str) -> Iterator[None]:
+    """Add the duration of a block of code to the time of a phase.
+
+    Parameters
+    ----------
+    timings : dict
+        The durations of the phases, in seconds, keyed by phase name.
+    phase : str
+        The name of the phase, see `PHASES`.
+    """
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings[phase] = timings.get(phase, 0.0) + time.perf_counter() - start
+
+
+class KernelTimer:
+    """Splits the execution of a notebook into kernel startup, cells, and shutdown.
+
+    The timer is attached to an nbclient ``NotebookClient`` (or nbconvert
+    ``ExecutePreprocessor``) through its notebook hooks, see `hooks`. It is
+    started before the kernel is started, and stopped after it is shut down.
+
+    Parameters
+    ----------
+    timings : dict
+        The durations of the phases, in seconds, keyed by phase name.
+    """
+
+    def __init__(self, timings: dict[str, float]) -> None:
+        self.timings = timings
+        self._start: float | None = None
+        self._cells_start: float | None = None
+        self._cells_end: float | None = None
+
+    def hooks(self) -> dict[str, Any]:
+        """Get the notebook hooks to attach to the client executing the notebook."""
+        return {
+            "on_notebook_start": self._on_notebook_start,
+            "on_notebook_complete": self._on_notebook_end,
+            "on_notebook_error": self._on_notebook_end,
+        }
+
+    def start(self) -> None:
+        """Start timing, right before the kernel is started."""
+        self._start = time.perf_counter()
+
+    def stop(self) -> None:
+        """Stop timing, once the kernel has been shut down."""
+        end = time.perf_counter()
+        start = end if self._start is None else self._start
+        cells_start = self._cells_start or end
+        cells_end = self._cells_end or end
+        self.timings["kernel_startup"] = cells_start - start
+        self.timings["execute_cells"] = cells_end - cells_start
+        self.timings["kernel_shutdown"] = end - cells_end
+
+    def _on_notebook_start(self, **kwargs: Any) -> None:  # noqa: ARG002
+        self._cells_start = time.perf_counter()
+
+    def _on_notebook_end(self, **kwargs: Any) -> None:  # noqa: ARG002
+        self._cells_end = time.perf_counter()
+
+
+def write_timing_report(
+    path: str,
+    rows: list[dict[str, Any]],
+    *,
+    discover_time: float | None = None,
+    slowest_cells: list[dict[str, Any]] | None = None,
+) -> None:
+    """Write the timing report of a build as JSON and CSV files.
+
+    Parameters
+    ----------
+    path : str
+        The path of the report, without extension. The ``.json`` and ``.csv``
+        files are written next to each other.
+    rows : list of dict
+        One row per notebook, with the ``notebook`` path, the
+        ``execute_status`` and ``convert_status`` of the notebook, the
+        ``timings`` of its phases, and the ``peak_memory`` of its kernel in
+        bytes (or None). Other values, e.g., the ``image_savings`` of the
+        notebook, are only included in the JSON report.
+    discover_time : float (optional)
+        The time it took to discover the whole collection, in seconds.
+    slowest_cells : list of dict (optional)
+        The profiles of the slowest cells of the collection, only included in
+        the JSON report. See `nbcollection.profiling.slowest_cells`.
+    """
+    notebooks = []
+    for row in rows:
+        timings = {p: row["timings"][p] for p in PHASES if p in row["timings"]}
+        notebooks.append({**row, "timings": timings, "total": sum(timings.values())})
+
+    report = {
+        "nbcollection_version": __version__,
+        "created": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+        "discover_time": discover_time,
+        "notebooks": notebooks,
+        "slowest_cells": slowest_cells or [],
+    }
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(f"{path}.json", "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=1)
+
+    with open(f"{path}.csv", "w", encoding="utf-8", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(
+            [
+                "notebook",
+                "execute_status",
+                "convert_status",
+                *PHASES,
+                "total",
+                "peak_memory",
+            ]
+        )
+        for nb in notebooks:
+            writer.writerow(
+                [
+                    nb["notebook"],
+                    nb["execute_status"] or "",
+                    nb["convert_status"] or "",
+                    *(
+                        "" if p not in nb["timings"] else f"{nb['timings'][p]:.6f}"
+                        for p in PHASES
+                    ),
+                    f"{nb['total']:.6f}",
+                    "" if nb.get("peak_memory") is None else nb["peak_memory"],
+                ]
+            )
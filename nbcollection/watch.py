@@ -0,0 +1,184 @@
+"""Watching notebook files for changes."""
+
+from __future__ import annotations
+
+import os
+import threading
+import time
+from typing import Any
+
+from nbcollection.discovery import discover_notebooks
+from nbcollection.logger import logger
+
+try:
+    from watchdog.observers import Observer
+except ImportError:  # pragma: no cover
+    Observer = None  # type: ignore[assignment]
+
+__all__ = ["NotebookWatcher"]
+
+# Events of the file system that change the content of a notebook. Other
+# events, e.g., files opened for reading, are ignored.
+_CHANGE_EVENTS = frozenset(("created", "modified", "deleted", "moved"))
+
+
+class NotebookWatcher:
+    """Waits for notebook files to be created, modified, or deleted.
+
+    If the optional `watchdog <https://github.com/gorakhargosh/watchdog>`_
+    package is installed, the watcher is notified of changes by the file
+    system (e.g., with inotify on Linux). Otherwise, it polls the
+    modification time of the notebooks.
+
+    Parameters
+    ----------
+    paths : list of str
+        Notebook files, or directories whose notebooks are watched
+        recursively. As in `~nbcollection.discovery.discover_notebooks`,
+        subdirectories whose name starts with ``.`` or ``_`` are skipped.
+    interval : float (optional)
+        The time between two polls of the notebooks, in seconds.
+    polling : bool (optional)
+        Whether to poll the notebooks even if ``watchdog`` is installed,
+        e.g., on network file systems that don't report changes.
+    debounce : float (optional)
+        The time without new changes to wait for after a change, in seconds,
+        so that a notebook saved in several writes is reported once.
+    """
+
+    def __init__(
+        self,
+        paths: list[str],
+        *,
+        interval: float = 1.0,
+        polling: bool = False,
+        debounce: float = 0.2,
+    ) -> None:
+        self.directories = [os.path.abspath(p) for p in paths if os.path.isdir(p)]
+        self.files = {os.path.abspath(p) for p in paths if not os.path.isdir(p)}
+        self.interval = interval
+        self.debounce = debounce
+        self.polling = polling or Observer is None
+
+        self._observer: Any = None
+        self._snapshot: dict[str, tuple[int, int]] = {}
+        self._changes: set[str] = set()
+        self._last_change = 0.0
+        self._condition = threading.Condition()
+
+    def start(self) -> None:
+        """Start watching the notebooks."""
+        if self.polling:
+            self._snapshot = self._take_snapshot()
+            logger.debug(f"Polling {len(self._snapshot)} notebooks for changes")
+            return
+
+        self._observer = Observer()
+        for directory in self.directories:
+            self._observer.schedule(self, directory, recursive=True)
+        for directory in {os.path.dirname(path) for path in self.files}:
+            self._observer.schedule(self, directory, recursive=False)
+        self._observer.start()
+
+    def stop(self) -> None:
+        """Stop watching the notebooks."""
+        if self._observer is not None:
+            self._observer.stop()
+            self._observer.join()
+            self._observer = None
+
+    def wait(self, timeout: float | None = None) -> set[str]:
+        """Wait for notebooks to change.
+
+        Parameters
+        ----------
+        timeout : float (optional)
+            The maximum time to wait for a change, in seconds. Default is to
+            wait until a notebook changes.
+
+        Returns
+        -------
+        paths : set of str
+            The absolute paths of the notebooks that were created, modified,
+            or deleted since the last call, or an empty set if none changed
+            before the timeout.
+        """
+        if self.polling:
+            return self._poll(timeout)
+
+        with self._condition:
+            self._condition.wait_for(lambda: self._changes, timeout)
+            if self._changes:
+                # Wait for the notebook to be completely written
+                while (quiet := time.monotonic() - self._last_change) < self.debounce:
+                    self._condition.wait(self.debounce - quiet)
+            changes, self._changes = self._changes, set()
+        return changes
+
+    def dispatch(self, event: Any) -> None:
+        """Record an event of the file system, called by ``watchdog``."""
+        if event.is_directory or event.event_type not in _CHANGE_EVENTS:
+            return
+        paths = [event.src_path, getattr(event, "dest_path", "")]
+        changes = {
+            path
+            for path in (os.path.abspath(os.fsdecode(p)) for p in paths if p)
+            if self._is_watched(path)
+        }
+        if changes:
+            with self._condition:
+                self._changes |= changes
+                self._last_change = time.monotonic()
+                self._condition.notify_all()
+
+    def _is_watched(self, path: str) -> bool:
+        """Whether a path is one of the notebooks that are watched."""
+        if path in self.files:
+            return True
+        if not path.endswith(".ipynb"):
+            return False
+        for directory in self.directories:
+            relative_path = os.path.relpath(path, directory)
+            parts = relative_path.split(os.sep)
+            if parts[0] != os.pardir and not any(
+                part.startswith((".", "_")) for part in parts[:-1]
+            ):
+                return True
+        return False
+
+    def _poll(self, timeout: float | None) -> set[str]:
+        """Poll the notebooks until some of them change."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            delay = self.interval
+            if deadline is not None:
+                delay = min(delay, deadline - time.monotonic())
+            time.sleep(max(delay, 0))
+
+            snapshot = self._take_snapshot()
+            changes = {
+                path
+                for path in snapshot.keys() | self._snapshot.keys()
+                if snapshot.get(path) != self._snapshot.get(path)
+            }
+            self._snapshot = snapshot
+            if changes or (deadline is not None and time.monotonic() >= deadline):
+                return changes
+
+    def _take_snapshot(self) -> dict[str, tuple[int, int]]:
+        """Get the modification time and size of the notebooks."""
+        paths = set(self.files)
+        for directory in self.directories:
+            paths.update(
+                os.path.join(directory, *relative_path.split("/"))
+                for relative_path in discover_notebooks(directory)
+            )
+
+        snapshot = {}
+        for path in paths:
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            snapshot[path] = (stat.st_mtime_ns, stat.st_size)
+        return snapshot
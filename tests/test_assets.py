@@ -0,0 +1,110 @@
+"""Tests for the content-addressed store of extracted outputs."""
+
+import base64
+import hashlib
+import os
+import stat
+from pathlib import Path
+
+import nbformat
+
+from nbcollection.assets import AssetStore, AssetStorePreprocessor
+from nbcollection.config import NbcollectionConfig
+from nbcollection.converter import NbcollectionConverter
+
+IMAGE = b"\x89PNG\r\n\x1a\n not really an image"
+
+
+def _image_notebook():
+    nb = nbformat.v4.new_notebook()
+    nb.metadata["kernelspec"] = {"name": "python3", "display_name": "Python 3"}
+    nb.cells = [
+        nbformat.v4.new_markdown_cell("# A figure"),
+        nbformat.v4.new_code_cell(
+            "from IPython.display import display\n"
+            f"display({{'image/png': '{base64.b64encode(IMAGE).decode()}'}}, "
+            "raw=True)"
+        ),
+    ]
+    return nb
+
+
+def test_asset_store_preprocessor():
+    nb = nbformat.v4.new_notebook()
+    output = nbformat.v4.new_output(
+        "display_data",
+        data={"image/png": ""},
+        metadata={"filenames": {"image/png": "nboutput/nb_1_0.png"}},
+    )
+    nb.cells = [nbformat.v4.new_code_cell(outputs=[output])]
+    preprocessor = AssetStorePreprocessor()
+
+    # Without a store, the outputs are left alone
+    resources = {"outputs": {"nboutput/nb_1_0.png": IMAGE}}
+    preprocessor.preprocess(nb, resources)
+    assert "nboutput/nb_1_0.png" in resources["outputs"]
+
+    resources["asset_store_url"] = "../_assets"
+    preprocessor.preprocess(nb, resources)
+    name = hashlib.sha256(IMAGE).hexdigest() + ".png"
+    assert resources["outputs"] == {}
+    assert resources["assets"] == {name: IMAGE}
+    assert output.metadata.filenames["image/png"] == f"../_assets/{name}"
+
+
+def test_asset_store_write(tmp_path):
+    store = AssetStore(str(tmp_path / "_assets"))
+    name = AssetStore.name(IMAGE, ".png")
+    assert store.write({name: IMAGE}) == 1
+    assert store.write({name: IMAGE}) == 0
+    assert (tmp_path / "_assets" / name).read_bytes() == IMAGE
+    assert [p.name for p in (tmp_path / "_assets").iterdir()] == [name]
+    assert store.url(str(tmp_path / "pages" / "sub")) == "../../_assets"
+
+
+def test_asset_store_mode(tmp_path):
+    """Assets are readable by other users, following the umask."""
+    umask = os.umask(0o022)
+    try:
+        store = AssetStore(str(tmp_path / "_assets"))
+        name = AssetStore.name(IMAGE, ".png")
+        store.write({name: IMAGE})
+    finally:
+        os.umask(umask)
+    mode = stat.S_IMODE((tmp_path / "_assets" / name).stat().st_mode)
+    assert mode == 0o644  # noqa: PLR2004
+
+
+def test_convert_with_asset_store(tmp_path):
+    source_path = tmp_path / "notebooks"
+    (source_path / "sub").mkdir(parents=True)
+    nbformat.write(_image_notebook(), str(source_path / "a.ipynb"))
+    nbformat.write(_image_notebook(), str(source_path / "sub" / "b.ipynb"))
+    build_path = tmp_path / "build" / "_build"
+
+    def convert():
+        converter = NbcollectionConverter(
+            str(source_path),
+            config=NbcollectionConfig(),
+            build_path=str(tmp_path / "build"),
+            overwrite=True,
+            asset_store=True,
+        )
+        converter.convert()
+
+    convert()
+    name = hashlib.sha256(IMAGE).hexdigest() + ".png"
+    asset = build_path / "_assets" / name
+    assert [p.name for p in asset.parent.iterdir()] == [name]
+    assert asset.read_bytes() == IMAGE
+    pages = sorted(build_path.rglob("*.html"))
+    assert [page.name for page in pages] == ["a.html", "b.html"]
+    for page in pages:
+        url = Path(os.path.relpath(asset, page.parent)).as_posix()
+        assert f'src="{url}"' in page.read_text()
+    assert not list(build_path.rglob("nboutput"))
+
+    # Unchanged assets are not written again
+    mtime = asset.stat().st_mtime_ns
+    convert()
+    assert asset.stat().st_mtime_ns == mtime
@@ -0,0 +1,256 @@
+"""Tests for the execution cache."""
+
+import logging
+import os
+import shutil
+from pathlib import Path
+
+import nbformat
+
+from nbcollection.__main__ import main
+from nbcollection.cache import ExecutionCache, restore_outputs
+from nbcollection.config import NbcollectionConfig
+from nbcollection.converter import NbcollectionConverter
+
+DATA_PATH = Path(__file__).parent / "data"
+
+
+def read_notebook(path):
+    return nbformat.read(str(path), as_version=4)
+
+
+def test_cache_key(tmp_path):
+    cache = ExecutionCache(str(tmp_path))
+    nb = read_notebook(DATA_PATH / "my_notebooks" / "notebook1.ipynb")
+    key = cache.key(nb, {})
+
+    # Markdown edits don't change the key
+    nb.cells[0].source = "# A new title"
+    assert cache.key(nb, {}) == key
+
+    # Execution options set to their default value don't change the key
+    assert cache.key(nb, {"kernel_name": "", "timeout": None}) == key
+
+    # Code edits, kernels, and execution options do
+    assert cache.key(nb, {"timeout": 10}) != key
+    nb.metadata["kernelspec"] = {"name": "other"}
+    assert cache.key(nb, {}) != key
+    nb = read_notebook(DATA_PATH / "my_notebooks" / "notebook1.ipynb")
+    nb.cells[1].source = "import sys"
+    assert cache.key(nb, {}) != key
+
+
+def test_restore_outputs():
+    nb = read_notebook(DATA_PATH / "my_notebooks" / "notebook1.ipynb")
+    cached_nb = read_notebook(DATA_PATH / "my_notebooks" / "notebook1.ipynb")
+    output = nbformat.v4.new_output("stream", text="I am notebook 1\n")
+    cached_nb.cells[2].outputs = [output]
+    cached_nb.cells[2].execution_count = 1
+    timing = {"iopub.status.busy": "2024-01-01T00:00:00.000000Z"}
+    cached_nb.cells[2].metadata["execution"] = timing
+    cached_nb.cells[0].source = "# An old title"
+
+    restore_outputs(nb, cached_nb)
+    assert nb.cells[0].source == "# My Notebook 1"
+    assert nb.cells[2].outputs == [output]
+    assert nb.cells[2].execution_count == 1
+    assert nb.cells[2].metadata["execution"] == timing
+
+
+def test_cached_execution(tmp_path, caplog):
+    """Only notebooks with changed code are executed again."""
+    caplog.set_level(logging.DEBUG, logger="nbcollection")
+    source_path = tmp_path / "notebooks"
+    shutil.copytree(DATA_PATH / "my_notebooks", source_path)
+    build_path = tmp_path / "build"
+
+    def execute(*, overwrite=False):
+        caplog.clear()
+        converter = NbcollectionConverter(
+            str(source_path),
+            config=NbcollectionConfig(),
+            build_path=str(build_path),
+            flatten=True,
+            overwrite=overwrite,
+        )
+        converter.execute()
+        return [r.getMessage() for r in caplog.records]
+
+    messages = execute()
+    executed = [m for m in messages if "Finished running notebook" in m]
+    assert len(executed) == len(list(source_path.rglob("*.ipynb")))
+
+    # Editing a markdown cell restores the outputs from the cache
+    nb_path = source_path / "notebook1.ipynb"
+    nb = read_notebook(nb_path)
+    nb.cells[0].source = "# My Edited Notebook 1"
+    nbformat.write(nb, str(nb_path))
+    messages = execute()
+    assert not any("Finished running notebook" in m for m in messages)
+    exec_nb = read_notebook(build_path / "_build" / "notebook1.ipynb")
+    assert exec_nb.cells[0].source == "# My Edited Notebook 1"
+    assert exec_nb.cells[2].outputs[0].text == "I am notebook 1\n"
+
+    # Editing a code cell executes only that notebook again
+    nb.cells[2].source = 'print("I am edited notebook 1")'
+    nbformat.write(nb, str(nb_path))
+    messages = execute()
+    executed = [m for m in messages if "Finished running notebook" in m]
+    assert len(executed) == 1
+    assert "'notebook1.ipynb'" in executed[0]
+    exec_nb = read_notebook(build_path / "_build" / "notebook1.ipynb")
+    assert exec_nb.cells[2].outputs[0].text == "I am edited notebook 1\n"
+
+    # Overwriting executes all notebooks again, and replaces their cache entries
+    messages = execute(overwrite=True)
+    executed = [m for m in messages if "Finished running notebook" in m]
+    assert len(executed) == len(list(source_path.rglob("*.ipynb")))
+    messages = execute()
+    assert not any("Finished running notebook" in m for m in messages)
+
+
+def test_warm_build(tmp_path):
+    """Unchanged notebooks are neither restored from the cache nor converted."""
+    source_path = tmp_path / "notebooks"
+    shutil.copytree(DATA_PATH / "my_notebooks", source_path)
+    build_path = tmp_path / "build"
+
+    def convert():
+        converter = NbcollectionConverter(
+            str(source_path),
+            config=NbcollectionConfig(),
+            build_path=str(build_path),
+            flatten=True,
+        )
+        converter.convert()
+        return {
+            (nb.summary["execute_status"], nb.summary["convert_status"])
+            for nb in converter.notebooks
+        }
+
+    assert convert() == {("executed", "converted")}
+    exec_path = build_path / "_build" / "notebook1.ipynb"
+    mtime = exec_path.stat().st_mtime_ns
+
+    # The executed notebooks were built from the same sources and cache keys,
+    # as recorded in the build manifest
+    assert convert() == {("skipped", "skipped")}
+
+    # Restoring the outputs from the cache gives the same executed notebooks,
+    # so they aren't written again and their pages aren't converted again
+    (build_path / "_build" / NbcollectionConverter.manifest_name).unlink()
+    assert convert() == {("cached", "skipped")}
+    assert exec_path.stat().st_mtime_ns == mtime
+
+
+def test_cache_shared_by_commands(tmp_path, caplog):
+    """Notebooks executed by the execute command aren't executed again by convert."""
+    caplog.set_level(logging.INFO, logger="nbcollection")
+    source_path = tmp_path / "notebooks"
+    shutil.copytree(DATA_PATH / "my_notebooks", source_path)
+    build_path = tmp_path / "build"
+
+    main(["nbcollection", "execute", str(source_path), f"--build-path={build_path}"])
+    executed = [r for r in caplog.records if "Finished running" in r.getMessage()]
+    assert len(executed) == len(list(source_path.rglob("*.ipynb")))
+
+    caplog.clear()
+    main(["nbcollection", "convert", str(source_path), f"--build-path={build_path}"])
+    assert not any("Finished running" in r.getMessage() for r in caplog.records)
+    assert len(list(build_path.rglob("*.html"))) == len(executed)
+
+
+def test_declared_dependencies_key(tmp_path):
+    cache = ExecutionCache(str(tmp_path / "cache"))
+    nb = nbformat.v4.new_notebook()
+    nb.cells.append(nbformat.v4.new_code_cell("open('data/table.csv').read()"))
+    key = cache.key(nb, {}, path=str(tmp_path))
+    assert key == cache.key(nb, {})
+
+    nb.metadata["nbcollection"] = {"data_files": ["data/*.csv"]}
+    (tmp_path / "data").mkdir()
+    (tmp_path / "data" / "table.csv").write_text("a,b\n1,2\n")
+    key = cache.key(nb, {}, path=str(tmp_path))
+    assert key != cache.key(nb, {})
+    assert cache.key(nb, {}, path=str(tmp_path)) == key
+
+    (tmp_path / "data" / "table.csv").write_text("a,b\n1,3\n")
+    assert cache.key(nb, {}, path=str(tmp_path)) != key
+
+
+def test_traced_dependencies(tmp_path, caplog):
+    """Only notebooks that read a changed data file are executed again."""
+    caplog.set_level(logging.DEBUG, logger="nbcollection")
+    source_path = tmp_path / "notebooks"
+    source_path.mkdir()
+    (source_path / "data.txt").write_text("first")
+    for name, source in [
+        ("reader", "print(open('data.txt').read())"),
+        ("other", "with open('output.txt', 'w') as f:\n    f.write('output')"),
+    ]:
+        nb = nbformat.v4.new_notebook()
+        nb.metadata["kernelspec"] = {"name": "python3", "display_name": "Python 3"}
+        nb.cells.append(nbformat.v4.new_code_cell(source))
+        nbformat.write(nb, str(source_path / f"{name}.ipynb"))
+    build_path = tmp_path / "build"
+
+    def execute():
+        caplog.clear()
+        converter = NbcollectionConverter(
+            str(source_path),
+            config=NbcollectionConfig(),
+            build_path=str(build_path),
+            flatten=True,
+        )
+        converter.execute()
+        return [
+            r.getMessage()
+            for r in caplog.records
+            if "Finished running notebook" in r.getMessage()
+        ]
+
+    assert len(execute()) == len(list(source_path.glob("*.ipynb")))
+    assert execute() == []
+
+    # Files written by a notebook aren't dependencies
+    (source_path / "output.txt").write_text("changed")
+    assert execute() == []
+
+    (source_path / "data.txt").write_text("second")
+    executed = execute()
+    assert len(executed) == 1
+    assert "'reader.ipynb'" in executed[0]
+    exec_nb = read_notebook(build_path / "_build" / "reader.ipynb")
+    assert exec_nb.cells[0].outputs[0].text == "second\n"
+
+    # Restoring the data file restores the previous outputs from the cache
+    (source_path / "data.txt").write_text("first")
+    assert execute() == []
+    exec_nb = read_notebook(build_path / "_build" / "reader.ipynb")
+    assert exec_nb.cells[0].outputs[0].text == "first\n"
+
+
+def test_dependencies_by_directory(tmp_path):
+    """Notebooks with the same code in different directories read their own data."""
+    source_path = tmp_path / "notebooks"
+    for name in ("a", "b"):
+        (source_path / name).mkdir(parents=True)
+        data_path = source_path / name / "data.txt"
+        data_path.write_text(f"data {name}")
+        # The same size and modification time, so only the content differs
+        os.utime(data_path, ns=(0, 0))
+        nb = nbformat.v4.new_notebook()
+        nb.metadata["kernelspec"] = {"name": "python3", "display_name": "Python 3"}
+        nb.cells.append(nbformat.v4.new_code_cell("print(open('data.txt').read())"))
+        nbformat.write(nb, str(source_path / name / "reader.ipynb"))
+
+    converter = NbcollectionConverter(
+        str(source_path),
+        config=NbcollectionConfig(),
+        build_path=str(tmp_path / "build"),
+    )
+    converter.execute()
+    for nb in converter.notebooks:
+        exec_nb = read_notebook(nb.exec_path)
+        name = os.path.basename(nb.path)
+        assert exec_nb.cells[0].outputs[0].text == f"data {name}\n"
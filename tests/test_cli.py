@@ -151,6 +151,103 @@ def test_learn_astropy_theme(tmp_path):
     assert download_link.attrs["href"] == "notebook1.ipynb"
 
 
+@pytest.mark.parametrize("engine", ["process", "async"])
+@pytest.mark.parametrize("command", ["execute", "convert"])
+def test_parallel(tmp_path, command, engine):
+    """Execute notebooks in parallel with each execution engine."""
+    nb_root_path = Path(__file__).parent / "data" / "my_notebooks"
+    build_path = tmp_path / f"test_parallel_{command}_{engine}"
+
+    args = [
+        "nbcollection",
+        command,
+        str(nb_root_path),
+        f"--build-path={build_path!s}",
+        "--flatten",
+        "--jobs=2",
+        f"--engine={engine}",
+    ]
+    if command == "convert":
+        args.append("--convert-jobs=2")
+    _ = main(args)
+    for nb_name in ["notebook1", "notebook2", "notebook3"]:
+        assert (build_path / "_build" / f"{nb_name}.ipynb").is_file()
+        if command == "convert":
+            assert (build_path / "_build" / f"{nb_name}.html").is_file()
+
+
+@pytest.mark.parametrize("engine", ["process", "async"])
+def test_parallel_errors(tmp_path, engine):
+    """Errors from parallel notebooks are aggregated into one RuntimeError."""
+    data_path = Path(__file__).parent / "data"
+    build_path = tmp_path / f"test_parallel_errors_{engine}"
+
+    with pytest.raises(RuntimeError, match="1 notebooks raised unexpected errors"):
+        main(
+            [
+                "nbcollection",
+                "execute",
+                str(data_path / "exception-should-fail.ipynb"),
+                str(data_path / "nb_test1" / "notebook1.ipynb"),
+                f"--build-path={build_path!s}",
+                "--jobs=2",
+                f"--engine={engine}",
+            ]
+        )
+    assert (build_path / "_build" / "notebook1.ipynb").is_file()
+
+
+@pytest.mark.parametrize("engine", ["process", "async"])
+def test_parallel_convert_errors(tmp_path, engine):
+    """Notebooks that executed are converted even if others failed."""
+    data_path = Path(__file__).parent / "data"
+    build_path = tmp_path / f"test_parallel_convert_errors_{engine}"
+
+    with pytest.raises(RuntimeError, match="1 notebooks raised unexpected errors"):
+        main(
+            [
+                "nbcollection",
+                "convert",
+                str(data_path / "exception-should-fail.ipynb"),
+                str(data_path / "nb_test2" / "notebook1.ipynb"),
+                str(data_path / "nb_test2" / "notebook2.ipynb"),
+                f"--build-path={build_path!s}",
+                "--jobs=2",
+                "--convert-jobs=2",
+                f"--engine={engine}",
+            ]
+        )
+    for nb_name in ["notebook1", "notebook2"]:
+        assert (build_path / "_build" / f"{nb_name}.html").is_file()
+    assert not (build_path / "_build" / "exception-should-fail.html").exists()
+
+
+@pytest.mark.parametrize("engine", ["process", "async"])
+def test_pipeline(tmp_path, engine):
+    """Notebooks are converted as soon as they are executed."""
+    data_path = Path(__file__).parent / "data"
+    build_path = tmp_path / f"test_pipeline_{engine}"
+
+    with pytest.raises(RuntimeError, match="1 notebooks raised unexpected errors"):
+        main(
+            [
+                "nbcollection",
+                "convert",
+                str(data_path / "exception-should-fail.ipynb"),
+                str(data_path / "nb_test2" / "notebook1.ipynb"),
+                str(data_path / "nb_test2" / "notebook2.ipynb"),
+                f"--build-path={build_path!s}",
+                "--jobs=2",
+                "--convert-jobs=2",
+                f"--engine={engine}",
+                "--pipeline",
+            ]
+        )
+    for nb_name in ["notebook1", "notebook2"]:
+        assert (build_path / "_build" / f"{nb_name}.html").is_file()
+    assert not (build_path / "_build" / "exception-should-fail.html").exists()
+
+
 # Too scary...
 # def teardown_module():
 #     for path in BUILD_PATHS:
@@ -0,0 +1,105 @@
+"""Tests for the discovery of the notebooks in a directory tree."""
+
+import os
+import time
+
+from nbcollection import discovery
+from nbcollection.config import NbcollectionConfig
+from nbcollection.converter import NbcollectionConverter
+from nbcollection.discovery import discover_notebooks
+
+
+def _make_tree(root, paths):
+    for path in paths:
+        file_path = root / path
+        file_path.parent.mkdir(parents=True, exist_ok=True)
+        file_path.write_text("{}")
+
+
+def _age(root):
+    """Set the modification time of all directories to an hour ago."""
+    past = time.time() - 3600
+    for dirpath, _, _ in os.walk(root):
+        os.utime(dirpath, (past, past))
+
+
+def test_discover_notebooks(tmp_path):
+    _make_tree(
+        tmp_path,
+        [
+            "b.ipynb",
+            "a.ipynb",
+            "notes.txt",
+            # Sibling hidden directories are all skipped
+            ".a/hidden.ipynb",
+            "_b/build.ipynb",
+            "_c/build.ipynb",
+            "sub/c.ipynb",
+            "sub/deeper/d.ipynb",
+            "sub2/exclude-me.ipynb",
+        ],
+    )
+    assert discover_notebooks(str(tmp_path)) == [
+        "a.ipynb",
+        "b.ipynb",
+        "sub/c.ipynb",
+        "sub/deeper/d.ipynb",
+        "sub2/exclude-me.ipynb",
+    ]
+    assert discover_notebooks(
+        str(tmp_path), include_pattern="^[a-d]", exclude_pattern="^b"
+    ) == ["a.ipynb", "sub/c.ipynb", "sub/deeper/d.ipynb"]
+
+
+def test_discovery_index(tmp_path, monkeypatch):
+    root = tmp_path / "notebooks"
+    _make_tree(root, ["a.ipynb", "sub/b.ipynb", "sub/deeper/c.ipynb"])
+    _age(root)
+    index_path = str(tmp_path / "index.json")
+
+    scanned = []
+    scan_directory = discovery._scan_directory
+
+    def counting_scan_directory(path):
+        scanned.append(os.path.relpath(path, root))
+        return scan_directory(path)
+
+    monkeypatch.setattr(discovery, "_scan_directory", counting_scan_directory)
+
+    expected = ["a.ipynb", "sub/b.ipynb", "sub/deeper/c.ipynb"]
+    assert discover_notebooks(str(root), index_path=index_path) == expected
+    assert len(scanned) == 3  # noqa: PLR2004
+
+    # Nothing changed: no directory is listed again
+    scanned.clear()
+    assert discover_notebooks(str(root), index_path=index_path) == expected
+    assert scanned == []
+
+    # Only the modified directory is listed again
+    _make_tree(root, ["sub/new.ipynb"])
+    assert discover_notebooks(str(root), index_path=index_path) == [
+        "a.ipynb",
+        "sub/b.ipynb",
+        "sub/new.ipynb",
+        "sub/deeper/c.ipynb",
+    ]
+    assert scanned == ["sub"]
+
+
+def test_converter_discovery(tmp_path):
+    source_path = tmp_path / "notebooks"
+    _make_tree(source_path, ["a.ipynb", "sub/b.ipynb", "_skip/c.ipynb"])
+    build_path = tmp_path / "build"
+    converter = NbcollectionConverter(
+        str(source_path),
+        config=NbcollectionConfig(),
+        build_path=str(build_path),
+        discovery_index=True,
+    )
+    assert [nb._repo_path for nb in converter.notebooks] == [
+        "a.ipynb",
+        "sub/b.ipynb",
+    ]
+    # Output directories are only created when files are written
+    assert not any(path.is_dir() for path in (build_path / "_build").iterdir())
+    assert (build_path / "_build" / converter.index_name).exists()
@@ -0,0 +1,120 @@
+"""Tests for the optimization of the image outputs of notebooks."""
+
+import base64
+import io
+import logging
+import zlib
+
+import nbformat
+import pytest
+
+from nbcollection.config import NbcollectionConfig
+from nbcollection.converter import NbcollectionConverter
+
+Image = pytest.importorskip("PIL.Image")
+
+from nbcollection.images import ImageOptimizer
+
+
+def _png(size=(400, 300)):
+    """Make a badly compressed PNG image."""
+    image = Image.new("RGB", size, "white")
+    image.paste((255, 0, 0), (0, 0, size[0] // 2, size[1] // 2))
+    buffer = io.BytesIO()
+    image.save(buffer, "PNG", compress_level=zlib.Z_NO_COMPRESSION)
+    return buffer.getvalue()
+
+
+def _notebook(png):
+    nb = nbformat.v4.new_notebook()
+    nb.cells = [
+        nbformat.v4.new_code_cell(
+            outputs=[
+                nbformat.v4.new_output(
+                    "display_data",
+                    data={"image/png": base64.b64encode(png).decode("ascii")},
+                )
+            ]
+        )
+    ]
+    return nb
+
+
+def test_optimize(tmp_path):
+    png = _png()
+    nb = _notebook(png)
+    optimizer = ImageOptimizer(str(tmp_path / "cache"), max_size=200, webp=True)
+    savings = optimizer.optimize(nb)
+    assert savings["images"] == 1
+    assert savings["original_bytes"] == len(png)
+    assert savings["optimized_bytes"] < len(png) // 10
+
+    output = nb.cells[0].outputs[0]
+    optimized = Image.open(io.BytesIO(base64.b64decode(output.data["image/png"])))
+    assert optimized.size == (200, 150)
+    # The display size is kept
+    assert output.metadata["image/png"] == {"width": 400, "height": 300}
+    webp = Image.open(io.BytesIO(base64.b64decode(output.data["image/webp"])))
+    assert webp.format == "WEBP"
+
+    # The second time, the optimized images come from the cache
+    cached_nb = _notebook(png)
+    optimizer._write_atomic = None  # would fail if anything were written
+    assert optimizer.optimize(cached_nb) == savings
+    assert cached_nb.cells[0].outputs == nb.cells[0].outputs
+
+
+def test_optimize_lossless(tmp_path):
+    png = _png()
+    nb = _notebook(png)
+    ImageOptimizer(str(tmp_path / "cache")).optimize(nb)
+    output = nb.cells[0].outputs[0]
+    optimized = base64.b64decode(output.data["image/png"])
+    assert len(optimized) < len(png)
+    assert (
+        Image.open(io.BytesIO(optimized)).tobytes()
+        == Image.open(io.BytesIO(png)).tobytes()
+    )
+    assert "image/webp" not in output.data
+    assert "image/png" not in output.metadata
+
+
+def test_convert_with_optimized_images(tmp_path, caplog):
+    caplog.set_level(logging.INFO, logger="nbcollection")
+    source_path = tmp_path / "notebooks"
+    source_path.mkdir()
+    nb = _notebook(_png())
+    nb.metadata["kernelspec"] = {"name": "python3", "display_name": "Python 3"}
+    nb.cells[0].source = (
+        "from IPython.display import display\n"
+        f"display({{'image/png': {nb.cells[0].outputs[0].data['image/png']!r}}}, "
+        "raw=True)"
+    )
+    nb.cells.insert(0, nbformat.v4.new_markdown_cell("# A figure"))
+    nbformat.write(nb, str(source_path / "figure.ipynb"))
+
+    converter = NbcollectionConverter(
+        str(source_path),
+        config=NbcollectionConfig(),
+        build_path=str(tmp_path / "build"),
+        flatten=True,
+        optimize_images=True,
+        webp_images=True,
+    )
+    converter.convert()
+
+    build_path = tmp_path / "build" / "_build"
+    html = (build_path / "figure.html").read_text()
+    assert '<source srcset="nboutput/figure.ipynb_1_0.webp" type="image/webp"/>' in html
+    assert (build_path / "nboutput" / "figure.ipynb_1_0.webp").exists()
+    png = (build_path / "nboutput" / "figure.ipynb_1_0.png").read_bytes()
+    assert len(png) < len(_png())
+    # The executed notebook keeps the original image
+    exec_nb = nbformat.read(str(build_path / "figure.ipynb"), 4)
+    assert "image/webp" not in exec_nb.cells[1].outputs[0].data
+
+    assert converter.notebooks[0].summary["image_savings"]["images"] == 1
+    assert any(
+        "Optimized 1 images of notebook 'figure.ipynb'" in r.getMessage()
+        for r in caplog.records
+    )
@@ -0,0 +1,55 @@
+"""Tests for the kernel pool."""
+
+import logging
+
+import nbformat
+import pytest
+
+from nbcollection.config import NbcollectionConfig
+from nbcollection.converter import NbcollectionConverter
+
+
+def write_notebook(path, *sources):
+    nb = nbformat.v4.new_notebook()
+    nb.cells = [nbformat.v4.new_code_cell(source) for source in sources]
+    path.parent.mkdir(parents=True, exist_ok=True)
+    nbformat.write(nb, str(path))
+
+
+@pytest.mark.parametrize("engine", ["process", "async"])
+@pytest.mark.parametrize("policy", ["restart", "reset"])
+def test_kernel_pool(tmp_path, caplog, policy, engine):
+    """Pooled kernels are reset and moved to the notebook directory."""
+    caplog.set_level(logging.INFO, logger="nbcollection")
+    source_path = tmp_path / "notebooks"
+    write_notebook(
+        source_path / "first.ipynb",
+        "import os",
+        f"assert os.getcwd() == {str(source_path)!r}",
+        "x = 1",
+    )
+    write_notebook(
+        source_path / "sub" / "second.ipynb",
+        "import os",
+        f"assert os.getcwd() == {str(source_path / 'sub')!r}",
+        "assert 'x' not in globals()",
+    )
+
+    converter = NbcollectionConverter(
+        str(source_path),
+        config=NbcollectionConfig(),
+        build_path=str(tmp_path / "build"),
+        cache=False,
+        kernel_pool=policy,
+    )
+    converter.execute(engine=engine)
+
+    # The cells are numbered from 1 in each notebook
+    for nb in converter.notebooks:
+        executed_nb = nbformat.read(nb.exec_path, as_version=4)
+        assert [cell.execution_count for cell in executed_nb.cells] == [1, 2, 3]
+
+    messages = [r.getMessage() for r in caplog.records]
+    assert sum("kernel startup saved" in m for m in messages) == len(
+        converter.notebooks
+    )
@@ -0,0 +1,213 @@
+"""Tests for the build manifest and the status of a collection."""
+
+import shutil
+from pathlib import Path
+
+import nbformat
+import pytest
+
+from nbcollection.__main__ import main
+from nbcollection.config import NbcollectionConfig
+from nbcollection.converter import NbcollectionConverter
+from nbcollection.manifest import BuildManifest, NotebookRecord
+
+DATA_PATH = Path(__file__).parent / "data"
+
+
+def test_manifest_update(tmp_path):
+    manifest = BuildManifest(str(tmp_path / "manifest.db"))
+    assert manifest.get("nb.ipynb") is None
+
+    manifest.update(
+        [
+            NotebookRecord(
+                "nb.ipynb",
+                input_hash="a",
+                execute_status="executed",
+                execute_time=10.0,
+                executed_at=1.0,
+                convert_status="error",
+                convert_error="oops",
+                converted_at=1.0,
+            )
+        ]
+    )
+    record = manifest.get("nb.ipynb")
+    assert record.execute_time == 10.0  # noqa: PLR2004
+    assert record.failed
+
+    # Restored from the cache: the last execution time is kept, and the
+    # conversion fields are left alone because it didn't run
+    manifest.update(
+        [NotebookRecord("nb.ipynb", execute_status="cached", executed_at=2.0)]
+    )
+    record = manifest.get("nb.ipynb")
+    assert record.execute_status == "cached"
+    assert record.execute_time == 10.0  # noqa: PLR2004
+    assert record.input_hash == "a"
+    assert record.convert_error == "oops"
+    assert record.built_at == 2.0  # noqa: PLR2004
+
+    manifest.update(
+        [NotebookRecord("nb.ipynb", convert_status="converted", convert_time=1.0)]
+    )
+    record = manifest.get("nb.ipynb")
+    assert record.convert_error is None
+    assert not record.failed
+    assert list(manifest.get_all()) == ["nb.ipynb"]
+
+
+def test_status(tmp_path):
+    source_path = tmp_path / "notebooks"
+    shutil.copytree(DATA_PATH / "my_notebooks", source_path)
+
+    def get_states():
+        converter = NbcollectionConverter(
+            str(source_path),
+            config=NbcollectionConfig(),
+            build_path=str(tmp_path / "build"),
+        )
+        return converter, {
+            s.name: (s.state, s.execute, s.convert) for s in converter.status()
+        }
+
+    converter, states = get_states()
+    assert states["notebook1.ipynb"] == ("new", "execute", "convert")
+
+    converter.convert()
+    converter, states = get_states()
+    # The executed notebooks were built from the same sources and cache keys
+    assert set(states.values()) == {("up to date", "skip", "skip")}
+    assert all(s.estimated_time == 0 for s in converter.status())
+
+    # A markdown edit is restored from the cache, but must be converted again
+    nb_path = source_path / "notebook1.ipynb"
+    nb = nbformat.read(nb_path, as_version=4)
+    nb.cells[0].source = "# A new title"
+    nbformat.write(nb, nb_path)
+    _, states = get_states()
+    assert states["notebook1.ipynb"] == ("stale", "restore", "convert")
+
+    # A failing notebook stays failed until it changes
+    nb.cells.append(nbformat.v4.new_code_cell("1 / 0"))
+    nbformat.write(nb, nb_path)
+    with pytest.raises(RuntimeError):
+        converter.convert()
+    converter, states = get_states()
+    assert states["notebook1.ipynb"] == ("failed", "execute", "convert")
+    assert states["sub_path1/notebook2.ipynb"] == ("up to date", "skip", "skip")
+    (status,) = (s for s in converter.status() if s.name == "notebook1.ipynb")
+    assert "ZeroDivisionError" in status.record.execute_error
+    assert status.estimated_time > 0
+
+
+@pytest.mark.parametrize("command", ["status", "plan"])
+def test_status_cli(tmp_path, capsys, command):
+    source_path = tmp_path / "notebooks"
+    shutil.copytree(DATA_PATH / "my_notebooks", source_path)
+    build_path = tmp_path / "build"
+
+    main(["nbcollection", command, str(source_path), f"--build-path={build_path}"])
+    out = capsys.readouterr().out
+    assert "sub_path1/notebook2.ipynb" in out
+    assert "not including 3 notebooks without build history" in out
+
+    main(["nbcollection", "convert", str(source_path), f"--build-path={build_path}"])
+    capsys.readouterr()
+    main(["nbcollection", command, str(source_path), f"--build-path={build_path}"])
+    out = capsys.readouterr().out
+    assert "without build history" not in out
+    if command == "status":
+        assert "3 up to date, 0 stale, 0 failed, 0 new" in out
+    else:
+        assert "0 to execute, 0 to restore from the cache, 0 to convert" in out
+
+
+@pytest.mark.parametrize("command", ["status", "plan"])
+def test_status_unreadable(tmp_path, capsys, command):
+    """Notebooks that can't be read are reported instead of failing the report."""
+    source_path = tmp_path / "notebooks"
+    shutil.copytree(DATA_PATH / "my_notebooks", source_path)
+    (source_path / "broken.ipynb").write_text("{not json")
+
+    converter = NbcollectionConverter(
+        str(source_path),
+        config=NbcollectionConfig(),
+        build_path=str(tmp_path / "build"),
+    )
+    statuses = {s.name: s for s in converter.status()}
+    assert statuses["broken.ipynb"].state == "error"
+    assert statuses["broken.ipynb"].error
+    assert statuses["notebook1.ipynb"].state == "new"
+
+    main(
+        [
+            "nbcollection",
+            command,
+            str(source_path),
+            f"--build-path={tmp_path / 'build'}",
+            "--timeout=60",
+        ]
+    )
+    out = capsys.readouterr().out
+    assert "broken.ipynb" in out
+    assert "not including 3 notebooks without build history" in out
+    if command == "status":
+        assert "0 failed, 3 new, 1 error" in out
+    else:
+        assert "Notebook 'broken.ipynb' can't be read" in out
+
+
+def test_status_options():
+    """The status and plan commands only accept the options that they use."""
+    for command in ("status", "plan"):
+        with pytest.raises(SystemExit):
+            main(["nbcollection", command, str(DATA_PATH), "--asset-store"])
+        with pytest.raises(SystemExit):
+            main(["nbcollection", command, str(DATA_PATH), "--kernel-pool=reset"])
+
+
+@pytest.mark.parametrize("pipeline", [False, True])
+def test_build_recorded_once(tmp_path, monkeypatch, pipeline):
+    """Converting records the build once, not once more for the execute stage."""
+    converter = NbcollectionConverter(
+        str(DATA_PATH / "my_notebooks"),
+        config=NbcollectionConfig(),
+        build_path=str(tmp_path / "build"),
+    )
+    record_build = converter._record_build
+    calls = []
+
+    def count_record_build():
+        calls.append(None)
+        record_build()
+
+    monkeypatch.setattr(converter, "_record_build", count_record_build)
+    converter.convert(jobs=2, engine="async", pipeline=pipeline)
+    assert len(calls) == 1
+
+
+def test_moved_collection(tmp_path):
+    """The build history is found if the collection is built in another directory."""
+    source_path = tmp_path / "checkout1" / "notebooks"
+    shutil.copytree(DATA_PATH / "my_notebooks", source_path)
+    converter = NbcollectionConverter(
+        str(source_path),
+        config=NbcollectionConfig(),
+        build_path=str(tmp_path / "checkout1"),
+    )
+    converter.execute()
+
+    # E.g., a CI job restoring the build directory in another working directory
+    shutil.copytree(tmp_path / "checkout1", tmp_path / "checkout2")
+    converter = NbcollectionConverter(
+        str(tmp_path / "checkout2" / "notebooks"),
+        config=NbcollectionConfig(),
+        build_path=str(tmp_path / "checkout2"),
+        shard="1/2",
+        balance_shards=True,
+    )
+    statuses = converter.status()
+    assert statuses
+    assert all(s.record is not None and s.record.execute_time for s in statuses)
+    assert all(s.execute == "skip" for s in statuses)
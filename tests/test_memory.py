@@ -0,0 +1,132 @@
+"""Tests for the memory tracking of kernels and the memory budget."""
+
+import os
+import sqlite3
+import subprocess
+import sys
+import time
+
+import nbformat
+import pytest
+
+from nbcollection.config import NbcollectionConfig
+from nbcollection.converter import NbcollectionConverter
+from nbcollection.manifest import BuildManifest, NotebookRecord
+from nbcollection.memory import MemorySampler, format_memory, parse_memory
+
+linux_only = pytest.mark.skipif(
+    not sys.platform.startswith("linux"), reason="memory is read from /proc"
+)
+
+
+def test_parse_memory():
+    assert parse_memory("100") == 100  # noqa: PLR2004
+    assert parse_memory("512M") == 512 * 1024**2
+    assert parse_memory("8GB") == 8 * 1024**3
+    assert parse_memory("1.5 GiB") == int(1.5 * 1024**3)
+    with pytest.raises(ValueError, match="Invalid memory size"):
+        parse_memory("lots")
+    assert format_memory(None) == "?"
+    assert format_memory(512) == "512 B"
+    assert format_memory(3 * 1024**3) == "3.0 GiB"
+
+
+@linux_only
+def test_memory_sampler():
+    code = "data = bytearray(100_000_000); import time; time.sleep(10)"
+    process = subprocess.Popen([sys.executable, "-c", code])  # noqa: S603
+    try:
+        sampler = MemorySampler(interval=0.01)
+        sampler.start(process.pid)
+        time.sleep(1)
+        peak = sampler.stop()
+    finally:
+        process.kill()
+        process.wait()
+    assert peak > 100_000_000  # noqa: PLR2004
+    assert sampler.stop() == peak
+
+
+def test_manifest_migration(tmp_path):
+    # A manifest created before the peak_memory column was added
+    path = str(tmp_path / "manifest.db")
+    with sqlite3.connect(path) as conn:
+        conn.execute(
+            "CREATE TABLE notebooks (path TEXT PRIMARY KEY, input_hash, cache_key)"
+        )
+        conn.execute("INSERT INTO notebooks VALUES ('nb.ipynb', 'a', 'b')")
+    conn.close()
+
+    manifest = BuildManifest(path)
+    assert manifest.get("nb.ipynb") == NotebookRecord(
+        "nb.ipynb", input_hash="a", cache_key="b"
+    )
+    manifest.update([NotebookRecord("nb.ipynb", peak_memory=1024)])
+    assert manifest.get("nb.ipynb").peak_memory == 1024  # noqa: PLR2004
+
+
+def _write_notebooks(source_path, names):
+    source_path.mkdir()
+    for name in names:
+        nb = nbformat.v4.new_notebook()
+        nb.metadata["kernelspec"] = {"name": "python3", "display_name": "Python 3"}
+        nb.cells = [nbformat.v4.new_code_cell(f"name = '{name}'")]
+        nbformat.write(nb, str(source_path / f"{name}.ipynb"))
+
+
+def test_admission_queue_from_manifest(tmp_path, caplog):
+    source_path = tmp_path / "notebooks"
+    _write_notebooks(source_path, ["heavy1", "heavy2", "light", "new"])
+    converter = NbcollectionConverter(
+        str(source_path),
+        config=NbcollectionConfig(),
+        build_path=str(tmp_path / "build"),
+        max_memory=parse_memory("10G"),
+    )
+    notebooks = sorted(converter.notebooks, key=lambda nb: nb.filename)
+    heavy1, heavy2, light, new = notebooks
+    peaks = {heavy1: parse_memory("8G"), heavy2: parse_memory("8G")}
+    peaks[light] = parse_memory("200M")
+    converter.manifest.update(
+        [NotebookRecord(nb._repo_path, peak_memory=m) for nb, m in peaks.items()]
+    )
+
+    queue = converter._admission_queue(
+        notebooks, jobs=4, max_memory=converter.max_memory
+    )
+    # The heavy notebooks never run together, and the notebook without a
+    # recorded peak is expected to be as heavy as the heaviest one
+    assert queue.admit() == [heavy1, light]
+    queue.release(light)
+    assert queue.admit() == []
+    queue.release(heavy1)
+    assert queue.admit() == [heavy2]
+    queue.release(heavy2)
+    assert queue.admit() == [new]
+
+    # A notebook over the budget runs alone
+    queue = converter._admission_queue(notebooks, jobs=4, max_memory=parse_memory("1G"))
+    assert queue.admit() == [heavy1]
+    warnings = [r.getMessage() for r in caplog.records if r.levelname == "WARNING"]
+    assert any("'heavy1.ipynb' is expected to use 8.0 GiB" in w for w in warnings)
+
+
+@linux_only
+def test_peak_memory_recorded(tmp_path):
+    source_path = tmp_path / "notebooks"
+    _write_notebooks(source_path, ["a", "b"])
+    converter = NbcollectionConverter(
+        str(source_path),
+        config=NbcollectionConfig(),
+        build_path=str(tmp_path / "build"),
+        max_memory=parse_memory("4G"),
+    )
+    converter.execute(jobs=2)
+
+    records = converter.manifest.get_all()
+    for nb in converter.notebooks:
+        assert records[nb._repo_path].peak_memory > 0
+    with open(os.path.join(converter.build_path, "nbcollection_timings.csv")) as f:
+        header, row, _ = f.read().splitlines()
+    assert header.endswith(",peak_memory")
+    assert int(row.rsplit(",", 1)[1]) > 0
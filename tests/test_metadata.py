@@ -0,0 +1,100 @@
+"""Tests for the index metadata of the notebooks of a build."""
+
+import json
+import os
+import stat
+
+import jinja2
+import nbformat
+
+from nbcollection import converter as converter_module
+from nbcollection.config import NbcollectionConfig
+from nbcollection.converter import NbcollectionConverter
+from nbcollection.metadata import read_metadata, write_metadata
+
+TEMPLATE = jinja2.Template(
+    "{% for nb in notebooks %}{{ nb.name }}|{{ nb.description }}|"
+    "{{ nb.toc | map(attribute='title') | join(',') }}|{{ nb.html_path }};"
+    "{% endfor %}"
+)
+
+
+def _write_notebook(path, title):
+    nb = nbformat.v4.new_notebook()
+    nb.metadata["kernelspec"] = {"name": "python3", "display_name": "Python 3"}
+    nb.cells = [
+        nbformat.v4.new_markdown_cell(f"# {title}\n\nAbout {title}.\n\n## Section"),
+        nbformat.v4.new_code_cell("# Not a title\nprint(1 + 1)"),
+    ]
+    path.parent.mkdir(parents=True, exist_ok=True)
+    nbformat.write(nb, str(path))
+
+
+def test_read_write_metadata(tmp_path):
+    path = str(tmp_path / "build" / "metadata.json")
+    assert read_metadata(path) == {}
+    write_metadata(path, {"a.ipynb": {"title": "A"}})
+    assert read_metadata(path) == {"a.ipynb": {"title": "A"}}
+    assert os.listdir(tmp_path / "build") == ["metadata.json"]
+
+
+def test_metadata_mode(tmp_path):
+    """The metadata file has the permissions of the umask, like other files."""
+    path = tmp_path / "metadata.json"
+    umask = os.umask(0o022)
+    try:
+        write_metadata(str(path), {})
+    finally:
+        os.umask(umask)
+    assert stat.S_IMODE(path.stat().st_mode) == 0o644  # noqa: PLR2004
+
+
+def test_index_from_metadata(tmp_path, monkeypatch):
+    source = tmp_path / "notebooks"
+    _write_notebook(source / "a.ipynb", "First")
+    _write_notebook(source / "sub" / "b.ipynb", "Second")
+
+    def make_converter():
+        return NbcollectionConverter(
+            str(source), config=NbcollectionConfig(), build_path=str(tmp_path)
+        )
+
+    converter = make_converter()
+    converter.convert()
+    build_path = tmp_path / "_build"
+    metadata = json.loads((build_path / converter.metadata_name).read_text())
+    assert metadata["a.ipynb"]["title"] == "First"
+    assert metadata["a.ipynb"]["html_path"] == "notebooks/a.ipynb/a.html"
+    assert metadata["a.ipynb"]["execute_time"] > 0
+
+    # The index is rendered from the metadata, without reading the notebooks
+    def read_notebook(*args, **kwargs):  # noqa: ARG001
+        raise AssertionError
+
+    monkeypatch.setattr(converter_module, "read_notebook", read_notebook)
+    content = make_converter().make_html_index(TEMPLATE)
+    assert content == (
+        "First|About First.|Section|notebooks/a.ipynb/a.html;"
+        "Second|About Second.|Section|notebooks/sub/b.ipynb/b.html;"
+    )
+    monkeypatch.undo()
+
+    # The index is only written when it changes
+    index_path = build_path / "index.html"
+    os.utime(index_path, (0, 0))
+    converter = make_converter()
+    converter.convert()
+    converter.make_html_index(TEMPLATE)
+    assert index_path.stat().st_mtime == 0
+
+    _write_notebook(source / "a.ipynb", "New title")
+    converter = make_converter()
+    converter.convert()
+    assert converter.make_html_index(TEMPLATE).startswith("New title|")
+    assert index_path.stat().st_mtime > 0
+
+    # Builds without metadata fall back to reading the executed notebooks
+    os.remove(build_path / converter.metadata_name)
+    converter = make_converter()
+    assert converter.make_html_index(TEMPLATE).startswith("New title|")
+    assert "sub/b.ipynb" in read_metadata(str(build_path / converter.metadata_name))
@@ -0,0 +1,83 @@
+from pathlib import Path
+
+import nbformat
+import pytest
+
+from nbcollection.nb_helpers import find_title, get_index_metadata, is_executed
+
+DATA_PATH = Path(__file__).parent / "data"
+THEMES_DATA_PATH = Path(__file__).parent / "themes" / "data"
+
+
+def _is_executed_full_parse(nb_path):
+    nb = nbformat.read(nb_path, nbformat.NO_CONVERT)
+    return any(cell.cell_type == "code" and cell.outputs for cell in nb.cells)
+
+
+@pytest.mark.parametrize("chunk_size", [7, 1 << 16])
+@pytest.mark.parametrize(
+    "nb_path",
+    [
+        *sorted(DATA_PATH.glob("**/*.ipynb")),
+        *sorted(THEMES_DATA_PATH.glob("*.ipynb")),
+    ],
+    ids=lambda p: p.name,
+)
+def test_is_executed_matches_full_parse(nb_path, chunk_size):
+    assert is_executed(nb_path, chunk_size=chunk_size) == _is_executed_full_parse(
+        nb_path
+    )
+
+
+def test_is_executed_ignores_outputs_in_source(tmp_path):
+    nb = nbformat.v4.new_notebook()
+    nb.cells.append(nbformat.v4.new_code_cell('x = {"outputs": [1]}'))
+    nb.cells.append(nbformat.v4.new_markdown_cell('`"outputs": ["a"]`'))
+    nb_path = tmp_path / "notebook.ipynb"
+    nbformat.write(nb, nb_path)
+
+    assert not is_executed(nb_path)
+
+    nb.cells[0].outputs.append(nbformat.v4.new_output("stream", text="hi"))
+    nbformat.write(nb, nb_path)
+
+    assert is_executed(nb_path)
+    assert is_executed(nb_path, chunk_size=3)
+
+
+def test_get_index_metadata():
+    nb = nbformat.v4.new_notebook()
+    nb.metadata["tags"] = ["astropy", "tables"]
+    nb.cells = [
+        nbformat.v4.new_code_cell("# A comment, not the title\nx = 1"),
+        nbformat.v4.new_markdown_cell(
+            "```\n# Not the title either\n```\n\n"
+            "# The *title*\n\nWhat the notebook\nis about.\n\nMore details."
+        ),
+        nbformat.v4.new_markdown_cell("## First section\n\n> # Quoted heading"),
+        nbformat.v4.new_markdown_cell("### Sub section"),
+    ]
+    assert find_title(nb) == "The *title*"
+    assert get_index_metadata(nb) == {
+        "title": "The *title*",
+        "description": "What the notebook\nis about.",
+        "toc": [
+            {"title": "First section", "level": 2, "href": "#First-section"},
+            {"title": "Sub section", "level": 3, "href": "#Sub-section"},
+        ],
+        "tags": ["astropy", "tables"],
+    }
+
+    # The TOC has the plain text titles and the anchors of the page
+    nb.cells.append(
+        nbformat.v4.new_markdown_cell("## Using `astropy.units` with [*units*](u.html)")
+    )
+    assert get_index_metadata(nb)["toc"][-1] == {
+        "title": "Using astropy.units with units",
+        "level": 2,
+        "href": "#Using-astropy.units-with-units",
+    }
+
+    nb.cells = nb.cells[:1]
+    assert find_title(nb) is None
+    assert get_index_metadata(nb)["title"] is None
@@ -0,0 +1,63 @@
+import io
+from pathlib import Path
+
+import nbformat
+import pytest
+
+from nbcollection import nb_io
+from nbcollection.nb_io import read_notebook, reads_notebook, writes_notebook
+
+DATA_PATH = Path(__file__).parent / "data"
+THEMES_DATA_PATH = Path(__file__).parent / "themes" / "data"
+
+NB_PATHS = [
+    *sorted(DATA_PATH.glob("**/*.ipynb")),
+    *sorted(THEMES_DATA_PATH.glob("*.ipynb")),
+]
+
+
+@pytest.fixture(params=["orjson", "json"])
+def json_backend(request, monkeypatch):
+    if request.param == "json":
+        monkeypatch.setattr(nb_io, "orjson", None)
+    elif nb_io.orjson is None:
+        pytest.skip("orjson is not installed")
+    return request.param
+
+
+@pytest.mark.parametrize("validate", [True, False])
+@pytest.mark.parametrize("nb_path", NB_PATHS, ids=lambda p: p.name)
+def test_read_notebook(nb_path, validate, json_backend):  # noqa: ARG001
+    assert read_notebook(nb_path, validate=validate) == nbformat.read(
+        nb_path, as_version=4
+    )
+
+
+@pytest.mark.parametrize("nb_path", NB_PATHS, ids=lambda p: p.name)
+def test_writes_notebook(nb_path, json_backend):
+    nb = nbformat.read(nb_path, as_version=4)
+    content = writes_notebook(nb)
+
+    assert reads_notebook(content) == nb
+    if json_backend == "json":
+        f = io.StringIO()
+        nbformat.write(nb, f)
+        assert content == f.getvalue()
+
+
+def test_validation(caplog):
+    nb = nbformat.v4.new_notebook()
+    nb.cells.append(nbformat.v4.new_code_cell("1 + 1"))
+    nb.cells[0]["execution_count"] = "one"
+    content = writes_notebook(nb, validate=False)
+
+    reads_notebook(content, validate=False)
+    assert "Notebook JSON is invalid" not in caplog.text
+
+    reads_notebook(content)
+    assert "Notebook JSON is invalid" in caplog.text
+
+
+def test_not_json():
+    with pytest.raises(nbformat.reader.NotJSONError):
+        reads_notebook("{not json")
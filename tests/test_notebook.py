@@ -0,0 +1,73 @@
+"""Tests for operations on an individual notebook."""
+
+import asyncio
+import threading
+from pathlib import Path
+
+import nbcollection.notebook
+from nbcollection.cache import ExecutionCache
+from nbcollection.config import NbcollectionConfig
+from nbcollection.notebook import NbcollectionNotebook, get_exporter
+
+DATA_PATH = Path(__file__).parent / "data"
+
+
+def test_in_memory_handoff(tmp_path):
+    """The executed notebook is converted from memory, then released."""
+    nb = NbcollectionNotebook(
+        str(DATA_PATH / "my_notebooks" / "notebook1.ipynb"),
+        config=NbcollectionConfig(),
+        repo_path="notebook1.ipynb",
+        output_path=str(tmp_path),
+    )
+    nb.execute()
+    assert nb.executed_nb is not None
+    assert nb.summary["index"]["title"] == "My Notebook 1"
+
+    nb.convert(execute=False)
+    assert nb.executed_nb is None
+    html = Path(nb.html_path).read_text()
+
+    # The page is the same as the one exported from the executed file
+    exporter = get_exporter(nb.converter_config, nb.convert_kwargs)
+    expected_html, _ = exporter.from_filename(
+        nb.exec_path,
+        resources={
+            "config_dir": "",
+            "unique_key": nb.filename,
+            "output_files_dir": "nboutput",
+            "learn_astropy_ipynb_download_url": "notebook1.ipynb",
+        },
+    )
+    assert html == expected_html
+
+
+def test_execute_async_off_loop(tmp_path, monkeypatch):
+    """Files are read and written outside of the event loop's thread."""
+    nb = NbcollectionNotebook(
+        str(DATA_PATH / "my_notebooks" / "notebook1.ipynb"),
+        config=NbcollectionConfig(),
+        repo_path="notebook1.ipynb",
+        output_path=str(tmp_path),
+        cache=ExecutionCache(str(tmp_path / "cache")),
+    )
+    threads = []
+
+    def record_thread(function):
+        def wrapper(*args, **kwargs):
+            threads.append(threading.current_thread())
+            return function(*args, **kwargs)
+
+        return wrapper
+
+    for name in ("reads_notebook", "writes_notebook"):
+        monkeypatch.setattr(
+            f"nbcollection.notebook.{name}",
+            record_thread(getattr(nbcollection.notebook, name)),
+        )
+    monkeypatch.setattr(nb.cache, "put", record_thread(nb.cache.put))
+
+    asyncio.run(nb.execute_async())
+    assert nb.summary["execute_status"] == "executed"
+    assert len(threads) == 3  # noqa: PLR2004
+    assert threading.main_thread() not in threads
@@ -0,0 +1,79 @@
+"""Tests for the timing of the cells of executed notebooks."""
+
+import json
+import logging
+import sys
+
+import nbformat
+
+from nbcollection.config import NbcollectionConfig
+from nbcollection.converter import NbcollectionConverter
+from nbcollection.profiling import slowest_cells
+
+
+def test_slowest_cells():
+    profiles = {
+        "a.ipynb": [
+            {"cell": 0, "execution_time": 1.0},
+            {"cell": 2, "execution_time": 3.0},
+        ],
+        "b.ipynb": [{"cell": 1, "execution_time": 2.0}],
+    }
+    cells = slowest_cells(profiles, 2)
+    assert [(c["notebook"], c["cell"]) for c in cells] == [
+        ("a.ipynb", 2),
+        ("b.ipynb", 1),
+    ]
+
+
+def test_cell_profiles(tmp_path, caplog):
+    caplog.set_level(logging.INFO, logger="nbcollection")
+    source_path = tmp_path / "notebooks"
+    source_path.mkdir()
+    nb = nbformat.v4.new_notebook()
+    nb.metadata["kernelspec"] = {"name": "python3", "display_name": "Python 3"}
+    nb.cells = [
+        nbformat.v4.new_markdown_cell("# Slow notebook"),
+        nbformat.v4.new_code_cell("import time"),
+        nbformat.v4.new_code_cell("time.sleep(0.5)"),
+        nbformat.v4.new_code_cell("data = bytearray(100_000_000)"),
+    ]
+    nbformat.write(nb, str(source_path / "slow.ipynb"))
+    build_path = tmp_path / "build"
+
+    def execute():
+        converter = NbcollectionConverter(
+            str(source_path),
+            config=NbcollectionConfig(),
+            build_path=str(build_path),
+            flatten=True,
+            cell_time_budget=0.4,
+            slow_cells=2,
+        )
+        converter.execute()
+        exec_nb = nbformat.read(str(build_path / "_build" / "slow.ipynb"), 4)
+        with (build_path / "_build" / "nbcollection_timings.json").open() as f:
+            return exec_nb, json.load(f)["slowest_cells"]
+
+    exec_nb, cells = execute()
+    profiles = [cell.metadata.get("nbcollection") for cell in exec_nb.cells]
+    assert profiles[0] is None
+    assert profiles[2]["execution_time"] >= 0.5  # noqa: PLR2004
+    if sys.platform.startswith("linux"):
+        assert profiles[3]["peak_memory"] > 100_000_000  # noqa: PLR2004
+
+    assert [c["cell"] for c in cells] == [2, 3]
+    assert cells[0]["notebook"] == "slow.ipynb"
+    assert cells[0]["line"] == "time.sleep(0.5)"
+
+    warnings = [r.getMessage() for r in caplog.records if r.levelname == "WARNING"]
+    assert len(warnings) == 1
+    assert "Cell 2 of notebook 'slow.ipynb'" in warnings[0]
+
+    # The profiles are restored from the cache
+    (build_path / "_build" / "slow.ipynb").unlink()
+    caplog.clear()
+    exec_nb, cached_cells = execute()
+    assert exec_nb.cells[2].metadata["nbcollection"] == profiles[2]
+    assert cached_cells == cells
+    assert not any(r.levelname == "WARNING" for r in caplog.records)
@@ -0,0 +1,120 @@
+"""Tests for the scheduling of notebooks executed in parallel."""
+
+import logging
+import shutil
+from pathlib import Path
+
+from nbcollection.config import NbcollectionConfig
+from nbcollection.converter import NbcollectionConverter
+from nbcollection.manifest import NotebookRecord
+from nbcollection.scheduler import AdmissionQueue, longest_first, predict_makespan
+
+DATA_PATH = Path(__file__).parent / "data"
+
+
+def test_longest_first():
+    assert longest_first([1.0, 5.0, None, 5.0, 0.0]) == [2, 1, 3, 0, 4]
+    assert longest_first([]) == []
+
+
+def test_predict_makespan():
+    assert predict_makespan([], 4) == 0.0  # noqa: PLR2004
+    assert predict_makespan([1.0, 2.0, 3.0], 1) == 6.0  # noqa: PLR2004
+    assert predict_makespan([1.0, 2.0, 3.0], 8) == 3.0  # noqa: PLR2004
+    # The long job started last sets the makespan
+    assert predict_makespan([1.0, 1.0, 1.0, 1.0, 4.0], 2) == 6.0  # noqa: PLR2004
+    assert predict_makespan([4.0, 1.0, 1.0, 1.0, 1.0], 2) == 4.0  # noqa: PLR2004
+
+
+def test_schedule(tmp_path, caplog):
+    source_path = tmp_path / "notebooks"
+    shutil.copytree(DATA_PATH / "my_notebooks", source_path)
+    converter = NbcollectionConverter(
+        str(source_path),
+        config=NbcollectionConfig(),
+        build_path=str(tmp_path / "build"),
+        flatten=True,
+    )
+    names = [nb.filename for nb in converter.notebooks]
+
+    # Without history, the discovery order is kept
+    notebooks, predicted_makespan = converter.schedule(jobs=2)
+    assert [nb.filename for nb in notebooks] == names
+    assert predicted_makespan is None
+
+    # Notebooks without history are expected to take the mean time
+    times = {names[0]: 1.0, names[1]: 7.0}
+    converter.manifest.update(
+        [
+            NotebookRecord(nb._repo_path, execute_time=times[nb.filename])
+            for nb in converter.notebooks
+            if nb.filename in times
+        ]
+    )
+    notebooks, predicted_makespan = converter.schedule(jobs=2)
+    assert [nb.filename for nb in notebooks] == [names[1], names[2], names[0]]
+    assert predicted_makespan == 7.0  # noqa: PLR2004
+
+    caplog.set_level(logging.INFO, logger="nbcollection")
+    converter.execute(jobs=2)
+    messages = [r.getMessage() for r in caplog.records]
+    assert any(
+        "Executed notebooks with 2 jobs" in m and "(predicted: 7.0 seconds)" in m
+        for m in messages
+    )
+
+
+def test_schedule_unchanged(tmp_path, monkeypatch):
+    """Notebooks are scheduled from the build manifest, without parsing them."""
+    source_path = tmp_path / "notebooks"
+    shutil.copytree(DATA_PATH / "my_notebooks", source_path)
+    converter = NbcollectionConverter(
+        str(source_path),
+        config=NbcollectionConfig(),
+        build_path=str(tmp_path / "build"),
+        flatten=True,
+    )
+    converter.execute()
+
+    def reads_notebook(*args, **kwargs):  # noqa: ARG001
+        raise AssertionError
+
+    monkeypatch.setattr("nbcollection.notebook.reads_notebook", reads_notebook)
+    monkeypatch.setattr("nbcollection.notebook.read_notebook", reads_notebook)
+
+    # Unchanged notebooks are expected to take no time
+    notebooks, predicted_makespan = converter.schedule(jobs=2)
+    assert predicted_makespan == 0.0  # noqa: PLR2004
+
+    # A changed notebook is expected to take as long as its last execution
+    changed = converter.notebooks[1]
+    with open(changed.file_path, "a") as f:
+        f.write("\n")
+    notebooks, predicted_makespan = converter.schedule(jobs=2)
+    assert notebooks[0] is changed
+    record = converter.manifest.get(changed._repo_path)
+    assert predicted_makespan == record.execute_time
+
+
+def test_admission_queue():
+    # Without a memory budget, only the number of jobs is limited
+    queue = AdmissionQueue(["a", "b", "c"], jobs=2)
+    assert queue.admit() == ["a", "b"]
+    assert len(queue) == 1
+    queue.release("a")
+    assert queue.admit() == ["c"]
+
+    # Jobs that fit in the budget are started before a job that doesn't
+    queue = AdmissionQueue(
+        ["a", "b", "c", "d"], jobs=3, memory=[6, 6, 2, 20], max_memory=10
+    )
+    assert queue.admit() == ["a", "c"]
+    assert queue.memory_in_use == 8  # noqa: PLR2004
+    queue.release("c")
+    assert queue.admit() == []
+    queue.release("a")
+    assert queue.admit() == ["b"]
+    queue.release("b")
+    # A job over the budget still runs, alone
+    assert queue.admit() == ["d"]
+    assert len(queue) == 0
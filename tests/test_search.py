@@ -0,0 +1,202 @@
+"""Tests for the search index of the converted pages."""
+
+import json
+import re
+
+import nbformat
+from nbconvert import HTMLExporter
+
+from nbcollection.config import NbcollectionConfig
+from nbcollection.converter import NbcollectionConverter
+from nbcollection.search import notebook_sections, tokenize, write_search_index
+
+
+def _notebook(title, text):
+    nb = nbformat.v4.new_notebook()
+    nb.metadata["kernelspec"] = {"name": "python3", "display_name": "Python 3"}
+    nb.cells = [
+        nbformat.v4.new_markdown_cell(f"# {title}\n\nAn introduction."),
+        nbformat.v4.new_code_cell("import math"),
+        nbformat.v4.new_markdown_cell(f"## Fitting a model\n\n{text}\n\n> ## Quoted"),
+        nbformat.v4.new_code_cell("print(math.pi)"),
+    ]
+    return nb
+
+
+def test_tokenize():
+    assert tokenize("Fit a Gaussian, then fit_model(x)!") == [
+        "fit",
+        "gaussian",
+        "then",
+        "fit_model",
+    ]
+
+
+def test_notebook_sections():
+    nb = _notebook("Spectra", "Fit the **spectra** of stars.")
+    nb.cells[0].source = "Before the title.\n\n" + nb.cells[0].source
+    assert notebook_sections(nb) == [
+        {"title": None, "href": "", "terms": {"before": 1, "the": 1, "title": 1}},
+        {
+            "title": "Spectra",
+            "href": "#Spectra",
+            "terms": {
+                "an": 1,
+                "import": 1,
+                "introduction": 1,
+                "math": 1,
+                "spectra": 1,
+            },
+        },
+        {
+            "title": "Fitting a model",
+            "href": "#Fitting-a-model",
+            "terms": {
+                "fit": 1,
+                "fitting": 1,
+                "math": 1,
+                "model": 1,
+                "of": 1,
+                "pi": 1,
+                "print": 1,
+                "quoted": 1,
+                "spectra": 1,
+                "stars": 1,
+                "the": 1,
+            },
+        },
+    ]
+
+
+def test_notebook_sections_inline_markup():
+    nb = nbformat.v4.new_notebook()
+    nb.cells = [
+        nbformat.v4.new_markdown_cell(
+            "## Using `astropy.units`\n\nText.\n\n"
+            "## **Fitting** a [model](https://www.astropy.org) to my_data\n\nText."
+        )
+    ]
+    sections = notebook_sections(nb)
+    assert [(s["title"], s["href"]) for s in sections] == [
+        ("Using astropy.units", "#Using-astropy.units"),
+        ("Fitting a model to my_data", "#Fitting-a-model-to-my_data"),
+    ]
+
+    # The same anchors as in the page
+    html, _ = HTMLExporter().from_notebook_node(nb)
+    anchors = re.findall(r'class="anchor-link" href="([^"]*)"', html)
+    assert anchors == [s["href"] for s in sections]
+
+
+def test_write_search_index(tmp_path):
+    pages = {
+        "b.ipynb": {
+            "html_path": "b.html",
+            "title": "B",
+            "sections": [{"title": None, "href": "", "terms": {"fit": 2, "np": 1}}],
+        },
+        "a.ipynb": {
+            "html_path": "a.html",
+            "title": "A",
+            "sections": [
+                {"title": "S", "href": "#S", "terms": {"fitting": 1}},
+            ],
+        },
+    }
+    path = tmp_path / "_search"
+    assert write_search_index(pages, str(path)) == 4  # noqa: PLR2004
+    assert json.loads((path / "index.json").read_text()) == {
+        "version": 1,
+        "prefix_length": 2,
+        "shards": ["fi", "np"],
+    }
+    assert json.loads((path / "documents.json").read_text()) == [
+        {"page": "a.html", "href": "#S", "title": "A", "section": "S"},
+        {"page": "b.html", "href": "", "title": "B", "section": None},
+    ]
+    assert json.loads((path / "terms" / "fi.json").read_text()) == {
+        "fit": [[1, 2]],
+        "fitting": [[0, 1]],
+    }
+
+    # Unchanged files aren't written again, and unused shards are removed
+    del pages["b.ipynb"]
+    assert write_search_index(pages, str(path)) == 3  # noqa: PLR2004
+    assert sorted(p.name for p in (path / "terms").iterdir()) == ["fi.json"]
+    assert write_search_index(pages, str(path)) == 0
+
+
+def test_converter_search_index(tmp_path):
+    source = tmp_path / "notebooks"
+    source.mkdir()
+    nbformat.write(_notebook("First", "Fit a line."), str(source / "a.ipynb"))
+    nbformat.write(_notebook("Second", "Fit a curve."), str(source / "b.ipynb"))
+
+    def convert():
+        converter = NbcollectionConverter(
+            str(source),
+            config=NbcollectionConfig(),
+            build_path=str(tmp_path),
+            flatten=True,
+            search_index=True,
+        )
+        converter.convert()
+        return converter
+
+    convert()
+    # The entries of the pages that are up to date are kept
+    convert()
+    search_path = tmp_path / "_build" / "_search"
+    documents = json.loads((search_path / "documents.json").read_text())
+    assert [(d["page"], d["href"]) for d in documents] == [
+        ("a.html", "#First"),
+        ("a.html", "#Fitting-a-model"),
+        ("b.html", "#Second"),
+        ("b.html", "#Fitting-a-model"),
+    ]
+    terms = json.loads((search_path / "terms" / "cu.json").read_text())
+    assert terms == {"curve": [[3, 1]]}
+
+    # Only the changed page is split into sections again, the entries of
+    # the other page are reused
+    nbformat.write(_notebook("Second", "Fit a cubic."), str(source / "b.ipynb"))
+    converter = convert()
+    assert [nb.filename for nb in converter.notebooks if "search" in nb.summary] == [
+        "b.ipynb"
+    ]
+    assert json.loads((search_path / "terms" / "cu.json").read_text()) == {
+        "cubic": [[3, 1]]
+    }
+    assert json.loads((search_path / "terms" / "li.json").read_text()) == {
+        "line": [[1, 1]]
+    }
+
+
+def test_search_index_on_existing_build(tmp_path):
+    """Enabling the index on a built collection indexes the up-to-date pages."""
+    source = tmp_path / "notebooks"
+    source.mkdir()
+    nbformat.write(_notebook("First", "Fit a line."), str(source / "a.ipynb"))
+
+    def convert(*, search_index):
+        converter = NbcollectionConverter(
+            str(source),
+            config=NbcollectionConfig(),
+            build_path=str(tmp_path),
+            flatten=True,
+            search_index=search_index,
+        )
+        converter.convert()
+        return converter
+
+    convert(search_index=False)
+    convert(search_index=False)
+    converter = convert(search_index=True)
+    assert not any("search" in nb.summary for nb in converter.notebooks)
+    documents = json.loads(
+        (tmp_path / "_build" / "_search" / "documents.json").read_text()
+    )
+    assert [(d["page"], d["title"]) for d in documents] == [
+        ("a.html", "First"),
+        ("a.html", "First"),
+    ]
@@ -0,0 +1,106 @@
+"""Tests for the preview server."""
+
+import threading
+import time
+import urllib.error
+import urllib.request
+from pathlib import Path
+
+import nbformat
+import pytest
+
+from nbcollection.config import NbcollectionConfig
+from nbcollection.converter import NbcollectionConverter
+from nbcollection.server import PreviewServer
+
+
+def _write_notebook(path, text, code="print(1 + 1)"):
+    nb = nbformat.v4.new_notebook()
+    nb.metadata["kernelspec"] = {"name": "python3", "display_name": "Python 3"}
+    nb.cells = [
+        nbformat.v4.new_markdown_cell(f"# {text}"),
+        nbformat.v4.new_code_cell(code),
+    ]
+    path.parent.mkdir(parents=True, exist_ok=True)
+    nbformat.write(nb, str(path))
+
+
+@pytest.fixture
+def serve(tmp_path):
+    servers = []
+
+    def serve(**kwargs):
+        converter = NbcollectionConverter(
+            str(tmp_path / "notebooks"),
+            config=NbcollectionConfig(),
+            build_path=str(tmp_path),
+            flatten=True,
+        )
+        server = PreviewServer(converter, port=0, **kwargs)
+        thread = threading.Thread(target=server.serve_forever)
+        thread.start()
+        servers.append((server, thread))
+        return server
+
+    yield serve
+
+    for server, thread in servers:
+        server.shutdown()
+        thread.join()
+
+
+def _get(url):
+    with urllib.request.urlopen(url, timeout=60) as response:  # noqa: S310
+        return response.read().decode()
+
+
+def test_render_on_demand(tmp_path, serve):
+    _write_notebook(tmp_path / "notebooks" / "a.ipynb", "First title")
+    _write_notebook(tmp_path / "notebooks" / "b.ipynb", "Other notebook")
+    _write_notebook(
+        tmp_path / "notebooks" / "error.ipynb", "Error", code="raise ValueError"
+    )
+    server = serve(prerender=False)
+    build_path = tmp_path / "_build"
+
+    index = _get(server.url)
+    assert '<a href="a.html">a.ipynb</a>' in index
+    assert not (build_path / "a.html").exists()
+
+    assert "First title" in _get(server.url + "a.html")
+    assert (build_path / "a.html").exists()
+    # Only the requested page is rendered
+    assert not (build_path / "b.html").exists()
+
+    # Unchanged pages come from the page cache
+    (nb_a, _, _) = server.converter.notebooks
+    assert server._cache.get(nb_a.html_path, (build_path / "a.html").stat().st_mtime_ns)
+    assert "First title" in _get(server.url + "a.html")
+
+    # Edited notebooks are rendered again
+    time.sleep(0.01)
+    _write_notebook(tmp_path / "notebooks" / "a.ipynb", "Second title")
+    assert "Second title" in _get(server.url + "a.html")
+
+    with pytest.raises(urllib.error.HTTPError) as excinfo:
+        _get(server.url + "error.html")
+    assert excinfo.value.code == 500  # noqa: PLR2004
+    with pytest.raises(urllib.error.HTTPError) as excinfo:
+        _get(server.url + "missing.html")
+    assert excinfo.value.code == 404  # noqa: PLR2004
+
+    # Renders are recorded in the build manifest
+    records = server.converter.manifest.get_all()
+    assert records[nb_a._repo_path].convert_status == "converted"
+
+
+def test_prerender(tmp_path, serve):
+    _write_notebook(tmp_path / "notebooks" / "a.ipynb", "First title")
+    _write_notebook(tmp_path / "notebooks" / "b.ipynb", "Other notebook")
+    serve()
+    build_path = tmp_path / "_build"
+    for _ in range(600):
+        if (build_path / "a.html").exists() and (build_path / "b.html").exists():
+            break
+        time.sleep(0.1)
+    assert "Other notebook" in Path(build_path / "b.html").read_text()
@@ -0,0 +1,101 @@
+"""Tests for building a collection in shards and merging the builds."""
+
+import shutil
+from pathlib import Path
+
+import pytest
+
+from nbcollection.__main__ import main
+from nbcollection.manifest import BuildManifest
+from nbcollection.sharding import assign_shards, parse_shard
+
+DATA_PATH = Path(__file__).parent / "data"
+
+
+def test_parse_shard():
+    assert parse_shard("1/4") == (0, 4)
+    assert parse_shard("4/4") == (3, 4)
+    for spec in ["0/4", "5/4", "1", "a/b", "1/2/3"]:
+        with pytest.raises(ValueError, match="Invalid shard"):
+            parse_shard(spec)
+
+
+def test_assign_shards():
+    names = [f"notebook{i}.ipynb" for i in range(20)]
+    shards = assign_shards(names, 3)
+    assert shards == assign_shards(names, 3)
+    assert set(shards) == {0, 1, 2}
+
+    # Adding a notebook doesn't move the others
+    assert assign_shards([*names, "new.ipynb"], 3)[:-1] == shards
+
+
+def test_assign_shards_balanced():
+    names = ["a", "b", "c", "d", "e"]
+    times = [10.0, 1.0, None, 6.0, 4.0]
+    # c is expected to take the mean time, 5.25
+    assert assign_shards(names, 2, times=times) == [0, 1, 1, 1, 0]
+    assert assign_shards(names, 2, times=[None] * 5) == [0, 1, 0, 1, 0]
+
+
+def test_shard_and_merge(tmp_path, caplog):
+    source_path = tmp_path / "notebooks"
+    shutil.copytree(DATA_PATH / "my_notebooks", source_path)
+    index_tpl_path = DATA_PATH / "default.tpl"
+
+    shard_builds = []
+    built = set()
+    for k in (1, 2):
+        build_path = tmp_path / f"shard{k}"
+        main(
+            [
+                "nbcollection",
+                "convert",
+                str(source_path),
+                f"--build-path={build_path}",
+                f"--shard={k}/2",
+                "--discovery-index",
+            ]
+        )
+        html = {p.name for p in (build_path / "_build").rglob("*.html")}
+        assert not html & built
+        built |= html
+        shard_builds.append(str(build_path / "_build"))
+    assert built == {"notebook1.html", "notebook2.html", "notebook3.html"}
+
+    # The state of the builds, e.g., restored from the same previous build,
+    # differs between shards
+    for k, build in enumerate(shard_builds):
+        (Path(build) / ".nbcollection_cache" / "old.deps.json").write_text(str(k))
+
+    merged_path = tmp_path / "merged"
+    main(
+        [
+            "nbcollection",
+            "merge",
+            str(source_path),
+            f"--build-path={merged_path}",
+            "--from",
+            *shard_builds,
+            "--make-index",
+            f"--index-template={index_tpl_path}",
+        ]
+    )
+    merged_build = merged_path / "_build"
+    assert {p.name for p in merged_build.rglob("*.html")} == built | {"index.html"}
+    index = (merged_build / "index.html").read_text()
+    for name in ["notebook1", "notebook2", "notebook3"]:
+        assert name in index
+    assert not any("differs between shards" in r.getMessage() for r in caplog.records)
+
+    # The execution caches are combined, and the discovery indexes left out
+    cache_entries = list((merged_build / ".nbcollection_cache").glob("*.ipynb"))
+    assert len(cache_entries) == len(built)
+    assert not (merged_build / ".nbcollection_index.json").exists()
+
+    # The merged manifest points to the merged files
+    records = BuildManifest(str(merged_build / ".nbcollection_manifest.db")).get_all()
+    assert len(records) == len(built)
+    for record in records.values():
+        assert Path(record.html_path).is_relative_to(merged_build)
+        assert Path(record.html_path).exists()
@@ -0,0 +1,67 @@
+"""Tests for the timing report of a build."""
+
+import csv
+import json
+import shutil
+from pathlib import Path
+
+from nbcollection.config import NbcollectionConfig
+from nbcollection.converter import NbcollectionConverter
+from nbcollection.timing import PHASES
+
+DATA_PATH = Path(__file__).parent / "data"
+
+
+def test_timing_report(tmp_path):
+    source_path = tmp_path / "notebooks"
+    shutil.copytree(DATA_PATH / "my_notebooks", source_path)
+    build_path = tmp_path / "build"
+
+    def convert():
+        converter = NbcollectionConverter(
+            str(source_path),
+            config=NbcollectionConfig(),
+            build_path=str(build_path),
+        )
+        converter.convert()
+        with (build_path / "_build" / "nbcollection_timings.json").open() as f:
+            return json.load(f)
+
+    report = convert()
+    assert report["discover_time"] >= 0
+    notebooks = {nb["notebook"]: nb for nb in report["notebooks"]}
+    assert set(notebooks) == {
+        "notebook1.ipynb",
+        "sub_path1/notebook2.ipynb",
+        "sub_path1/notebook3.ipynb",
+    }
+    for nb in notebooks.values():
+        assert nb["execute_status"] == "executed"
+        assert nb["convert_status"] == "converted"
+        # The executed notebook is converted from memory, and images aren't
+        # optimized by default
+        assert set(nb["timings"]) == set(PHASES) - {
+            "read_executed",
+            "optimize_images",
+            "search_index",
+        }
+        assert all(t >= 0 for t in nb["timings"].values())
+        assert nb["timings"]["kernel_startup"] > 0
+        assert nb["total"] == sum(nb["timings"].values())
+
+    with (build_path / "_build" / "nbcollection_timings.csv").open() as f:
+        rows = list(csv.DictReader(f))
+    assert [row["notebook"] for row in rows] == [
+        nb["notebook"] for nb in report["notebooks"]
+    ]
+    assert float(rows[0]["execute_cells"]) > 0
+
+    # Restored from the cache: no kernel is started
+    next(
+        p for p in (build_path / "_build").rglob("notebook1.ipynb") if p.is_file()
+    ).unlink()
+    report = convert()
+    nb = next(nb for nb in report["notebooks"] if nb["notebook"] == "notebook1.ipynb")
+    assert nb["execute_status"] == "cached"
+    assert "kernel_startup" not in nb["timings"]
+    assert {"read", "cache", "write_executed", "write_html"} <= set(nb["timings"])
@@ -0,0 +1,181 @@
+"""Tests for watching and rebuilding notebooks."""
+
+import os
+import threading
+from pathlib import Path
+
+import jinja2
+import nbformat
+import pytest
+
+from nbcollection.config import NbcollectionConfig
+from nbcollection.converter import NbcollectionConverter
+from nbcollection.watch import NotebookWatcher
+
+
+def _write_notebook(path, text):
+    nb = nbformat.v4.new_notebook()
+    nb.metadata["kernelspec"] = {"name": "python3", "display_name": "Python 3"}
+    nb.cells = [
+        nbformat.v4.new_markdown_cell(f"# {text}"),
+        nbformat.v4.new_code_cell("print(1 + 1)"),
+    ]
+    path.parent.mkdir(parents=True, exist_ok=True)
+    nbformat.write(nb, str(path))
+
+
+def _touch(path, content="{}"):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(content)
+
+
+@pytest.mark.parametrize("polling", [True, False])
+def test_notebook_watcher(tmp_path, polling):
+    if not polling:
+        pytest.importorskip("watchdog.observers")
+    source = tmp_path / "notebooks"
+    _touch(source / "a.ipynb")
+    _touch(source / "b.ipynb")
+    single = tmp_path / "single.ipynb"
+    _touch(single)
+
+    watcher = NotebookWatcher(
+        [str(source), str(single)], interval=0.05, polling=polling
+    )
+    assert watcher.polling is polling
+    watcher.start()
+    try:
+        assert watcher.wait(timeout=0.2) == set()
+
+        _touch(source / "a.ipynb", '{"changed": true}')
+        _touch(source / "sub" / "c.ipynb")
+        (source / "b.ipynb").unlink()
+        # Not watched: other files, hidden directories, and other notebooks
+        _touch(source / "notes.txt")
+        _touch(source / "_build" / "a.ipynb")
+        _touch(source / ".ipynb_checkpoints" / "a-checkpoint.ipynb")
+        _touch(tmp_path / "other.ipynb")
+        _touch(single, '{"changed": true}')
+
+        expected = {
+            str(source / "a.ipynb"),
+            str(source / "b.ipynb"),
+            str(source / "sub" / "c.ipynb"),
+            str(single),
+        }
+        changes = set()
+        for _ in range(50):
+            changes |= watcher.wait(timeout=0.1)
+            if changes == expected:
+                break
+        assert changes == expected
+    finally:
+        watcher.stop()
+
+
+def test_rebuild(tmp_path):
+    source = tmp_path / "notebooks"
+    _write_notebook(source / "a.ipynb", "First title")
+    _write_notebook(source / "b.ipynb", "Removed")
+    converter = NbcollectionConverter(
+        str(source),
+        config=NbcollectionConfig(),
+        build_path=str(tmp_path),
+        exclude_pattern="^skip",
+        flatten=True,
+    )
+    converter.convert()
+    (nb_a, nb_b) = converter.notebooks
+    assert "First title" in Path(nb_a.html_path).read_text()
+
+    _write_notebook(source / "a.ipynb", "Second title")
+    _write_notebook(source / "c.ipynb", "New notebook")
+    _write_notebook(source / "skip.ipynb", "Excluded")
+    os.remove(nb_b.file_path)
+
+    template = "{% for nb in notebooks %}{{ nb.name }};{% endfor %}"
+    rebuilt = converter._rebuild(
+        {
+            nb_a.file_path,
+            nb_b.file_path,
+            str(source / "c.ipynb"),
+            str(source / "skip.ipynb"),
+        },
+        index_template=jinja2.Template(template),
+    )
+    assert [nb.filename for nb in rebuilt] == ["a.ipynb", "c.ipynb"]
+    assert [nb.filename for nb in converter.notebooks] == ["a.ipynb", "c.ipynb"]
+    assert "Second title" in Path(nb_a.html_path).read_text()
+    assert nb_a.summary["execute_status"] == "cached"
+    assert os.path.exists(converter.notebooks[1].html_path)
+    index = (tmp_path / "_build" / "index.html").read_text()
+    assert index == "Second title;New notebook;"
+
+
+def test_watch(tmp_path):
+    pytest.importorskip("watchdog.observers")
+    source = tmp_path / "notebooks"
+    _write_notebook(source / "a.ipynb", "First title")
+    converter = NbcollectionConverter(
+        str(source), config=NbcollectionConfig(), build_path=str(tmp_path)
+    )
+    converter.convert()
+    (nb,) = converter.notebooks
+
+    stop_event = threading.Event()
+    rebuild = converter._rebuild
+
+    def rebuild_and_stop(*args, **kwargs):
+        rebuilt = rebuild(*args, **kwargs)
+        stop_event.set()
+        return rebuilt
+
+    converter._rebuild = rebuild_and_stop
+    thread = threading.Thread(
+        target=converter.watch, kwargs={"interval": 0.1, "stop_event": stop_event}
+    )
+    thread.start()
+    try:
+        # The notebook is written until the watcher has started and noticed it
+        for _ in range(100):
+            _write_notebook(source / "a.ipynb", "Second title")
+            if stop_event.wait(0.5):
+                break
+    finally:
+        stop_event.set()
+        thread.join()
+    assert "Second title" in Path(nb.html_path).read_text()
+
+
+def test_watch_relative_path(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    _write_notebook(tmp_path / "notebooks" / "a.ipynb", "First title")
+    converter = NbcollectionConverter("notebooks", config=NbcollectionConfig())
+    converter.convert()
+
+    stop_event = threading.Event()
+    rebuild = converter._rebuild
+
+    def rebuild_and_stop(*args, **kwargs):
+        rebuilt = rebuild(*args, **kwargs)
+        if rebuilt:
+            stop_event.set()
+        return rebuilt
+
+    converter._rebuild = rebuild_and_stop
+    thread = threading.Thread(
+        target=converter.watch,
+        kwargs={"interval": 0.05, "polling": True, "stop_event": stop_event},
+    )
+    thread.start()
+    try:
+        # The notebook is written until the watcher has started and noticed it
+        for _ in range(100):
+            _write_notebook(tmp_path / "notebooks" / "b.ipynb", "New notebook")
+            if stop_event.wait(0.5):
+                break
+    finally:
+        stop_event.set()
+        thread.join()
+    assert [nb.filename for nb in converter.notebooks] == ["a.ipynb", "b.ipynb"]
+    assert "New notebook" in Path(converter.notebooks[1].html_path).read_text()
@@ -79,3 +79,20 @@ def test_html_export(theme: str) -> None:
     write_conversion(
         base_dir=f"learnastropy/color-excess/{theme}", content=html, resources=resources
     )
+
+
+def test_html_export_reused_exporter() -> None:
+    """A reused exporter produces the same pages and caches the theme CSS."""
+    test_notebook = Path(__file__).parent.parent.joinpath("data/color-excess.ipynb")
+
+    exporter = LearnAstropyHtmlExporter(config=Config())
+    html1, _ = exporter.from_filename(str(test_notebook.resolve()))
+    assert "astropytutorial.css" in exporter._include_cache["include_css"]
+
+    html2, _ = exporter.from_filename(str(test_notebook.resolve()))
+    assert html1 == html2
+
+    fresh_html, _ = LearnAstropyHtmlExporter(config=Config()).from_filename(
+        str(test_notebook.resolve())
+    )
+    assert html1 == fresh_html
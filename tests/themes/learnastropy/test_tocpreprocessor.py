@@ -0,0 +1,81 @@
+"""Tests for the TOC preprocessor of the Learn Astropy HTML theme."""
+
+from __future__ import annotations
+
+import nbformat
+import pytest
+from bs4 import BeautifulSoup
+from nbconvert.filters import add_anchor
+
+from nbcollection.themes.learnastropy.tocpreprocessor import (
+    TocPreprocessor,
+    make_anchor_href,
+)
+
+
+def add_anchor_href(title: str, level: int) -> str:
+    """Get the anchor href by running nbconvert's add_anchor."""
+    header_html = add_anchor(f"<h{level}>{title}</h{level}>", anchor_link_text="#")
+    anchor = BeautifulSoup(header_html, "html.parser").find("a")
+    if anchor is None:
+        return "#"
+    href = anchor["href"]
+    assert isinstance(href, str)
+    return href
+
+
+@pytest.mark.parametrize(
+    "title",
+    [
+        "Learning Goals",
+        "Section 1.2: Units & Quantities",
+        "Section &amp; entities",
+        "The <code>Table</code> class",
+        "A <span>broken tag",
+        "Unicode: é, ü, and 日本",
+        "Punctuation?/:@!$'()+,;=#%[]{}",
+        "Brackets ]]> in text",
+        "Line\rbreak",
+        "Control \x01 character",
+        "  Leading and trailing spaces  ",
+        "",
+    ],
+)
+@pytest.mark.parametrize("level", [1, 2, 6])
+def test_make_anchor_href(title: str, level: int) -> None:
+    assert make_anchor_href(title, level) == add_anchor_href(title, level)
+
+
+def test_toc() -> None:
+    nb = nbformat.v4.new_notebook()
+    nb.cells = [
+        nbformat.v4.new_markdown_cell("# Title\n\nIntroduction"),
+        nbformat.v4.new_markdown_cell("## First `section`\n\n### Sub *section*"),
+        nbformat.v4.new_code_cell("# Not a heading"),
+        nbformat.v4.new_markdown_cell("```\n## Not a heading\n```\n\n> ## Quoted"),
+        nbformat.v4.new_markdown_cell("Second section\n---"),
+    ]
+
+    _, resources = TocPreprocessor().preprocess(nb, {})
+
+    assert resources["learn_astropy_toc"] == [
+        {
+            "title": "First section",
+            "children": [
+                {
+                    "title": "Sub section",
+                    "children": [],
+                    "href": "#Sub-section",
+                    "level": 3,
+                }
+            ],
+            "href": "#First-section",
+            "level": 2,
+        },
+        {
+            "title": "Second section",
+            "children": [],
+            "href": "#Second-section",
+            "level": 2,
+        },
+    ]